@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""Calculation function to stitch the bands computed for contiguous shards of k-points into a single `BandsData`."""
+import re
+
+from aiida import orm
+from aiida.engine import calcfunction
+import numpy
+
+
+@calcfunction
+def merge_bands_data(**kwargs):
+    """Stitch the `BandsData` computed for contiguous shards of a list of k-points into a single `BandsData`.
+
+    The k-points, weights, bands and occupations of the shards are concatenated along the k-points, in the natural order
+    of their labels, and the labels of the k-points are shifted to their index in the merged list. The cell and the
+    units are taken from the first shard. This is the inverse of the ``split_kpoints`` calculation function, applied to
+    the bands computed for each of its shards.
+
+    :param kwargs: the `BandsData` of the shards, which should all have the same number of bands and spin components.
+    :returns: the merged `BandsData`
+    """
+    natural_sort = lambda string: [int(c) if c.isdigit() else c.lower() for c in re.split(r'(\d+)', string)]
+    nodes = [node for _, node in sorted(kwargs.items(), key=lambda item: natural_sort(item[0]))]
+
+    if not nodes:
+        raise ValueError('at least one `BandsData` should be passed.')
+
+    kpoints = [node.get_kpoints() for node in nodes]
+    offsets = numpy.cumsum([0] + [len(points) for points in kpoints])
+
+    try:
+        weights = numpy.concatenate([node.get_kpoints(also_weights=True)[1] for node in nodes])
+    except AttributeError:
+        weights = None
+
+    occupations = None
+
+    if all('occupations' in node.get_arraynames() for node in nodes):
+        occupations = numpy.concatenate([node.get_array('occupations') for node in nodes], axis=-2)
+
+    merged = orm.BandsData()
+
+    try:
+        merged.set_cell(nodes[0].cell, nodes[0].pbc)
+    except AttributeError:
+        pass
+
+    merged.set_kpoints(numpy.concatenate(kpoints), weights=weights)
+    merged.labels = [
+        (int(offset + index), label) for node, offset in zip(nodes, offsets) for index, label in node.labels or []
+    ]
+    merged.set_bands(
+        numpy.concatenate([node.get_bands() for node in nodes], axis=-2),
+        units=nodes[0].units,
+        occupations=occupations
+    )
+
+    return merged
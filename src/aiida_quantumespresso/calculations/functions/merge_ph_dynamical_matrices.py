@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Calculation function to collect the dynamical matrices of multiple ph runs called by one PhBase."""
+import os
+import re
+
+from aiida import orm
+from aiida.engine import calcfunction
+
+
+@calcfunction
+def merge_ph_dynamical_matrices(**kwargs):
+    """Collect the dynamical matrix files retrieved by multiple `ph.x` calculations with different q-points.
+
+    The files are stored in the same subfolder as in the retrieved folders, such that the resulting `FolderData` can be
+    used as the `parent_folder` of a `Q2rCalculation`. Files with the same name, e.g. the list of q-points in the
+    `dynamical-matrix-0` file that is written by every calculation, are taken from the first folder, sorted by label.
+
+    :param kwargs: the `retrieved` `FolderData` of each calculation.
+    :returns: a `FolderData` with all dynamical matrix files.
+    """
+    from aiida_quantumespresso.calculations.ph import PhCalculation
+
+    dirname = PhCalculation._FOLDER_DYNAMICAL_MATRIX  # pylint: disable=protected-access
+    natural_sort = lambda string: [int(c) if c.isdigit() else c.lower() for c in re.split(r'(\d+)', string)]
+
+    merged = orm.FolderData()
+    filenames = set()
+
+    for _, retrieved in sorted(kwargs.items(), key=lambda item: natural_sort(item[0])):
+
+        for filename in retrieved.base.repository.list_object_names(dirname):
+            if filename in filenames:
+                continue
+
+            filepath = os.path.join(dirname, filename)
+
+            with retrieved.base.repository.open(filepath, 'rb') as handle:
+                merged.base.repository.put_object_from_filelike(handle, filepath)
+
+            filenames.add(filename)
+
+    return merged
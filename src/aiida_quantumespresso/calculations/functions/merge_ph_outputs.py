@@ -1,37 +1,162 @@
 # -*- coding: utf-8 -*-
 """merge data from mulitple ph runs called by one PhBase."""
+import re
+
 from aiida import orm
 from aiida.engine import calcfunction
+import numpy
+
+#: Keys of the dynamical matrices of the `ph.x` output that are stacked into arrays, with the name of their array
+DYNAMICAL_MATRIX_ARRAYS = {
+    'q_point': 'q_points',
+    'frequencies': 'frequencies',
+    'mode_symmetry': 'mode_symmetry',
+    'point_group': 'point_group',
+    'eigenvectors': 'eigenvectors',
+}
 
 
 @calcfunction
 def merge_ph_outputs(**kwargs):
-    """Calcfunction to merge outputs from multiple `ph.x` calculations with different q-points."""
+    """Calcfunction to merge outputs from multiple `ph.x` calculations with different q-points.
 
-    # Get the outputs, sorted by label
-    outputs = [el[1].get_dict() for el in sorted(list(kwargs.items()), key=lambda l: l[0])]
+    The dynamical matrices of all q-points are stacked into the arrays of an `ArrayData`, sorted on the index of their
+    q-point in the `qpoint_indices` array, such that only the scalar results and their units remain in the `Dict`. The
+    outputs of a previous merge can be passed as well, in which case their arrays are extended with the dynamical
+    matrices of the other outputs, without the need to pass the outputs of all calculations again. For q-points that
+    occur in multiple outputs, e.g. when a calculation is restarted, the one of the last output is kept, and the number
+    of q-points and of irreducible representations count each q-point once.
+
+    :param kwargs: the `output_parameters` and, optionally, the `output_dynamical_matrices` of the calculations and of
+        a previous merge. The outputs are merged in the natural order of their labels.
+    :returns: the merged `output_parameters` and, if any dynamical matrix was found, the `output_dynamical_matrices`.
+    """
+    natural_sort = lambda string: [int(c) if c.isdigit() else c.lower() for c in re.split(r'(\d+)', string)]
 
     merged = {}
+    blocks = []
+    number_irreps = {}
+    number_irreps_unindexed = []
 
     total_walltime = 0
-    number_of_qpoints = 0
-    number_irreps = []
 
-    for output in outputs:
+    for _, node in sorted(kwargs.items(), key=lambda item: natural_sort(item[0])):
+
+        if isinstance(node, orm.ArrayData):
+            blocks.append({name: node.get_array(name) for name in node.get_arraynames()})
+            continue
 
+        output = node.get_dict()
         num_irreps_per_q = output.pop('number_of_irr_representations_for_each_q', [])
-        number_of_qpoints += len(num_irreps_per_q)
-        number_irreps.extend(num_irreps_per_q)
+        qpoint_indices = output.pop('qpoint_indices', None)
         total_walltime += output.pop('wall_time_seconds', 0)
 
+        # Older outputs do not list the index of the q-point of each number of irreps, so these cannot be deduplicated
+        if qpoint_indices is None:
+            number_irreps_unindexed.extend(num_irreps_per_q)
+        else:
+            number_irreps.update(zip(qpoint_indices, num_irreps_per_q))
+
+        dynamical_matrices = {}
+
         for key, value in output.items():
-            # Skip uncomplete dynamical matrix results
-            if 'dynamical_matrix_' in key and 'mode_symmetry' not in value:
+            if key.startswith('dynamical_matrix_'):
+                # Skip uncomplete dynamical matrix results
+                if 'mode_symmetry' in value:
+                    dynamical_matrices[int(key[len('dynamical_matrix_'):])] = value
                 continue
             merged[key] = value
 
+        if dynamical_matrices:
+            blocks.append(get_dynamical_matrices_arrays(dynamical_matrices))
+
+            for value in dynamical_matrices.values():
+                merged.update({key: value[key] for key in ('frequencies_units', 'q_point_units') if key in value})
+
+    qpoint_indices = sorted(number_irreps)
+    number_irreps = [number_irreps[index] for index in qpoint_indices] + number_irreps_unindexed
+
     merged['wall_time_seconds'] = total_walltime
     merged['number_of_irr_representations_for_each_q'] = number_irreps
-    merged['number_of_qpoints'] = number_of_qpoints
+    merged['number_of_qpoints'] = len(number_irreps)
+
+    # The indices of the q-points can only be listed if they are known for all of them
+    if not number_irreps_unindexed:
+        merged['qpoint_indices'] = qpoint_indices
+
+    results = {'output_parameters': orm.Dict(merged)}
+
+    if blocks:
+        results['output_dynamical_matrices'] = orm.ArrayData()
+
+        for name, array in stack_dynamical_matrices_arrays(blocks).items():
+            results['output_dynamical_matrices'].set_array(name, array)
+
+    return results
+
+
+def get_dynamical_matrices_arrays(dynamical_matrices):
+    """Return the arrays of the given dynamical matrices, as parsed from the output of a `ph.x` calculation.
+
+    The arrays only contain the quantities that are present for all q-points. Frequencies that could not be parsed are
+    set to `NaN`, and the eigenvectors are converted into complex numbers.
+
+    :param dynamical_matrices: dictionary of the index of each q-point onto the parsed data of its dynamical matrix.
+    :returns: dictionary with the `qpoint_indices` array and an array for each quantity, with the q-points along the
+        first axis.
+    """
+    indices = sorted(dynamical_matrices)
+    arrays = {'qpoint_indices': numpy.array(indices, dtype=int)}
+
+    for key, name in DYNAMICAL_MATRIX_ARRAYS.items():
+        if not all(key in dynamical_matrices[index] for index in indices):
+            continue
+
+        values = [dynamical_matrices[index][key] for index in indices]
+
+        if key == 'frequencies':
+            arrays[name] = numpy.array(values, dtype=float)
+        elif key == 'eigenvectors':
+            eigenvectors = numpy.array(values, dtype=float)
+            arrays[name] = eigenvectors[..., 0] + 1j * eigenvectors[..., 1]
+        else:
+            arrays[name] = numpy.array(values)
+
+    return arrays
+
+
+def stack_dynamical_matrices_arrays(blocks):
+    """Stack blocks of arrays of dynamical matrices into a single block, sorted on the index of the q-point.
+
+    If a q-point occurs in multiple blocks, the one of the last block is kept. Only the arrays that are present in all
+    blocks that contribute at least one q-point are stacked.
+
+    :param blocks: list of dictionaries as returned by `get_dynamical_matrices_arrays`.
+    :returns: dictionary with the stacked arrays.
+    """
+    # Discard the blocks of which all q-points are replaced by later blocks, since they should not limit the arrays
+    contributing, _ = _get_last_occurrences(blocks)
+    blocks = [blocks[i] for i in contributing]
+    _, positions = _get_last_occurrences(blocks)
+
+    names = [name for name in blocks[0] if all(name in block for block in blocks)]
+    stacked = {name: numpy.concatenate([block[name] for block in blocks])[positions] for name in names}
+
+    return stacked
+
+
+def _get_last_occurrences(blocks):
+    """Return the blocks with the last occurrence of at least one q-point and the positions of these occurrences.
+
+    :param blocks: list of dictionaries as returned by `get_dynamical_matrices_arrays`.
+    :returns: tuple of the indices of the blocks and the positions in the concatenated arrays of all blocks, sorted on
+        the index of the q-point.
+    """
+    indices = numpy.concatenate([block['qpoint_indices'] for block in blocks])
+    owners = numpy.concatenate([numpy.full(len(block['qpoint_indices']), i) for i, block in enumerate(blocks)])
+
+    # Reverse the indices, such that `numpy.unique` returns the position of the last occurrence of each q-point
+    _, positions = numpy.unique(indices[::-1], return_index=True)
+    positions = len(indices) - 1 - positions
 
-    return orm.Dict(dict=merged)
+    return numpy.unique(owners[positions]), positions
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Calculation function to split an explicit list of k-points into contiguous shards."""
+from aiida import orm
+from aiida.engine import calcfunction
+import numpy
+
+
+@calcfunction
+def split_kpoints(kpoints, number_of_shards):
+    """Split an explicit list of k-points, e.g. a path through the Brillouin zone, into contiguous shards.
+
+    The shards contain about the same number of k-points and keep the order of the original list, such that the bands
+    computed for each shard can be stitched back together with the ``merge_bands_data`` calculation function. The cell
+    and the weights of the k-points are copied onto each shard, and the labels are assigned to the shard that contains
+    their k-point, with their index shifted accordingly.
+
+    :param kpoints: a KpointsData with an explicit list of k-points
+    :param number_of_shards: an Int with the number of shards, which cannot exceed the number of k-points
+    :returns: a KpointsData for each shard, with the labels ``kpoints_0``, ``kpoints_1``, etc.
+    """
+    points = kpoints.get_kpoints()
+    number = number_of_shards.value
+
+    if not 1 <= number <= len(points):
+        raise ValueError(f'the number of shards should be between 1 and the number of k-points {len(points)}.')
+
+    try:
+        weights = kpoints.get_kpoints(also_weights=True)[1]
+    except AttributeError:
+        weights = None
+
+    labels = kpoints.labels or []
+    bounds = numpy.cumsum([0] + [len(indices) for indices in numpy.array_split(numpy.arange(len(points)), number)])
+    results = {}
+
+    for index, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:])):
+        shard = orm.KpointsData()
+
+        try:
+            shard.set_cell(kpoints.cell, kpoints.pbc)
+        except AttributeError:
+            pass
+
+        shard.set_kpoints(points[start:stop], weights=None if weights is None else weights[start:stop])
+        shard.labels = [(int(i - start), label) for i, label in labels if start <= i < stop]
+        results[f'kpoints_{index}'] = shard
+
+    return results
@@ -5,6 +5,132 @@ from aiida.engine import calcfunction
 import numpy as np
 
 
+def get_energy_grids(lower_bounds, upper_bounds, fwhm, number_of_points=500, points_per_fwhm=None):
+    """Return an energy grid for each element, all with the same number of points.
+
+    By default, each grid has a fixed number of points. If ``points_per_fwhm`` is given, the number of points is instead
+    chosen such that the spacing of the widest grid is at most the full width at half maximum of the peaks divided by
+    ``points_per_fwhm``, i.e. the density of the grids adapts to the broadening and to the spread of the peaks.
+
+    :param lower_bounds: array with shape ``(nelements,)`` with the lowest energy of each grid.
+    :param upper_bounds: array with shape ``(nelements,)`` with the highest energy of each grid.
+    :param fwhm: the full width at half maximum of the peaks.
+    :param number_of_points: the number of points of each grid, if ``points_per_fwhm`` is not given.
+    :param points_per_fwhm: the minimum number of points within the full width at half maximum of a peak.
+    :return: array with shape ``(nelements, npoints)``.
+    """
+    lower_bounds = np.asarray(lower_bounds, dtype=float)
+    upper_bounds = np.asarray(upper_bounds, dtype=float)
+
+    if points_per_fwhm is not None:
+        number_of_points = int(np.ceil(np.max(upper_bounds - lower_bounds) * points_per_fwhm / fwhm)) + 1
+
+    if number_of_points < 2:
+        raise ValueError('the energy grids should have at least two points.')
+
+    return np.linspace(lower_bounds, upper_bounds, number_of_points, axis=-1)
+
+
+def broaden_peaks(peaks, sigma, gamma, number_of_points=500, points_per_fwhm=None, margin=1.5):
+    """Broaden the peaks of all elements with a Voigt profile, evaluating all of them in a single operation.
+
+    The peaks of each element are weighted with their multiplicity, normalised by the total multiplicity of the element,
+    and are evaluated on an energy grid that spans the peaks of that element, extended by the full width at half maximum
+    and the ``margin`` on both sides. The profiles of all peaks of all elements are computed at once on an array with
+    shape ``(npeaks, npoints)``, after which the total spectrum of each element is obtained by summing the rows of its
+    peaks.
+
+    :param peaks: dictionary with the elements as keys and a list of tuples ``(multiplicity, energy, label)`` with
+        the peaks of that element as values.
+    :param sigma: the standard deviation of the Gaussian part of the Voigt profile.
+    :param gamma: the half width at half maximum of the Lorentzian part of the Voigt profile.
+    :param number_of_points: the number of points of the energy grids, see ``get_energy_grids``.
+    :param points_per_fwhm: the density of the energy grids, see ``get_energy_grids``.
+    :param margin: the energy by which the grids extend beyond the broadened peaks.
+    :return: dictionary with the elements as keys and, as values, tuples with the energy grid with shape
+        ``(npoints,)``, the spectra of the peaks with shape ``(npeaks, npoints)`` and the total spectrum.
+    """
+    from scipy.special import voigt_profile  # pylint: disable=no-name-in-module
+
+    elements = [element for element in peaks if peaks[element]]
+    multiplicities, energies = np.array([
+        (float(peak[0]), float(peak[1])) for element in elements for peak in peaks[element]
+    ]).reshape(-1, 2).T
+    counts = np.array([len(peaks[element]) for element in elements])
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(int)
+    element_indices = np.repeat(np.arange(len(elements)), counts)
+
+    fwhm = gamma / 2 + np.sqrt(gamma**2 / 4 + sigma**2)
+    lower_bounds = np.minimum.reduceat(energies, starts) - fwhm - margin
+    upper_bounds = np.maximum.reduceat(energies, starts) + fwhm + margin
+    grids = get_energy_grids(lower_bounds, upper_bounds, fwhm, number_of_points, points_per_fwhm)
+
+    weights = multiplicities / np.add.reduceat(multiplicities, starts)[element_indices]
+    spectra = weights[:, None] * voigt_profile(grids[element_indices] - energies[:, None], sigma, gamma)
+    totals = np.add.reduceat(spectra, starts, axis=0)
+
+    return {
+        element: (grids[index], spectra[start:start + count], totals[index])
+        for index, (element, start, count) in enumerate(zip(elements, starts, counts))
+    }
+
+
+def get_spectra_xy_data(peaks, sigma, gamma, **kwargs):
+    """Return the broadened spectrum of each element as an ``XyData``, with the spectrum of each peak and the total.
+
+    :param peaks: dictionary with the peaks of each element, see ``broaden_peaks``.
+    :param sigma: the standard deviation of the Gaussian part of the Voigt profile.
+    :param gamma: the half width at half maximum of the Lorentzian part of the Voigt profile.
+    :param kwargs: the parameters of the energy grids, see ``broaden_peaks``.
+    :return: dictionary with the elements as keys and unstored ``XyData`` nodes as values.
+    """
+    result = {}
+
+    for element, (energies, spectra, total) in broaden_peaks(peaks, sigma, gamma, **kwargs).items():
+        y_labels = [f'{element}{index}_xps' for index in range(len(spectra))] + [f'{element}_total_xps']
+
+        xy_data = orm.XyData()
+        xy_data.set_x(energies, 'energy', 'eV')
+        xy_data.set_y(list(spectra) + [total], y_labels, ['sigma'] * len(y_labels))
+        result[element] = xy_data
+
+    return result
+
+
+def rebroaden_spectra(energies, equivalent_sites_data, sigma, gamma, **kwargs):
+    """Broaden stored core level shifts or binding energies again, without running a calculation function.
+
+    This can be used to compute the spectra of the ``chemical_shifts`` or ``binding_energies`` outputs of an
+    ``XpsWorkChain`` with a different broadening or energy grid, e.g. for a parameter sweep, without adding nodes to
+    the provenance graph. The spectra are the same as those computed by ``get_spectra_by_element``.
+
+    :param energies: dictionary with the elements as keys and a ``Dict`` or dictionary with the energy of each site as
+        values, such as the ``chemical_shifts`` or ``binding_energies`` outputs of the ``XpsWorkChain`` with the
+        ``_cls`` or ``_be`` suffix removed from their keys.
+    :param equivalent_sites_data: a ``Dict`` or dictionary with the symmetry data of the sites, as in the
+        ``equivalent_sites_data`` of the ``symmetry_analysis_data`` output of the ``XpsWorkChain``.
+    :param sigma: the standard deviation of the Gaussian part of the Voigt profile.
+    :param gamma: the half width at half maximum of the Lorentzian part of the Voigt profile.
+    :param kwargs: the parameters of the energy grids, see ``broaden_peaks``.
+    :return: dictionary with the elements as keys and unstored ``XyData`` nodes as values.
+    """
+    if isinstance(equivalent_sites_data, orm.Dict):
+        equivalent_sites_data = equivalent_sites_data.get_dict()
+
+    peaks = {}
+
+    for element, site_energies in energies.items():
+        if isinstance(site_energies, orm.Dict):
+            site_energies = site_energies.get_dict()
+
+        peaks[element] = sorted(
+            ((equivalent_sites_data[site]['multiplicity'], energy, site) for site, energy in site_energies.items()),
+            key=lambda entry: entry[1]
+        )
+
+    return get_spectra_xy_data(peaks, sigma, gamma, **kwargs)
+
+
 @calcfunction
 def get_spectra_by_element(elements_list, equivalent_sites_data, voight_gamma, voight_sigma, **kwargs):  # pylint: disable=too-many-statements
     """Generate the XPS spectra for each element.
@@ -18,14 +144,15 @@ def get_spectra_by_element(elements_list, equivalent_sites_data, voight_gamma, v
     :param voight_gamma: a Float node for the gamma parameter of the voigt profile.
     :param voight_sigma: a Float node for the sigma parameter of the voigt profile.
     :param structure: the StructureData object to be analysed
+    :param grid_parameters: an optional Dict object with the parameters of the energy grids of the spectra, i.e.
+            ``number_of_points``, ``points_per_fwhm`` and ``margin``, see ``broaden_peaks``.
     :returns: Dict objects for all generated spectra and associated binding energy
             and core level shift.
 
     """
-    from scipy.special import voigt_profile  # pylint: disable=no-name-in-module
-
     ground_state_node = kwargs.pop('ground_state', None)
     correction_energies = kwargs.pop('correction_energies', orm.Dict()).get_dict()
+    grid_parameters = kwargs.pop('grid_parameters', orm.Dict()).get_dict()
     incoming_param_nodes = {key: value for key, value in kwargs.items() if key != 'metadata'}
     group_state_energy = None
     if ground_state_node is not None:
@@ -63,50 +190,11 @@ def get_spectra_by_element(elements_list, equivalent_sites_data, voight_gamma, v
             binding_energies[element] = binding_energy
             result[f'{element}_be'] = orm.Dict(dict={entry[2]: entry[1] for entry in binding_energy})
 
-    fwhm_voight = gamma / 2 + np.sqrt(gamma**2 / 4 + sigma**2)
-
-    def spectra_broadening(points, label='cls_spectra'):
-        """Broadening base on the binding energy."""
-        result_spectra = {}
-        for element in elements:
-            final_spectra_y_arrays = []
-            final_spectra_y_labels = []
-            final_spectra_y_units = []
-
-            total_multiplicity = sum(i[0] for i in points[element])
-
-            final_spectra = orm.XyData()
-            max_core_level_shift = points[element][-1][1]
-            min_core_level_shift = points[element][0][1]
-            # Energy range for the Broadening function
-            x_energy_range = np.linspace(
-                min_core_level_shift - fwhm_voight - 1.5, max_core_level_shift + fwhm_voight + 1.5, 500
-            )
-
-            for atoms, index in zip(points[element], range(len(points[element]))):
-                # Weight for the spectra of every atom
-                intensity = atoms[0]
-                relative_peak_position = atoms[1]
-                final_spectra_y_labels.append(f'{element}{index}_xps')
-                final_spectra_y_units.append('sigma')
-                final_spectra_y_arrays.append(
-                    intensity * voigt_profile(x_energy_range - relative_peak_position, sigma, gamma) /
-                    total_multiplicity
-                )
-
-            final_spectra_y_labels.append(f'{element}_total_xps')
-            final_spectra_y_units.append('sigma')
-            final_spectra_y_arrays.append(sum(final_spectra_y_arrays))
-
-            final_spectra_x_label = 'energy'
-            final_spectra_x_units = 'eV'
-            final_spectra_x_array = x_energy_range
-            final_spectra.set_x(final_spectra_x_array, final_spectra_x_label, final_spectra_x_units)
-            final_spectra.set_y(final_spectra_y_arrays, final_spectra_y_labels, final_spectra_y_units)
-            result_spectra[f'{element}_{label}'] = final_spectra
-        return result_spectra
-
-    result.update(spectra_broadening(core_level_shifts))
+    for element, xy_data in get_spectra_xy_data(core_level_shifts, sigma, gamma, **grid_parameters).items():
+        result[f'{element}_cls_spectra'] = xy_data
+
     if ground_state_node is not None:
-        result.update(spectra_broadening(binding_energies, label='be_spectra'))
+        for element, xy_data in get_spectra_xy_data(binding_energies, sigma, gamma, **grid_parameters).items():
+            result[f'{element}_be_spectra'] = xy_data
+
     return result
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""CalcFunction to compute the XANES spectrum again from the Lanczos coefficients of an ``XspectraCalculation``."""
+from aiida import orm
+from aiida.engine import calcfunction
+import numpy as np
+from qe_tools import CONSTANTS
+
+# The fine structure constant (CODATA 2018), for the prefactor of the dipole cross-section
+FINE_STRUCTURE_CONSTANT = 7.2973525693e-3
+
+# Default values of the ``PLOT`` namelist of xspectra.x
+DEFAULT_PLOT_PARAMETERS = {
+    'xemin': -10.0,
+    'xemax': 30.0,
+    'xnepoint': 500,
+    'xgamma': 0.2,
+    'terminator': False,
+    'gamma_mode': 'constant',
+}
+
+
+def get_terminator(energies, a_coefficients, b_coefficients, ncalcv):
+    """Return the square root terminator of the continued fraction of each k-point.
+
+    The coefficients beyond the last computed iteration are approximated by the average of the second half of the
+    computed ones, for which the remainder of the continued fraction is the root of a quadratic equation.
+
+    :param energies: complex array with shape ``(nenergies,)`` of the energies, including the broadening, in Ry.
+    :param a_coefficients: array with shape ``(nkpoints, niterations)`` of the ``a`` coefficients, padded with zeros.
+    :param b_coefficients: array with shape ``(nkpoints, niterations)`` of the ``b`` coefficients, padded with zeros.
+    :param ncalcv: array with shape ``(nkpoints,)`` with the number of computed iterations of each k-point.
+    :return: complex array with shape ``(nkpoints, nenergies)``.
+    """
+    mask = np.arange(a_coefficients.shape[1])[None, :] >= (ncalcv // 2)[:, None]
+    mask &= np.arange(a_coefficients.shape[1])[None, :] < ncalcv[:, None]
+    count = mask.sum(axis=1)
+    a_infinity = (a_coefficients * mask).sum(axis=1) / count
+    b_infinity = (b_coefficients * mask).sum(axis=1) / count
+
+    shifted = energies[None, :] - a_infinity[:, None]
+    root = np.sqrt(shifted**2 - 4 * b_infinity[:, None]**2)
+    denominator = np.where(b_infinity == 0, 1, 2 * b_infinity**2)[:, None]
+    terminator = (shifted - root) / denominator
+
+    # Choose the root that gives a retarded Green's function, i.e. with a negative imaginary part
+    terminator = np.where(terminator.imag > 0, (shifted + root) / denominator, terminator)
+
+    return np.where(b_infinity[:, None] == 0, 0, terminator)
+
+
+def get_lanczos_spectrum(energies, a_coefficients, b_coefficients, ncalcv, xnorm, weights, gamma, terminator=False):
+    """Return the spectrum of a set of Lanczos chains by evaluating their continued fractions.
+
+    The continued fraction ``G(E) = 1 / (E + i gamma - a_1 - b_1^2 / (E + i gamma - a_2 - ...))`` of all k-points is
+    evaluated for all energies at once, starting from the deepest iteration. The chains of the k-points with fewer
+    iterations are left untouched until their last computed iteration is reached. The spectrum is the average of
+    ``-Im G(E) / pi`` over the k-points, weighted with the weight of the k-point and the squared norm of its initial
+    Lanczos vector.
+
+    :param energies: array with shape ``(nenergies,)`` of the energies in the same units as the coefficients.
+    :param a_coefficients: array with shape ``(nkpoints, niterations)`` of the ``a`` coefficients, padded with zeros.
+    :param b_coefficients: array with shape ``(nkpoints, niterations)`` of the ``b`` coefficients, padded with zeros.
+    :param ncalcv: array with shape ``(nkpoints,)`` with the number of computed iterations of each k-point.
+    :param xnorm: array with shape ``(nkpoints,)`` with the norm of the initial Lanczos vector of each k-point.
+    :param weights: array with shape ``(nkpoints,)`` with the weights of the k-points.
+    :param gamma: the broadening, either a scalar or an array with shape ``(nenergies,)``.
+    :param terminator: whether to terminate the continued fractions with a square root terminator.
+    :return: array with shape ``(nenergies,)`` with the spectrum.
+    """
+    # pylint: disable=too-many-arguments
+    a_coefficients = np.atleast_2d(a_coefficients)
+    b_coefficients = np.atleast_2d(b_coefficients)
+    ncalcv = np.asarray(ncalcv, dtype=int)
+    energies = np.asarray(energies, dtype=float) + 1j * np.asarray(gamma, dtype=float)
+
+    if terminator:
+        fraction = get_terminator(energies, a_coefficients, b_coefficients, ncalcv)
+    else:
+        fraction = np.zeros((len(ncalcv), len(energies)), dtype=complex)
+
+    for iteration in range(a_coefficients.shape[1] - 1, -1, -1):
+        computed = (iteration < ncalcv)[:, None]
+        denominator = energies[None, :] - a_coefficients[:, iteration, None]
+        denominator = denominator - b_coefficients[:, iteration, None]**2 * fraction
+        fraction = np.where(computed, 1 / denominator, fraction)
+
+    prefactors = np.asarray(weights, dtype=float) * np.asarray(xnorm, dtype=float)**2
+
+    return -(prefactors @ fraction).imag / np.pi
+
+
+def get_broadening(energies, parameters):
+    """Return the broadening of the spectrum at the given energies, as defined by the ``PLOT`` namelist.
+
+    :param energies: array of energies relative to the energy zero of the spectrum in eV.
+    :param parameters: dictionary with the ``PLOT`` namelist.
+    :return: the broadening in eV, either as a scalar or as an array with the same shape as ``energies``.
+    :raises ValueError: if the ``gamma_mode`` is not supported.
+    """
+    gamma_mode = parameters.get('gamma_mode', DEFAULT_PLOT_PARAMETERS['gamma_mode'])
+
+    if gamma_mode == 'constant':
+        return parameters.get('xgamma', DEFAULT_PLOT_PARAMETERS['xgamma'])
+
+    if gamma_mode == 'variable':
+        gamma_energies = [parameters['gamma_energy(1)'], parameters['gamma_energy(2)']]
+        gamma_values = [parameters['gamma_value(1)'], parameters['gamma_value(2)']]
+        return np.interp(energies, gamma_energies, gamma_values)
+
+    raise ValueError(f'the `gamma_mode` `{gamma_mode}` is not supported, use `constant` or `variable`.')
+
+
+@calcfunction
+def get_xspectra_replot(lanczos_coefficients, output_parameters, parameters):
+    """Compute the XANES spectrum of an ``XspectraCalculation`` again, with the broadening of a new ``PLOT`` namelist.
+
+    This does the same as a replot with xspectra.x, i.e. with ``xonly_plot = .true.``, but without running a separate
+    calculation: the continued fractions are evaluated from the Lanczos coefficients of the calculation. For
+    spin-polarised calculations, the first half of the k-points is taken to be spin up and the second half spin down,
+    as in the ordering of the k-points in Quantum ESPRESSO. The cutting of the occupied states (``cut_occ_states``) is
+    not supported.
+
+    The spectrum is normalised as the dipole cross-section ``4 pi^2 alpha hbar omega sum_k w_k xnorm_k^2 (-Im G_k / pi)``
+    in atomic units (bohr^2), where the photon energy ``hbar omega`` is the energy of the final state minus the
+    ``core_level_energy`` reported by xspectra.x. The weights of the k-points add up to the number of electrons per
+    state, i.e. two for calculations without spin polarisation and one for each spin channel otherwise, as in Quantum
+    ESPRESSO.
+
+    .. warning:: neither the Lanczos coefficients read from the save file nor this normalisation have been compared
+        with a replot by xspectra.x yet, which is why the ``XspectraCoreWorkChain`` still replots with xspectra.x.
+
+    :param lanczos_coefficients: the ``lanczos_coefficients`` output of the ``XspectraCalculation``.
+    :param output_parameters: the ``output_parameters`` output of the ``XspectraCalculation``.
+    :param parameters: a Dict with the ``PLOT`` namelist that defines the energy grid and the broadening.
+    :returns: the spectrum as an ``XyData`` with the same arrays as the ``spectra`` of the ``XspectraCalculation``
+        and a copy of the ``output_parameters``.
+    :raises ValueError: if the ``output_parameters`` do not contain the ``core_level_energy``.
+    """
+    plot_parameters = {**DEFAULT_PLOT_PARAMETERS, **parameters.get_dict()}
+    calculation_parameters = output_parameters.get_dict()
+
+    energy_zero = float(plot_parameters.get('xe0', calculation_parameters.get('energy_zero', 0.0)))
+    energies = np.linspace(plot_parameters['xemin'], plot_parameters['xemax'], int(plot_parameters['xnepoint']))
+    gamma = get_broadening(energies, plot_parameters)
+
+    if 'core_level_energy' not in calculation_parameters:
+        raise ValueError('the `output_parameters` do not contain the `core_level_energy` to normalise the spectrum.')
+
+    photon_energies = (energies + energy_zero - float(calculation_parameters['core_level_energy'])) / CONSTANTS.ry_to_ev
+    prefactor = 4 * np.pi**2 * FINE_STRUCTURE_CONSTANT * photon_energies
+
+    arrays = {name: lanczos_coefficients.get_array(name) for name in lanczos_coefficients.get_arraynames()}
+    number_of_kpoints = len(arrays['ncalcv'])
+
+    if calculation_parameters.get('lsda', False):
+        occupation = 1
+        channels = {
+            'sigma_up': slice(0, number_of_kpoints // 2),
+            'sigma_down': slice(number_of_kpoints // 2, number_of_kpoints),
+        }
+    else:
+        occupation = 2
+        channels = {'sigma': slice(0, number_of_kpoints)}
+
+    spectra = {}
+
+    for name, kpoints in channels.items():
+        weights = arrays['weights'][kpoints]
+        spectra[name] = prefactor * get_lanczos_spectrum(
+            (energies + energy_zero) / CONSTANTS.ry_to_ev,
+            arrays['a'][kpoints],
+            arrays['b'][kpoints],
+            arrays['ncalcv'][kpoints],
+            arrays['xnorm'][kpoints],
+            occupation * weights / weights.sum(),
+            np.asarray(gamma) / CONSTANTS.ry_to_ev,
+            terminator=plot_parameters['terminator'],
+        )
+
+    if len(spectra) == 2:
+        spectra = {'sigma_tot': spectra['sigma_up'] + spectra['sigma_down'], **spectra}
+
+    output_spectra = orm.XyData()
+    output_spectra.set_x(energies, 'energy', 'eV')
+    output_spectra.set_y(list(spectra.values()), list(spectra.keys()), ['n/a'] * len(spectra))
+
+    calculation_parameters['xonly_plot'] = True
+
+    return {'spectra': output_spectra, 'output_parameters': orm.Dict(calculation_parameters)}
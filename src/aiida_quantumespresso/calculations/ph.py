@@ -57,6 +57,9 @@ class PhCalculation(CalcJob):
         spec.input('parent_folder', valid_type=orm.RemoteData,
             help='the folder of a completed `PwCalculation`')
         spec.output('output_parameters', valid_type=orm.Dict)
+        spec.output('output_dynamical_matrices', valid_type=orm.ArrayData, required=False,
+            help='The q-points, frequencies, eigenvectors and, if known, symmetry labels of the modes of the dynamical '
+                 'matrices, stacked into arrays with the q-points along the first axis.')
         spec.default_output_node = 'output_parameters'
 
         # Unrecoverable errors: required retrieved files could not be read, parsed or are otherwise incomplete
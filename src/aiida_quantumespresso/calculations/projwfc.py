@@ -47,6 +47,9 @@ class ProjwfcCalculation(NamelistsCalculation):
         from aiida.orm import BandsData, ProjectionData
         super().define(spec)
         spec.input('parent_folder', valid_type=(RemoteData, FolderData), help='The output folder of a pw.x calculation')
+        spec.input('metadata.options.keep_pdos_files', valid_type=bool, default=True,
+            help='If `False`, the pdos files are only retrieved temporarily for parsing and not stored in the '
+                 'retrieved folder, which also allows the parser to read them concurrently.')
         spec.output('output_parameters', valid_type=Dict)
         spec.output('Dos', valid_type=XyData)
         # if spin
@@ -73,3 +76,20 @@ class ProjwfcCalculation(NamelistsCalculation):
         spec.exit_code(340, 'ERROR_PARSING_PROJECTIONS',
             message='An exception was raised parsing bands and projections.')
         # yapf: enable
+
+    def prepare_for_submission(self, folder):
+        """Prepare the calculation job for submission by transforming input nodes into input files.
+
+        If the pdos files should not be kept, they are moved from the retrieve list to the temporary retrieve list.
+
+        :param folder: a sandbox folder to temporarily write files on disk.
+        :return: :class:`~aiida.common.datastructures.CalcInfo` instance.
+        """
+        calcinfo = super().prepare_for_submission(folder)
+
+        if not self.inputs.metadata.options.keep_pdos_files:
+            retrieve_list = calcinfo.retrieve_list
+            calcinfo.retrieve_list = [item for item in retrieve_list if item not in self._internal_retrieve_list]
+            calcinfo.retrieve_temporary_list = calcinfo.retrieve_temporary_list + self._internal_retrieve_list
+
+        return calcinfo
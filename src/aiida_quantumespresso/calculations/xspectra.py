@@ -5,7 +5,7 @@ import os
 
 from aiida import orm
 from aiida.common import exceptions
-from aiida.orm import Dict, SinglefileData, XyData
+from aiida.orm import ArrayData, Dict, SinglefileData, XyData
 from aiida.plugins import DataFactory
 
 from aiida_quantumespresso.calculations.namelists import NamelistsCalculation
@@ -25,7 +25,7 @@ class XspectraCalculation(NamelistsCalculation):
                          ('INPUT_XSPECTRA', 'prefix', NamelistsCalculation._PREFIX),
                          ('INPUT_XSPECTRA', 'x_save_file', _XSPECTRA_SAVE_FILE),
                          ('PLOT', 'gamma_file', _XSPECTRA_GAMMA_FILE), ('PSEUDOS', 'filecore', _Plotcore_FILENAME)]
-    _internal_retrieve_list = [_Spectrum_FILENAME]
+    _internal_retrieve_list = [_Spectrum_FILENAME, _XSPECTRA_SAVE_FILE]
     _retrieve_singlefile_list = []
     _retrieve_temporary_list = []
     _default_parser = 'quantumespresso.xspectra'
@@ -59,6 +59,13 @@ class XspectraCalculation(NamelistsCalculation):
 
         spec.output('output_parameters', valid_type=Dict)
         spec.output('spectra', valid_type=XyData)
+        spec.output(
+            'lanczos_coefficients',
+            valid_type=ArrayData,
+            required=False,
+            help='The Lanczos coefficients read from the save file, from which the spectrum can be recomputed with a '
+            'different broadening.'
+        )
         spec.default_output_node = 'output_parameters'
 
         spec.exit_code(
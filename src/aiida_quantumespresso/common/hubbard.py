@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 """Utility class and functions for HubbardStructureData."""
 # pylint: disable=no-name-in-module, invalid-name
-from typing import List, Literal, Tuple
+from typing import Dict, List, Literal, Tuple
 
+import numpy as np
 from pydantic import BaseModel, conint, constr, field_validator
 
 __all__ = ('HubbardParameters', 'Hubbard')
@@ -159,3 +160,41 @@ class Hubbard(BaseModel):
         """
         parameters = [HubbardParameters.from_tuple(value) for value in parameters]
         return Hubbard(parameters=parameters, projectors=projectors, formulation=formulation)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Return the Hubbard `parameters` in columnar form, as a dictionary of arrays.
+
+        The dictionary has a key for each field of :class:`~aiida_quantumespresso.common.hubbard.HubbardParameters`,
+        whose value is an array with the values of that field for all parameters, in order. The `translation` array
+        has shape ``(len(parameters), 3)``.
+        """
+        parameters = self.parameters
+
+        return {
+            'atom_index': np.array([params.atom_index for params in parameters], dtype=np.int64),
+            'atom_manifold': np.array([params.atom_manifold for params in parameters], dtype='U5'),
+            'neighbour_index': np.array([params.neighbour_index for params in parameters], dtype=np.int64),
+            'neighbour_manifold': np.array([params.neighbour_manifold for params in parameters], dtype='U5'),
+            'translation': np.array([params.translation for params in parameters], dtype=np.int64).reshape(-1, 3),
+            'value': np.array([params.value for params in parameters], dtype=np.float64),
+            'hubbard_type': np.array([params.hubbard_type for params in parameters], dtype='U4'),
+        }
+
+    @staticmethod
+    def from_arrays(
+        arrays: Dict[str, np.ndarray],
+        projectors: str = 'ortho-atomic',
+        formulation: str = 'dudarev',
+    ):
+        """Return a :meth:`~aiida_quantumespresso.common.hubbard.Hubbard` instance from a dictionary of arrays.
+
+        .. note:: the arrays are not validated, since they are expected to be obtained from :meth:`to_arrays`.
+
+        :param arrays: dictionary with the Hubbard parameters in columnar form, as returned by :meth:`to_arrays`.
+        """
+        keys = list(HubbardParameters.model_fields)
+        columns = [arrays[key].tolist() for key in keys]
+        columns[keys.index('translation')] = [tuple(translation) for translation in arrays['translation'].tolist()]
+
+        parameters = [HubbardParameters.model_construct(**dict(zip(keys, values))) for values in zip(*columns)]
+        return Hubbard.model_construct(parameters=parameters, projectors=projectors, formulation=formulation)
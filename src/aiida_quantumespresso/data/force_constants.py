@@ -1,5 +1,9 @@
 # -*- coding: utf-8 -*-
 """Sub class of `Data` to handle interatomic force constants produced by the Quantum ESPRESSO q2r.x code."""
+import io
+import os
+
+from aiida.common import ValidationError
 from aiida.orm import SinglefileData
 import numpy
 from qe_tools import CONSTANTS
@@ -8,22 +12,73 @@ from qe_tools import CONSTANTS
 class ForceConstantsData(SinglefileData):
     """Class to handle interatomic force constants from the Quantum ESPRESSO q2r.x code."""
 
-    def set_file(self, file, filename=None, **kwargs):
+    _FILENAME_FORCE_CONSTANTS = 'force_constants.npy'
+
+    def __init__(self, file, filename=None, store_force_constants=False, **kwargs):
+        """Construct a new instance and set the contents to that of the file.
+
+        :param file: absolute path to the file or a filelike object
+        :param filename: specify filename to use (defaults to name of provided file).
+        :param store_force_constants: if True, also store the real-space force constants as a binary array, see
+            ``set_file``.
+        """
+        # pylint: disable=redefined-builtin
+        super().__init__(None, **kwargs)
+
+        if file is not None:
+            self.set_file(file, filename, store_force_constants=store_force_constants)
+
+    def set_file(self, file, filename=None, store_force_constants=False, **kwargs):
         """Add a file to the node, parse it and set the attributes found.
 
         :param file: absolute path to the file or a filelike object
         :param filename: specify filename to use (defaults to name of provided file).
+        :param store_force_constants: if True, also parse the real-space force constants and store them in the
+            repository as a binary ``.npy`` file, such that they do not need to be parsed again when accessed.
         """
         # pylint: disable=redefined-builtin
         super().set_file(file, filename, **kwargs)
+        self._force_constants = None  # pylint: disable=attribute-defined-outside-init
 
         # Parse the force constants file
-        dictionary, _, _ = parse_q2r_force_constants_file(self.get_content().splitlines(), also_force_constants=False)
+        dictionary, force_constants, _ = parse_q2r_force_constants_file(
+            self.get_content().splitlines(), also_force_constants=store_force_constants
+        )
 
         # Add all other attributes found in the parsed dictionary
         for key, value in dictionary.items():
             self.base.attributes.set(key, value)
 
+        if store_force_constants:
+            self._set_force_constants_array(force_constants)
+
+    def _set_force_constants_array(self, force_constants):
+        """Store the real-space force constants in the repository as a binary ``.npy`` file.
+
+        :param force_constants: the array with the real-space force constants
+        """
+        handle = io.BytesIO()
+        numpy.save(handle, force_constants, allow_pickle=False)
+        handle.seek(0)
+        self.base.repository.put_object_from_filelike(handle, self._FILENAME_FORCE_CONSTANTS)
+
+    def _validate(self):
+        """Ensure that the repository contains the force constants file and, optionally, their binary array."""
+        # Skip the validation of ``SinglefileData``, which only allows the force constants file in the repository
+        super(SinglefileData, self)._validate()  # pylint: disable=bad-super-call
+
+        try:
+            filename = self.filename
+        except AttributeError as exception:
+            raise ValidationError('the `filename` attribute is not set.') from exception
+
+        objects = self.base.repository.list_object_names()
+
+        if objects not in ([filename], sorted([filename, self._FILENAME_FORCE_CONSTANTS])):
+            raise ValidationError(f'repository files {objects} do not match the `filename` attribute `{filename}`.')
+
+        return True
+
     @property
     def number_of_species(self):
         """Return the number of atom species.
@@ -88,6 +143,44 @@ class ForceConstantsData(SinglefileData):
         """
         return tuple(self.base.attributes.get('qpoints_mesh'))
 
+    @property
+    def force_constants(self):
+        """Return the real-space force constants.
+
+        The array is only read on first access and then cached on the node instance. It is loaded from the binary
+        ``.npy`` file in the repository if the node was created with the ``store_force_constants`` option of
+        ``set_file``, as is done by the ``Q2rParser``, and otherwise parsed from the force constants file. If the
+        repository backend gives access to the ``.npy`` file as a regular file on disk, as for unstored nodes and for
+        the loose objects of the disk object store, the array is memory mapped instead of read into memory. Otherwise,
+        e.g. for objects that were packed, the file is read in full.
+
+        :return: read-only array with 7 indices, of the kind C(mi1, mi2, mi3, ji1, ji2, na1, na2)
+        """
+        force_constants = getattr(self, '_force_constants', None)
+
+        if force_constants is not None:
+            return force_constants
+
+        filename = self._FILENAME_FORCE_CONSTANTS
+
+        if filename in self.base.repository.list_object_names():
+            with self.base.repository.open(filename, mode='rb') as handle:
+                filepath = getattr(handle, 'name', None)
+
+                if isinstance(handle, io.BufferedReader) and isinstance(filepath, str) and os.path.isfile(filepath):
+                    force_constants = numpy.load(filepath, mmap_mode='r', allow_pickle=False)
+                else:
+                    force_constants = numpy.load(io.BytesIO(handle.read()), allow_pickle=False)
+        else:
+            _, force_constants, _ = parse_q2r_force_constants_file(
+                self.get_content().splitlines(), also_force_constants=True
+            )
+
+        force_constants.flags.writeable = False
+        self._force_constants = force_constants  # pylint: disable=attribute-defined-outside-init
+
+        return force_constants
+
 
 def parse_q2r_force_constants_file(lines, also_force_constants=False):
     """Parse the real-space interatomic force constants file from QE-Q2R.
@@ -204,32 +297,48 @@ def parse_q2r_force_constants_file(lines, also_force_constants=False):
 
         force_constants = ()
         if also_force_constants:
-            # read force_constants
-            force_constants = numpy.zeros(qpoints_mesh + (3, 3, nat, nat), dtype=float)
-            for ji1 in range(3):
-                for ji2 in range(3):
-                    for na1 in range(nat):
-                        for na2 in range(nat):
+            force_constants = parse_q2r_force_constants_block(lines[current_line:], qpoints_mesh, nat)
 
-                            indices = tuple(int(c) for c in lines[current_line].split())
-                            current_line += 1
-                            if (ji1 + 1, ji2 + 1, na1 + 1, na2 + 1) != indices:
-                                raise ValueError('Wrong indices in force constants')
+    except (IndexError, ValueError) as exc:
+        raise ValueError(str(exc) + '\nForce constants file could not be parsed (incorrect file format)') from exc
 
-                            for mi3 in range(qpoints_mesh[2]):
-                                for mi2 in range(qpoints_mesh[1]):
-                                    for mi1 in range(qpoints_mesh[0]):
+    return parsed_data, force_constants, warnings
 
-                                        line = lines[current_line].split()
-                                        indices = tuple(int(c) for c in line[:3])
 
-                                        if (mi1 + 1, mi2 + 1, mi3 + 1) != indices:
-                                            raise ValueError('Wrong supercell indices in force constants')
+def parse_q2r_force_constants_block(lines, qpoints_mesh, number_of_atoms):
+    """Parse the block with the real-space force constants of a file written by QE-Q2R.
 
-                                        force_constants[mi1, mi2, mi3, ji1, ji2, na1, na2] = float(line[3])
-                                        current_line += 1
+    For each pair of displacement axes and atoms, the block contains a line with the indices ``ji1 ji2 na1 na2``,
+    followed by a line ``mi1 mi2 mi3 C`` for each point of the supercell, where ``mi1`` runs fastest. Since every line
+    contains four numbers, the whole block is converted in a single pass, after which the indices are checked at once.
 
-    except (IndexError, ValueError) as exc:
-        raise ValueError(str(exc) + '\nForce constants file could not be parsed (incorrect file format)') from exc
+    :param lines: the lines of the file, starting with the first line of the block
+    :param qpoints_mesh: length-3 tuple with number of qpoints in each dimension of the reciprocal lattice
+    :param number_of_atoms: the number of atoms in the cell
+    :return: the real-space force constants: array with 7 indices, of the kind C(mi1, mi2, mi3, ji1, ji2, na1, na2)
+    :raises ValueError: if the block is incomplete or contains the wrong indices
+    """
+    nr1, nr2, nr3 = qpoints_mesh
+    number_of_headers = 9 * number_of_atoms**2
+    number_of_lines = number_of_headers * (nr1 * nr2 * nr3 + 1)
 
-    return parsed_data, force_constants, warnings
+    values = numpy.fromstring(' '.join(lines[:number_of_lines]), sep=' ')
+
+    if values.size != 4 * number_of_lines:
+        raise ValueError('Wrong number of values in force constants')
+
+    values = values.reshape(number_of_headers, nr1 * nr2 * nr3 + 1, 4)
+
+    # The headers (ji1, ji2, na1, na2) are written with na2 running fastest
+    indices = numpy.indices((3, 3, number_of_atoms, number_of_atoms)).reshape(4, -1).T + 1
+    if not numpy.array_equal(values[:, 0, :], indices):
+        raise ValueError('Wrong indices in force constants')
+
+    # The supercell indices (mi1, mi2, mi3) are written with mi1 running fastest
+    indices = numpy.indices((nr3, nr2, nr1)).reshape(3, -1).T[:, ::-1] + 1
+    if not (values[:, 1:, :3] == indices).all():
+        raise ValueError('Wrong supercell indices in force constants')
+
+    force_constants = values[:, 1:, 3].reshape(3, 3, number_of_atoms, number_of_atoms, nr3, nr2, nr1)
+
+    return numpy.ascontiguousarray(force_constants.transpose(6, 5, 4, 0, 1, 2, 3))
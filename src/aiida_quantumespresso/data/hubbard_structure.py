@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 """Data plugin that represents a crystal structure with Hubbard parameters."""
+import contextlib
+import io
 import json
 from typing import List, Tuple, Union
 
@@ -12,10 +14,43 @@ from aiida_quantumespresso.common.hubbard import Hubbard, HubbardParameters
 __all__ = ('HubbardStructureData',)
 
 
+class HubbardParametersBuffer:
+    """In-memory Hubbard parameters of a ``HubbardStructureData``, indexed on their values for deduplication.
+
+    The parameters are stored in an insertion-ordered dictionary whose keys are the tuples of the parameters, such that
+    checking whether a parameter is already present, and moving it to the end, takes constant time.
+    """
+
+    def __init__(self, hubbard: Hubbard, number_of_sites: int):
+        """Construct a new instance.
+
+        :param hubbard: the :class:`~aiida_quantumespresso.common.hubbard.Hubbard` to initialize the buffer with
+        :param number_of_sites: the number of sites of the structure
+        """
+        self.parameters = {parameters.to_tuple(): parameters for parameters in hubbard.parameters}
+        self.projectors = hubbard.projectors
+        self.formulation = hubbard.formulation
+        self.number_of_sites = number_of_sites
+        self.periodic_sites = None
+        self.is_modified = False
+
+    def to_hubbard(self) -> Hubbard:
+        """Return the :class:`~aiida_quantumespresso.common.hubbard.Hubbard` with the parameters in the buffer."""
+        return Hubbard.model_construct(
+            parameters=list(self.parameters.values()), projectors=self.projectors, formulation=self.formulation
+        )
+
+
 class HubbardStructureData(StructureData):
-    """Structure data containing code agnostic info on Hubbard parameters."""
+    """Structure data containing code agnostic info on Hubbard parameters.
+
+    The Hubbard parameters are stored in the repository in columnar form, as a ``.npz`` file with an array for each
+    field of the :class:`~aiida_quantumespresso.common.hubbard.HubbardParameters`. Nodes that were created with earlier
+    versions store them as a JSON file instead, which can still be read.
+    """
 
-    _hubbard_filename = 'hubbard.json'
+    _hubbard_filename = 'hubbard.npz'
+    _hubbard_filename_json = 'hubbard.json'
 
     def __init__(
         self,
@@ -59,9 +94,22 @@ class HubbardStructureData(StructureData):
 
         :returns: a :class:`~aiida_quantumespresso.common.hubbard.Hubbard` instance.
         """
+        buffer = getattr(self, '_hubbard_buffer', None)
+
+        if buffer is not None:
+            return buffer.to_hubbard()
+
         # pylint: disable=not-context-manager
-        with self.base.repository.open(self._hubbard_filename, mode='rb') as handle:
-            return Hubbard.model_validate_json(json.load(handle))
+        if self._hubbard_filename_json in self.base.repository.list_object_names():
+            with self.base.repository.open(self._hubbard_filename_json, mode='rb') as handle:
+                return Hubbard.model_validate_json(json.load(handle))
+
+        content = self.base.repository.get_object_content(self._hubbard_filename, mode='rb')
+
+        with np.load(io.BytesIO(content), allow_pickle=False) as arrays:
+            projectors = arrays['projectors'].item()
+            formulation = arrays['formulation'].item()
+            return Hubbard.from_arrays(arrays, projectors=projectors, formulation=formulation)
 
     @hubbard.setter
     def hubbard(self, hubbard: Hubbard):
@@ -69,8 +117,45 @@ class HubbardStructureData(StructureData):
         if not isinstance(hubbard, Hubbard):
             raise ValueError('the input is not of type `Hubbard`')
 
-        serialized = json.dumps(hubbard.model_dump_json())
-        self.base.repository.put_object_from_bytes(serialized.encode('utf-8'), self._hubbard_filename)
+        buffer = getattr(self, '_hubbard_buffer', None)
+
+        if buffer is not None:
+            self._hubbard_buffer = HubbardParametersBuffer(hubbard, buffer.number_of_sites)
+            self._hubbard_buffer.is_modified = True
+            return
+
+        handle = io.BytesIO()
+        np.savez(handle, projectors=hubbard.projectors, formulation=hubbard.formulation, **hubbard.to_arrays())
+        self.base.repository.put_object_from_bytes(handle.getvalue(), self._hubbard_filename)
+
+        if self._hubbard_filename_json in self.base.repository.list_object_names():
+            self.base.repository.delete_object(self._hubbard_filename_json)
+
+    @contextlib.contextmanager
+    def edit_hubbard_parameters(self):
+        """Context manager to edit the Hubbard parameters in memory, which are only written to the repository on exit.
+
+        Within the context, the Hubbard parameters are held in a buffer that is indexed on their values, such that
+        appending a parameter takes constant time instead of reading, checking and writing all parameters each time.
+        This is useful when many parameters are added at once, e.g. for the intersite parameters of a large supercell.
+        If an exception is raised within the context, the changes are discarded. Nested contexts share the buffer of
+        the outermost one.
+        """
+        if getattr(self, '_hubbard_buffer', None) is not None:
+            yield
+            return
+
+        # pylint: disable=attribute-defined-outside-init
+        self._hubbard_buffer = HubbardParametersBuffer(self.hubbard, len(self.base.attributes.get('sites', [])))
+
+        try:
+            yield
+            buffer = self._hubbard_buffer
+        finally:
+            self._hubbard_buffer = None
+
+        if buffer.is_modified:
+            self.hubbard = buffer.to_hubbard()
 
     @staticmethod
     def from_structure(
@@ -111,48 +196,52 @@ class HubbardStructureData(StructureData):
         :param hubbard_type: hubbard type (U, V, J, ...), defaults to 'Ueff'
             (see :class:`~aiida_quantumespresso.common.hubbard.Hubbard` for full allowed values)
         """
-        sites = [
-            PeriodicSite(
-                species=site.species,
-                coords=site.coords,
-                lattice=Lattice(self.cell, pbc=self.pbc),
-                coords_are_cartesian=True
-            ) for site in self.get_pymatgen().sites
-        ]
-
-        if any((atom_index > len(sites) - 1, neighbour_index > len(sites) - 1)):
-            raise ValueError(
-                'atom_index and neighbour_index must be within the range of the number of sites in the structure'
-            )
+        with self.edit_hubbard_parameters():
+            buffer = self._hubbard_buffer
 
-        if translation is None:
-            _, translation = sites[atom_index].distance_and_image(sites[neighbour_index])
-            translation = np.array(translation, dtype=np.int64).tolist()
+            if any((atom_index > buffer.number_of_sites - 1, neighbour_index > buffer.number_of_sites - 1)):
+                raise ValueError(
+                    'atom_index and neighbour_index must be within the range of the number of sites in the structure'
+                )
 
-        hp_tuple = (atom_index, atom_manifold, neighbour_index, neighbour_manifold, value, translation, hubbard_type)
-        parameters = HubbardParameters.from_tuple(hp_tuple)
-        hubbard = self.hubbard
+            if translation is None:
+                if buffer.periodic_sites is None:
+                    buffer.periodic_sites = [
+                        PeriodicSite(
+                            species=site.species,
+                            coords=site.coords,
+                            lattice=Lattice(self.cell, pbc=self.pbc),
+                            coords_are_cartesian=True
+                        ) for site in self.get_pymatgen().sites
+                    ]
+                sites = buffer.periodic_sites
+                _, translation = sites[atom_index].distance_and_image(sites[neighbour_index])
+                translation = np.array(translation, dtype=np.int64).tolist()
 
-        if parameters in hubbard.parameters:
-            hubbard.parameters.remove(parameters)
+            parameters = HubbardParameters.from_tuple(
+                (atom_index, atom_manifold, neighbour_index, neighbour_manifold, value, translation, hubbard_type)
+            )
+            key = parameters.to_tuple()
 
-        hubbard.parameters.append(parameters)
-        self.hubbard = hubbard
+            buffer.parameters.pop(key, None)
+            buffer.parameters[key] = parameters
+            buffer.is_modified = True
 
     def pop_hubbard_parameters(self, index: int):
         """Pop Hubbard parameters in the list.
 
         :param index: index of the Hubbard parameters to pop
         """
-        hubbard = self.hubbard
-        hubbard.parameters.pop(index)
-        self.hubbard = hubbard
+        with self.edit_hubbard_parameters():
+            buffer = self._hubbard_buffer
+            buffer.parameters.pop(list(buffer.parameters)[index])
+            buffer.is_modified = True
 
     def clear_hubbard_parameters(self):
         """Clear all the Hubbard parameters."""
-        hubbard = self.hubbard
-        hubbard.parameters = []
-        self.hubbard = hubbard
+        with self.edit_hubbard_parameters():
+            self._hubbard_buffer.parameters.clear()
+            self._hubbard_buffer.is_modified = True
 
     def initialize_intersites_hubbard(
         self,
@@ -189,14 +278,14 @@ class HubbardStructureData(StructureData):
         if atom_indices is None or neigh_indices is None:
             raise ValueError('species or kind names not in structure')
 
-        for atom_index in atom_indices:
-            for neighbour_index in neigh_indices:
-                _, translation = sites[atom_index].distance_and_image(sites[neighbour_index])
-                translation = np.array(translation, dtype=np.int64).tolist()
-                args = (
-                    atom_index, atom_manifold, neighbour_index, neighbour_manifold, value, translation, hubbard_type
-                )
-                self.append_hubbard_parameter(*args)
+        with self.edit_hubbard_parameters():
+            for atom_index in atom_indices:
+                for neighbour_index in neigh_indices:
+                    _, translation = sites[atom_index].distance_and_image(sites[neighbour_index])
+                    translation = np.array(translation, dtype=np.int64).tolist()
+                    self.append_hubbard_parameter(
+                        atom_index, atom_manifold, neighbour_index, neighbour_manifold, value, translation, hubbard_type
+                    )
 
     def initialize_onsites_hubbard(
         self,
@@ -222,9 +311,10 @@ class HubbardStructureData(StructureData):
         if atom_indices is None:
             raise ValueError('species or kind names not in structure')
 
-        for atom_index in atom_indices:
-            args = (atom_index, atom_manifold, atom_index, atom_manifold, value, [0, 0, 0], hubbard_type)
-            self.append_hubbard_parameter(*args)
+        with self.edit_hubbard_parameters():
+            for atom_index in atom_indices:
+                args = (atom_index, atom_manifold, atom_index, atom_manifold, value, [0, 0, 0], hubbard_type)
+                self.append_hubbard_parameter(*args)
 
     def _get_one_kind_index(self, kind_name: str) -> List[int]:
         """Return the first site index matching with `kind_name`."""
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""Sub class of `ProjectionData` to store the projections produced by the Quantum ESPRESSO projwfc.x code sparsely."""
+import re
+
+from aiida.common import ValidationError
+from aiida.orm import ProjectionData
+import numpy
+
+
+class SparseProjectionData(ProjectionData):
+    """Class to store the projections onto atomic orbitals from the Quantum ESPRESSO projwfc.x code sparsely.
+
+    Instead of a dense ``(nkpoints, nbands)`` array for each orbital, the projections are stored as a single matrix in
+    compressed sparse row (CSR) format, with a row for each orbital and a column for each pair of k-point and band.
+    Since projwfc.x only prints the coefficients above a threshold, most of them are zero. The energy grid of the
+    projected density of states is shared by all orbitals and stored once, next to a single array with the projected
+    density of states of all orbitals.
+
+    The dense arrays of ``ProjectionData`` are rebuilt on access, either through ``get_projections`` and ``get_pdos`` or
+    through ``get_array`` with their usual names, e.g. ``proj_array_0``.
+    """
+
+    _REGEX_DENSE_ARRAY_NAME = re.compile(r'^(proj|pdos|energy)_array_([0-9]+)$')
+
+    def set_sparse_projectiondata(self, list_of_orbitals, projections, energy=None, pdos=None):
+        """Set the orbitals with their projections and, optionally, their projected density of states.
+
+        :param list_of_orbitals: list of orbitals onto which the projections are computed.
+        :param projections: array with shape ``(nkpoints, nbands, norbitals)`` with the projections of all orbitals.
+        :param energy: the energy grid of the projected density of states, shared by all orbitals.
+        :param pdos: array with shape ``(norbitals, nenergy)`` with the projected density of states of all orbitals.
+        :raises ValidationError: if the shapes of the arrays do not match the number of orbitals or the energy grid.
+        """
+        projections = numpy.asarray(projections, dtype=float)
+        number_of_orbitals = len(list_of_orbitals)
+
+        if projections.ndim != 3 or projections.shape[2] != number_of_orbitals:
+            raise ValidationError('the projections do not have the shape `(nkpoints, nbands, norbitals)`.')
+
+        if (energy is None) != (pdos is None):
+            raise ValidationError('`pdos` and `energy` must always be set together.')
+
+        self.base.attributes.set('orbital_dicts', [orbital.get_orbital_dict() for orbital in list_of_orbitals])
+        self.base.attributes.set('projections_shape', list(projections.shape[:2]))
+
+        matrix = projections.reshape(-1, number_of_orbitals).T
+        rows, columns = numpy.nonzero(matrix)
+
+        self.set_array('projections_data', matrix[rows, columns])
+        self.set_array('projections_indices', columns.astype(numpy.int32))
+        self.set_array('projections_indptr', numpy.searchsorted(rows, numpy.arange(number_of_orbitals + 1)))
+
+        if pdos is not None:
+            energy = numpy.asarray(energy, dtype=float)
+            pdos = numpy.asarray(pdos, dtype=float)
+
+            if pdos.shape != (number_of_orbitals, energy.size):
+                raise ValidationError('the pdos do not have the shape `(norbitals, nenergy)`.')
+
+            self.set_array('energy', energy)
+            self.set_array('pdos', pdos)
+
+        self._sparse_projections = None  # pylint: disable=attribute-defined-outside-init
+
+    def _get_sparse_projections(self):
+        """Return the arrays of the projections in CSR format.
+
+        The arrays are cached on the node instance, such that they are only loaded once when the dense projections of
+        several orbitals are rebuilt.
+
+        :return: tuple of the ``data``, ``indices`` and ``indptr`` arrays.
+        """
+        if getattr(self, '_sparse_projections', None) is None:
+            self._sparse_projections = tuple(  # pylint: disable=attribute-defined-outside-init
+                self.get_array(f'projections_{name}') for name in ('data', 'indices', 'indptr')
+            )
+        return self._sparse_projections
+
+    def get_projection_array(self, index=None):
+        """Return the dense projections of one or all orbitals.
+
+        :param index: the index of the orbital, or ``None`` to return the projections of all orbitals.
+        :return: array with shape ``(nkpoints, nbands)`` for a single orbital, or ``(nkpoints, nbands, norbitals)``.
+        """
+        data, indices, indptr = self._get_sparse_projections()
+        shape = tuple(self.base.attributes.get('projections_shape'))
+        number_of_columns = shape[0] * shape[1]
+
+        if index is not None:
+            projection = numpy.zeros(number_of_columns)
+            projection[indices[indptr[index]:indptr[index + 1]]] = data[indptr[index]:indptr[index + 1]]
+            return projection.reshape(shape)
+
+        number_of_orbitals = len(indptr) - 1
+        projections = numpy.zeros((number_of_orbitals, number_of_columns))
+        projections[numpy.repeat(numpy.arange(number_of_orbitals), numpy.diff(indptr)), indices] = data
+
+        return projections.T.reshape(shape + (number_of_orbitals,))
+
+    def get_projections(self, **kwargs):
+        """Return the dense projections of all orbitals that correspond to the kwargs.
+
+        :param kwargs: inputs describing the orbitals, as in ``get_orbitals``.
+        :return: a list of tuples with the orbital and its projection array.
+        """
+        retrieve_indices, all_orbitals = self._find_orbitals_and_indices(**kwargs)
+        return [(all_orbitals[i], self.get_projection_array(i)) for i in retrieve_indices]
+
+    def get_pdos(self, **kwargs):
+        """Return the projected density of states of all orbitals that correspond to the kwargs.
+
+        :param kwargs: inputs describing the orbitals, as in ``get_orbitals``.
+        :return: a list of tuples with the orbital, its pdos array and the energy array.
+        """
+        retrieve_indices, all_orbitals = self._find_orbitals_and_indices(**kwargs)
+        pdos = self.get_array('pdos')
+        energy = self.get_array('energy')
+        return [(all_orbitals[i], pdos[i], energy) for i in retrieve_indices]
+
+    def get_array(self, name):
+        """Return an array, rebuilding the dense arrays of ``ProjectionData`` from the stored arrays if requested.
+
+        :param name: the name of the array.
+        :return: the array.
+        """
+        match = self._REGEX_DENSE_ARRAY_NAME.match(name)
+
+        if match is None or name in self.get_arraynames():
+            return super().get_array(name)
+
+        prefix, index = match.group(1), int(match.group(2))
+
+        if index >= len(self.base.attributes.get('orbital_dicts', [])):
+            return super().get_array(name)
+
+        if prefix == 'proj':
+            return self.get_projection_array(index)
+        if prefix == 'pdos':
+            return super().get_array('pdos')[index]
+        return super().get_array('energy')
@@ -7,7 +7,7 @@ from qe_tools import CONSTANTS
 from aiida_quantumespresso.utils.mapping import get_logging_container
 
 from .base import BaseParser
-from .parse_raw.cp import parse_cp_raw_output, parse_cp_traj_stanzas
+from .parse_raw.cp import parse_cp_raw_output, parse_cp_trajectory
 
 
 class CpParser(BaseParser):
@@ -119,23 +119,18 @@ class CpParser(BaseParser):
             for name, extension, scale, elements in trajectories:
                 try:
                     with retrieved.base.repository.open(f'{self.node.process_class._PREFIX}.{extension}') as datafile:
-                        data = [l.split() for l in datafile]
                         # POSITIONS stored in angstrom
-                    traj_data = parse_cp_traj_stanzas(
-                        num_elements=elements, splitlines=data, prepend_name=f'{name}_traj', rescale=scale
-                    )
+                        _, traj_times, traj_data = parse_cp_trajectory(datafile, elements, rescale=scale)
                     # here initialize the dictionary.
                     if extension == 'cel':
                         # NOTE: the trajectory output has the cell matrix transposed!!
-                        raw_trajectory['cells'] = numpy.array(traj_data['cells_traj_data']).transpose((0, 2, 1))
+                        raw_trajectory['cells'] = traj_data.transpose((0, 2, 1))
                     elif extension == 'str':
-                        raw_trajectory['stresses'] = numpy.array(traj_data['stresses_traj_data'])
+                        raw_trajectory['stresses'] = traj_data
                     else:
-                        raw_trajectory[f'{name}_ordered'] = self._get_reordered_array(
-                            traj_data[f'{name}_traj_data'], reordering
-                        )
+                        raw_trajectory[f'{name}_ordered'] = self._get_reordered_array(traj_data, reordering)
                     if extension == 'pos':
-                        raw_trajectory['traj_times'] = numpy.array(traj_data[f'{name}_traj_times'])
+                        raw_trajectory['traj_times'] = traj_times
                 except IOError:
                     out_dict['warnings'].append(f'Unable to open the {extension.upper()} file... skipping.')
 
@@ -313,12 +308,14 @@ class CpParser(BaseParser):
         reordering_inverse = [_[1] for _ in sorted_indexed_reordering]
         return reordering_inverse
 
-    def _get_reordered_list(self, origlist, reordering):
-        """Given a list to reorder, a list of integer positions with the new order, return the reordered list."""
-        return [origlist[e] for e in reordering]
-
     def _get_reordered_array(self, _input, reordering):
+        """Reorder the sites of an array with the sites along its second axis.
+
+        :param _input: array with shape ``(nsteps, nsites, 3)``.
+        :param reordering: list of integer positions with the new order, or ``None`` to keep the current order.
+        :return: the reordered array.
+        """
         if reordering is not None:
-            return numpy.array([self._get_reordered_list(i, reordering) for i in _input])
+            return _input[:, reordering]
         else:
-            return numpy.array(_input)
+            return _input
@@ -1,12 +1,17 @@
 # -*- coding: utf-8 -*-
+import re
+
 from aiida import orm
 from qe_tools import CONSTANTS
 
 from aiida_quantumespresso.calculations.matdyn import MatdynCalculation
+from aiida_quantumespresso.parsers.parse_raw.base import convert_numbers_to_array
 from aiida_quantumespresso.utils.mapping import get_logging_container
 
 from .base import BaseParser
 
+REGEX_ATTACHED_NUMBERS = re.compile(r'([\d.])-')
+
 
 class MatdynParser(BaseParser):
     """``Parser`` implementation for the ``MatDynCalculation`` calculation job class."""
@@ -62,6 +67,10 @@ class MatdynParser(BaseParser):
 def parse_raw_matdyn_phonon_file(phonon_frequencies):
     """Parses the phonon frequencies file.
 
+    The file consists of a header with the number of bands and k-points, followed by a record for each k-point with
+    its three coordinates and the frequencies of all bands. All numbers are converted in a single pass, after which the
+    records are split with array operations.
+
     :param phonon_frequencies: phonon frequencies file from the matdyn calculation
 
     :return dict parsed_data: keys:
@@ -69,10 +78,6 @@ def parse_raw_matdyn_phonon_file(phonon_frequencies):
          * num_kpoints: number of kpoints read from the file
          * phonon_bands: BandsData object with the bands for each kpoint
     """
-    import re
-
-    import numpy
-
     parsed_data = {}
     parsed_data['warnings'] = []
 
@@ -85,43 +90,28 @@ def parse_raw_matdyn_phonon_file(phonon_frequencies):
         parsed_data['warnings'].append('Number of bands or kpoints unreadable in phonon frequencies file')
         return parsed_data
 
-    # initialize array of frequencies
-    freq_matrix = numpy.zeros((num_kpoints, num_bands))
-
-    split_data = phonon_frequencies.split()
     # discard the header of the file
-    raw_data = split_data[split_data.index('/') + 1:]
+    raw_data = phonon_frequencies.split('/', 1)[1]
 
-    # try to improve matdyn deficiencies
-    corrected_data = []
-    for b in raw_data:
-        try:
-            corrected_data.append(float(b))
-        except ValueError:
-            # case in which there are two frequencies attached like -1204.1234-1020.536
-            if '-' in b:
-                c = re.split('(-)', b)
-                d = [i for i in c if i != '']
-                for i in range(0, len(d), 2):  # d should have an even number of elements
-                    corrected_data.append(float(d[i] + d[i + 1]))
-            else:
-                # I don't know what to do
-                parsed_data['warnings'].append('Bad formatting of frequencies')
-                return parsed_data
-
-    counter = 3
-    for i in range(num_kpoints):
-        for j in range(num_bands):
-            try:
-                freq_matrix[i, j] = corrected_data[counter] * CONSTANTS.invcm_to_THz  # from cm-1 to THz
-            except ValueError:
-                parsed_data['warnings'].append('Error while parsing the frequencies')
-            except IndexError:
-                parsed_data['warnings'].append('Error while parsing the frequencies, dimension exceeded')
-                return parsed_data
-            counter += 1
-        counter += 3  # move past the kpoint coordinates
-
-    parsed_data['phonon_bands'] = freq_matrix
+    # matdyn can print two frequencies attached like -1204.1234-1020.536, so separate them before the conversion
+    if raw_data.count('-') > raw_data.count(' -') + raw_data.count('\n-'):
+        raw_data = REGEX_ATTACHED_NUMBERS.sub(r'\1 -', raw_data)
+
+    try:
+        values = convert_numbers_to_array(raw_data)
+    except ValueError:
+        parsed_data['warnings'].append('Bad formatting of frequencies')
+        return parsed_data
+
+    # each record consists of the three coordinates of the kpoint followed by the frequencies
+    record_size = num_bands + 3
+
+    if values.size < num_kpoints * record_size:
+        parsed_data['warnings'].append('Error while parsing the frequencies, dimension exceeded')
+        return parsed_data
+
+    records = values[:num_kpoints * record_size].reshape(num_kpoints, record_size)
+
+    parsed_data['phonon_bands'] = records[:, 3:] * CONSTANTS.invcm_to_THz  # from cm-1 to THz
 
     return parsed_data
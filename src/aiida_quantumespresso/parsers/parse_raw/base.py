@@ -1,10 +1,138 @@
 # -*- coding: utf-8 -*-
 """A basic parser for the common format of QE."""
 import re
+import warnings
 
 from aiida.orm import StructureData
+import numpy
 
-__all__ = ('convert_qe_time_to_sec', 'convert_qe_to_aiida_structure', 'convert_qe_to_kpoints')
+__all__ = (
+    'GrowableArray', 'convert_numbers_to_array', 'convert_qe_time_to_sec', 'convert_qe_to_aiida_structure',
+    'convert_qe_to_kpoints', 'read_numeric_array'
+)
+
+
+class GrowableArray:
+    """Array of frames with a fixed shape, to which frames can be appended one by one.
+
+    The frames are stored in a preallocated buffer, whose capacity is doubled whenever it is full, such that appending
+    takes amortised constant time. The frames that were appended are available as a view of the buffer, which is also
+    what is returned when converting the instance with ``numpy.asarray``, so no copy is made.
+    """
+
+    def __init__(self, frame_shape, dtype=numpy.float64, capacity=16):
+        """Construct a new instance.
+
+        :param frame_shape: the shape of a single frame.
+        :param dtype: the data type of the array.
+        :param capacity: the number of frames for which space is allocated initially.
+        """
+        self._buffer = numpy.empty((max(capacity, 1), *frame_shape), dtype=dtype)
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        return self.array[index]
+
+    def __array__(self, dtype=None, copy=None):
+        array = self.array if dtype is None else self.array.astype(dtype, copy=False)
+        return array.copy() if copy else array
+
+    @property
+    def array(self):
+        """Return the frames that were appended, as a view of the buffer."""
+        return self._buffer[:self._length]
+
+    def append(self, frame):
+        """Append a frame.
+
+        :param frame: array-like with the shape of the frames.
+        :raises ValueError: if the frame does not have the shape of the frames or cannot be converted to the data type.
+        """
+        frame = numpy.asarray(frame, dtype=self._buffer.dtype)
+
+        if frame.shape != self._buffer.shape[1:]:
+            raise ValueError(f'the frame has shape {frame.shape} instead of {self._buffer.shape[1:]}.')
+
+        if self._length == len(self._buffer):
+            buffer = numpy.empty((2 * len(self._buffer), *self._buffer.shape[1:]), dtype=self._buffer.dtype)
+            buffer[:self._length] = self._buffer
+            self._buffer = buffer
+
+        self._buffer[self._length] = frame
+        self._length += 1
+
+
+def convert_numbers_to_array(string):
+    """Convert a string of whitespace-separated numbers into a one-dimensional array with a single ``numpy`` call.
+
+    :param string: the string to convert.
+    :return: one-dimensional array of floats, which is empty if the string only contains whitespace.
+    :raises ValueError: if the string contains something else than numbers.
+    """
+    # ``numpy.fromstring`` returns ``[-1.]`` for a string with only whitespace, so skip those
+    if not string or string.isspace():
+        return numpy.empty(0)
+
+    # ``numpy.fromstring`` only warns if it cannot convert the string to its end, so turn that into an exception
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', DeprecationWarning)
+        try:
+            return numpy.fromstring(string, sep=' ')
+        except (DeprecationWarning, ValueError) as exception:
+            raise ValueError('the content could not be converted to numbers.') from exception
+
+
+def read_numeric_array(handle, size=None, chunk_size=2**22):
+    """Read all whitespace-separated numbers that remain in a text file handle into a one-dimensional array.
+
+    The content is read and converted with ``numpy.fromstring`` in chunks of lines, such that the text of the file is
+    never held in memory as a whole. If the number of values is known in advance, they are written directly into a
+    preallocated array.
+
+    :param handle: a file handle opened in text mode.
+    :param size: the number of values that the handle should contain, if known.
+    :param chunk_size: the number of characters that is read at once.
+    :return: one-dimensional array of floats.
+    :raises ValueError: if the content contains something else than numbers, or not ``size`` of them.
+    """
+    chunks = []
+    array = numpy.empty(size, dtype=float) if size is not None else None
+    cursor = 0
+    remainder = ''
+
+    while True:
+        text = handle.read(chunk_size)
+
+        # Do not convert the last line of the chunk unless the end of the file was reached, as it may be incomplete
+        if text:
+            head, _, remainder = (remainder + text).rpartition('\n')
+        else:
+            head, remainder = remainder, ''
+
+        values = convert_numbers_to_array(head)
+
+        if array is None:
+            chunks.append(values)
+        elif cursor + values.size > size:
+            raise ValueError(f'the content contains more than the expected {size} numbers.')
+        else:
+            array[cursor:cursor + values.size] = values
+
+        cursor += values.size
+
+        if not text and not remainder:
+            break
+
+    if array is None:
+        return numpy.concatenate(chunks)
+
+    if cursor != size:
+        raise ValueError(f'the content contains {cursor} instead of the expected {size} numbers.')
+
+    return array
 
 
 def convert_qe_time_to_sec(timestr):
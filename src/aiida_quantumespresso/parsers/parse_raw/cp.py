@@ -1,66 +1,109 @@
 # -*- coding: utf-8 -*-
+import io
+import itertools
+import warnings
 from xml.dom.minidom import parseString
 from xml.etree import ElementTree
 
+import numpy
+
 from aiida_quantumespresso.parsers import QEOutputParsingError
+from aiida_quantumespresso.parsers.parse_raw.base import convert_numbers_to_array
 from aiida_quantumespresso.parsers.parse_xml.cp.legacy import parse_cp_xml_output
 from aiida_quantumespresso.parsers.parse_xml.parse import parse_xml_post_6_2
 from aiida_quantumespresso.parsers.parse_xml.pw.legacy import parse_xml_child_integer
 from aiida_quantumespresso.parsers.parse_xml.versions import QeXmlVersion, get_xml_file_version
 
 
-def parse_cp_traj_stanzas(num_elements, splitlines, prepend_name, rescale=1.):
-    """
-    num_elements: Number of lines (with three elements) between lines with two only
-    elements (containing step number and time in ps).
-    num_elements is 3 for cell, and the number of atoms for coordinates and positions.
-
-    splitlines: a list of lines of the file, already split in pieces using string.split
+def parse_cp_trajectory(handle, num_elements, rescale=1., chunk_size=2**16):
+    """Parse a trajectory file written by ``cp.x``, such as the ``.pos``, ``.vel`` or ``.cel`` file.
 
-    prepend_name: a string to be prepended to the name of keys returned
-    in the return dictionary.
+    The file consists of a stanza for each step, with a line containing the step number and the time in ps, followed by
+    ``num_elements`` lines with three values each. The file is read in chunks of lines: the headers of the complete
+    stanzas of a chunk are validated, after which the values of all their other lines are converted in a single call.
 
-    rescale: the values in each stanza are multiplied by this factor, for units conversion
+    :param handle: a file handle of the trajectory file, opened in text mode.
+    :param num_elements: the number of lines with three values in each stanza: 3 for the cell and the stress, and the
+        number of atoms for the positions, velocities and forces.
+    :param rescale: the values in each stanza are multiplied by this factor, for units conversion.
+    :param chunk_size: the number of lines that is read at once.
+    :return: tuple of the arrays with the step numbers, the times with shape ``(nsteps,)`` and the values with shape
+        ``(nsteps, num_elements, 3)``. The time of steps for which it was printed as asterisks is set to -1.
+    :raises ValueError: if the content is not a sequence of complete stanzas.
     """
+    stanza_size = num_elements + 1
     steps = []
     times = []
-    stanzas = []
-    this_stanza = []
-    start_stanza = False
-    linenum = -1
-    try:
-        for linenum, l in enumerate(splitlines):
-            if len(l) == 2:
-                steps.append(int(l[0]))
-                if set(l[1]) == {'*'}:
-                    times.append(-1.0)
-                else:
-                    times.append(float(l[1]))
-                start_stanza = True
-                if len(this_stanza) != 0:
-                    raise ValueError('Wrong position of short line.')
-            elif len(l) == 3:
-                if len(this_stanza) == 0 and not start_stanza:
-                    raise ValueError('Wrong position of long line.')
-                start_stanza = False
-                this_stanza.append([float(l[0]) * rescale, float(l[1]) * rescale, float(l[2]) * rescale])
-                if len(this_stanza) == num_elements:
-                    stanzas.append(this_stanza)
-                    this_stanza = []
+    blocks = []
+    remainder = []
+
+    while True:
+        chunk = list(itertools.islice(handle, chunk_size))
+        lines = remainder + [line for line in chunk if not line.isspace()]
+
+        if not chunk:
+            if lines:
+                raise ValueError(f'Wrong number of lines ({len(lines)}) for the last stanza of {num_elements} lines.')
+            break
+
+        # Only convert complete stanzas, the lines of the last one may not have been read yet
+        end = len(lines) - len(lines) % stanza_size
+        lines, remainder = lines[:end], lines[end:]
+
+        for header in lines[::stanza_size]:
+            fields = header.split()
+
+            if len(fields) != 2:
+                raise ValueError(f'Wrong number of values ({len(fields)}) in the header of a stanza: {header.strip()}')
+
+            try:
+                steps.append(int(fields[0]))
+            except ValueError as exception:
+                raise ValueError(f'Wrong step number in the header of a stanza: {header.strip()}') from exception
+
+            # The time is printed as asterisks when it no longer fits in its format, which happens from 100 ps on
+            if set(fields[1]) == {'*'}:
+                times.append(-1.)
             else:
-                raise ValueError(f'Wrong line length ({len(l)})')
-        if len(this_stanza) != 0:
-            raise ValueError(f'Wrong length of last block ({len(this_stanza)} lines instead of 0).')
-        if len(steps) != len(stanzas):
-            raise ValueError('Length mismatch between number of steps and number of defined stanzas.')
-        return {
-            f'{prepend_name}_steps': steps,
-            f'{prepend_name}_times': times,
-            f'{prepend_name}_data': stanzas,
-        }
-    except Exception as e:
-        e.message = f'At line {linenum + 1}: {e}'
-        raise e
+                times.append(float(fields[1]))
+
+        del lines[::stanza_size]
+        values = convert_numbers_to_array(''.join(lines))
+
+        if values.size != len(lines) * 3:
+            raise ValueError(f'Wrong number of values ({values.size}) for stanzas of {num_elements} lines.')
+
+        blocks.append(values.reshape(-1, num_elements, 3))
+
+    values = numpy.concatenate(blocks) if blocks else numpy.empty((0, num_elements, 3))
+
+    return numpy.array(steps, dtype=int), numpy.array(times, dtype=float), values * rescale
+
+
+def parse_cp_traj_stanzas(num_elements, splitlines, prepend_name, rescale=1.):
+    """Parse the stanzas of a trajectory file written by ``cp.x`` from its lines, split into their values.
+
+    .. deprecated:: this function is deprecated, use ``parse_cp_trajectory`` instead.
+
+    :param num_elements: the number of lines with three values in each stanza.
+    :param splitlines: a list of the lines of the file, each split into its values.
+    :param prepend_name: a string to be prepended to the keys of the returned dictionary.
+    :param rescale: the values in each stanza are multiplied by this factor, for units conversion.
+    :return: dictionary with the lists of the steps, the times and the values of the stanzas.
+    """
+    warnings.warn(
+        '`parse_cp_traj_stanzas` is deprecated and will be removed soon, use `parse_cp_trajectory` instead.',
+        FutureWarning
+    )
+    steps, times, values = parse_cp_trajectory(
+        io.StringIO(''.join(' '.join(line) + '\n' for line in splitlines)), num_elements, rescale
+    )
+
+    return {
+        f'{prepend_name}_steps': steps.tolist(),
+        f'{prepend_name}_times': times.tolist(),
+        f'{prepend_name}_data': values.tolist(),
+    }
 
 
 def parse_cp_text_output(data, xml_data):
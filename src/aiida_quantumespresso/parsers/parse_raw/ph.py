@@ -6,20 +6,30 @@ without aiida and will return a dictionary with parsed keys.
 """
 from __future__ import annotations
 
+from collections.abc import Mapping
+import re
+import warnings
+
 import numpy
 from qe_tools import CONSTANTS
 
 from aiida_quantumespresso.parsers import QEOutputParsingError
-from aiida_quantumespresso.parsers.parse_raw.base import convert_qe_time_to_sec
+from aiida_quantumespresso.parsers.parse_raw.base import convert_numbers_to_array, convert_qe_time_to_sec
 from aiida_quantumespresso.parsers.parse_xml.pw.legacy import parse_xml_child_bool, read_xml_card
 
+REGEX_DYNMAT_QPOINT = re.compile(r'q = \(([^)]*)\)')
+REGEX_DYNMAT_ASTERISKS = re.compile(r'^[ \t]*\*{10,}[ \t]*$', re.MULTILINE)
+REGEX_DYNMAT_FREQUENCY = re.compile(r'(?:freq|omega)[^\n]*=\s*(\S+)\s*\[cm-1\]')
+REGEX_DYNMAT_FREQUENCY_LINE = re.compile(r'^[ \t]*(?:freq|omega)[^\n]*$', re.MULTILINE)
+
 
 def parse_raw_ph_output(stdout, logs, tensors=None, dynamical_matrices=None):
     """Parses the raw output of a Quantum ESPRESSO `ph.x` calculation.
 
     :param stdout: the content of the stdout file as a string
     :param tensors: the content of the tensors.xml file as a string
-    :param dynamical_matrices: a list of the content of the dynamical matrix files as a string
+    :param dynamical_matrices: a mapping of the index of each q-point onto the arrays of its dynamical matrix, as
+        returned by `parse_ph_dynamical_matrices`
     :returns: tuple of two dictionaries, with the parsed data and log messages, respectively
     """
     data_lines = stdout.split('\n')
@@ -34,32 +44,15 @@ def parse_raw_ph_output(stdout, logs, tensors=None, dynamical_matrices=None):
 
     out_data = parse_ph_text_output(data_lines, logs)
 
-    # parse dynamical matrices if present
+    # Only the q-point and frequencies of the dynamical matrices are added to the parsed data
     dynmat_data = {}
-    if dynamical_matrices:
-        # find lattice parameter
-        for dynmat_counter, dynmat in enumerate(dynamical_matrices):
-
-            lines = dynmat.split('\n')
-
-            # check if the file contains frequencies (i.e. is useful) or not
-            dynmat_to_parse = False
-            if not lines:
-                continue
-            try:
-                _ = [float(i) for i in lines[0].split()]
-            except ValueError:
-                dynmat_to_parse = True
-
-            if not dynmat_to_parse:
-                continue
-
-            # parse it
-            this_dynmat_data = parse_ph_dynmat(lines, logs)
-
-            # join it with the previous dynmat info
-            dynmat_data[f'dynamical_matrix_{dynmat_counter}'] = this_dynmat_data
-            # TODO: use the bands format?
+    for dynmat_counter, arrays in (dynamical_matrices or {}).items():
+        dynmat_data[f'dynamical_matrix_{dynmat_counter}'] = {
+            'q_point': arrays['q_point'].tolist(),
+            'q_point_units': '2pi/lattice_parameter',
+            'frequencies': [None if numpy.isnan(value) else value for value in arrays['frequencies'].tolist()],
+            'frequencies_units': 'cm-1',
+        }
 
     # join dictionaries, there should not be any twice repeated key
     for key in out_data.keys():
@@ -70,9 +63,6 @@ def parse_raw_ph_output(stdout, logs, tensors=None, dynamical_matrices=None):
 
     symmetry_labels = out_data.pop('symmetry_labels', {})
 
-    if len(dynmat_data) == 1 and 'dynamical_matrix_0' in dynmat_data:
-        dynmat_data['dynamical_matrix_1'] = dynmat_data.pop('dynamical_matrix_0')
-
     parsed_data = dict(list(dynmat_data.items()) + list(out_data.items()) + list(tensor_data.items()))
 
     for q_index, q_symlabels in symmetry_labels.items():
@@ -82,6 +72,96 @@ def parse_raw_ph_output(stdout, logs, tensors=None, dynamical_matrices=None):
     return parsed_data, logs
 
 
+def parse_ph_dynamical_matrices(dynamical_matrices, logs):
+    """Parse the dynamical matrix files written by a `ph.x` calculation into arrays.
+
+    Files that only contain the list of q-points, i.e. whose first line only contains numbers, are skipped. If only the
+    file of a single q-point without index is present, as for a calculation without `ldisp`, it gets the index 1.
+
+    :param dynamical_matrices: a list of the content of the dynamical matrix files as a string, or a mapping of the
+        index of their q-point onto their content
+    :param logs: the logging container, to which a warning is added for numbers that could not be converted
+    :returns: dictionary of the index of each q-point onto the arrays returned by `parse_ph_dynmat_arrays`
+    """
+    if isinstance(dynamical_matrices, Mapping):
+        dynamical_matrices = dynamical_matrices.items()
+    else:
+        dynamical_matrices = enumerate(dynamical_matrices)
+
+    parsed = {}
+
+    for index, content in dynamical_matrices:
+
+        # check if the file contains frequencies (i.e. is useful) or not
+        try:
+            _ = [float(i) for i in content.split('\n', 1)[0].split()]
+        except ValueError:
+            parsed[index] = parse_ph_dynmat_arrays(content, logs)
+
+    if len(parsed) == 1 and 0 in parsed:
+        parsed[1] = parsed.pop(0)
+
+    return parsed
+
+
+def parse_ph_dynmat_arrays(content, logs):
+    """Parse the q-point, frequencies and eigenvectors of a single dynamical matrix file into arrays.
+
+    The eigenvectors of all modes are converted in a single pass, after removing the lines with the frequencies and the
+    parentheses that enclose the displacements of each atom. Numbers that cannot be converted, e.g. because Fortran
+    wrote asterisks instead of a number that did not fit its format, are set to ``NaN`` and a warning is logged.
+
+    :param content: the content of the dynamical matrix file as a string
+    :param logs: the logging container, to which a warning is added for numbers that could not be converted
+    :returns: dictionary with the `q_point` in units of 2pi/lattice_parameter, the `frequencies` in cm-1 with shape
+        (nmodes,) and the complex `eigenvectors` with shape (nmodes, nat, 3)
+    :raises QEOutputParsingError: if the content is not that of a dynamical matrix file
+    """
+    if 'Dynamical matrix file' not in content.split('\n', 1)[0]:
+        raise QEOutputParsingError('Dynamical matrix is not in the expected format')
+
+    # The q-point is written several times, because it can also be rotated: only the first one is the computed q-point
+    match = REGEX_DYNMAT_QPOINT.search(content)
+    q_point = numpy.array(match.group(1).split() if match else [], dtype=float)
+
+    # The modes are written between two lines of asterisks after the header of the diagonalization
+    _, _, diagonalization = content.partition('Diagonalizing the dynamical matrix')
+    blocks = REGEX_DYNMAT_ASTERISKS.split(diagonalization)
+    modes = blocks[1] if len(blocks) > 1 else ''
+
+    frequencies = numpy.array([_convert_number(value) for value in REGEX_DYNMAT_FREQUENCY.findall(modes)], dtype=float)
+    displacements = REGEX_DYNMAT_FREQUENCY_LINE.sub('', modes).replace('(', ' ').replace(')', ' ')
+
+    try:
+        values = convert_numbers_to_array(displacements)
+    except ValueError:
+        values = numpy.array([_convert_number(value) for value in displacements.split()], dtype=float)
+
+    number_of_modes = len(frequencies)
+
+    if number_of_modes == 0 or values.size % (6 * number_of_modes):
+        eigenvectors = numpy.empty((number_of_modes, 0, 3), dtype=complex)
+    else:
+        values = values.reshape(number_of_modes, -1, 3, 2)
+        eigenvectors = values[..., 0] + 1j * values[..., 1]
+
+    if numpy.isnan(frequencies).any():
+        logs.warning.append('Wrong fortran formatting found while parsing frequencies')
+
+    if numpy.isnan(eigenvectors).any():
+        logs.warning.append('Wrong fortran formatting found while parsing eigenvectors')
+
+    return {'q_point': q_point, 'frequencies': frequencies, 'eigenvectors': eigenvectors}
+
+
+def _convert_number(string):
+    """Convert the given string into a float, returning ``NaN`` if it does not represent a number."""
+    try:
+        return float(string)
+    except ValueError:
+        return numpy.nan
+
+
 def parse_ph_tensor(data):
     """Parse the xml tensor file of QE v5.0.3 data must be read from the file with the .read() function (avoid
     readlines)"""
@@ -183,8 +263,8 @@ def parse_ph_text_output(lines, logs):
         return symlabel_q_point, q_data
 
     parsed_data = {}
-
-    parsed_data['num_q_found'] = 0
+    irreps_by_index = {}
+    num_irr_repr = None
 
     # Parse number of q-points and number of atoms
     for count, line in enumerate(lines):
@@ -220,11 +300,8 @@ def parse_ph_text_output(lines, logs):
                 logs.warning.append('Error while parsing number of atoms.')
 
         elif 'irreducible representations' in line:
-            if 'number_of_irr_representations_for_each_q' not in list(parsed_data.keys()):
-                parsed_data['number_of_irr_representations_for_each_q'] = []
             try:
                 num_irr_repr = int(line.split('irreducible')[0].split('are')[1])
-                parsed_data['number_of_irr_representations_for_each_q'].append(num_irr_repr)
             except Exception:
                 pass
 
@@ -244,15 +321,18 @@ def parse_ph_text_output(lines, logs):
                     parsed_data.setdefault('symmetry_labels', {})
                     parsed_data['symmetry_labels'][q_index] = q_data
 
-            parsed_data['num_q_found'] += 1
+                    # Only the q-points that were finished count, keyed on their index, since a run that stopped in the
+                    # middle of a q-point has already printed its number of irreps
+                    if num_irr_repr is not None:
+                        irreps_by_index[q_index] = num_irr_repr
+
+            num_irr_repr = None
 
     # Remove the q-points from the parsed data; these are only used to assign the symmetry labels to the right index
     parsed_data.pop('q_points', None)
 
-    # Trim the number of irreps to the number of q-points finished in this run
-    parsed_data['number_of_irr_representations_for_each_q'] = parsed_data.get(
-        'number_of_irr_representations_for_each_q', []
-    )[:parsed_data.pop('num_q_found')]
+    parsed_data['qpoint_indices'] = list(irreps_by_index)
+    parsed_data['number_of_irr_representations_for_each_q'] = list(irreps_by_index.values())
 
     return parsed_data
 
@@ -260,7 +340,10 @@ def parse_ph_text_output(lines, logs):
 def parse_ph_dynmat(data, logs, lattice_parameter=None, also_eigenvectors=False, parse_header=False):
     """Parse frequencies and eigenvectors of a single dynamical matrix.
 
+    .. deprecated:: this function is deprecated, use ``parse_ph_dynmat_arrays`` instead.
+
     :param data: the text read with the function readlines()
+    :param logs: the logging container, to which warnings are added
     :param lattice_parameter: the lattice_parameter ('alat' in QE jargon). If
         None, q_point is kept in 2pi/a coordinates as in the dynmat file.
     :param also_eigenvectors: if True, return an additional 'eigenvectors'
@@ -276,172 +359,138 @@ def parse_ph_dynmat(data, logs, lattice_parameter=None, also_eigenvectors=False,
 
     :return: a dictionary with parsed values and units
     """
+    warnings.warn(
+        '`parse_ph_dynmat` is deprecated and will be removed soon, use `parse_ph_dynmat_arrays` instead.',
+        FutureWarning
+    )
+    arrays = parse_ph_dynmat_arrays(''.join(data), logs)
     parsed_data = {}
 
-    if 'Dynamical matrix file' not in data[0]:
-        raise QEOutputParsingError('Dynamical matrix is not in the expected format')
+    if parse_header:
+        parsed_data['header'] = _parse_ph_dynmat_header(data, logs)
 
-    frequencies = []
-    eigenvectors = []
+    if arrays['q_point'].size:
+        if lattice_parameter:
+            parsed_data['q_point'] = (arrays['q_point'] * 2 * numpy.pi / lattice_parameter).tolist()
+            parsed_data['q_point_units'] = 'angstrom-1'
+        else:
+            parsed_data['q_point'] = arrays['q_point'].tolist()
+            parsed_data['q_point_units'] = '2pi/lattice_parameter'
 
-    starting_line = 1
-    if parse_header:
-        header_dict = {'warnings': []}
-        try:
-            pieces = data[2].split()
-            if len(pieces) != 9:
-                raise QEOutputParsingError('Wrong # of elements on line 3')
-            try:
-                num_species = int(pieces[0])
-                num_atoms = int(pieces[1])
-                header_dict['ibrav'] = int(pieces[2])
-                header_dict['celldm'] = [float(i) for i in pieces[3:]]
-                # In angstrom
-                alat = header_dict['celldm'][0] * CONSTANTS.bohr_to_ang
-                if abs(alat) < 1.e-5:
-                    raise QEOutputParsingError(
-                        'Lattice constant=0! Probably you are using an '
-                        'old Quantum ESPRESSO version?'
-                    )
-                header_dict['alat'] = alat
-                header_dict['alat_units'] = 'angstrom'
-            except ValueError:
-                raise QEOutputParsingError('Wrong data on line 3')
-
-            starting_line = 3
-            if header_dict['ibrav'] == 0:
-                if 'Basis vectors' not in data[3]:
-                    raise QEOutputParsingError("Wrong format (no 'Basis vectors' line)")
-                try:
-                    v1 = [float(_) * alat for _ in data[4].split()]
-                    v2 = [float(_) * alat for _ in data[5].split()]
-                    v3 = [float(_) * alat for _ in data[6].split()]
-                    if len(v1) != 3 or len(v2) != 3 or len(v3) != 3:
-                        raise QEOutputParsingError('Wrong length for basis vectors')
-                    header_dict['lattice_vectors'] = [v1, v2, v3]
-                    header_dict['lattice_vectors_units'] = 'angstrom'
-                except ValueError:
-                    raise QEOutputParsingError('Wrong data for basis vectors')
-                starting_line += 4
-
-            species_info = {}
-            species = []
-            for idx, sp_line in enumerate(data[starting_line:starting_line + num_species], start=1):
-                pieces = sp_line.split("'")
-                if len(pieces) != 3:
-                    raise QEOutputParsingError('Wrong # of elements for one of the species')
-                try:
-                    if int(pieces[0]) != idx:
-                        raise QEOutputParsingError('Error with the indices of the species')
-                    species.append([pieces[1].strip(), float(pieces[2]) / CONSTANTS.amu_Ry])
-                except ValueError:
-                    raise QEOutputParsingError('Error parsing the species')
-
-            masses = dict(species)
-            header_dict['masses'] = masses
-
-            atoms_coords = []
-            atoms_labels = []
-            starting_line += num_species
-            for idx, atom_line in enumerate(data[starting_line:starting_line + num_atoms], start=1):
-                pieces = atom_line.split()
-                if len(pieces) != 5:
-                    raise QEOutputParsingError(
-                        f'Wrong # of elements for one of the atoms: {len(pieces)}, line {starting_line + idx}: {pieces}'
-                    )
-                try:
-                    if int(pieces[0]) != idx:
-                        raise QEOutputParsingError(f'Error with the indices of the atoms: {int(pieces[0])} vs {idx}')
-                    sp_idx = int(pieces[1])
-                    if sp_idx > len(species):
-                        raise QEOutputParsingError(f'Wrong index for the species: {sp_idx}, but max={len(species)}')
-                    atoms_labels.append(species[sp_idx - 1][0])
-                    atoms_coords.append([float(pieces[2]) * alat, float(pieces[3]) * alat, float(pieces[4]) * alat])
-                except ValueError:
-                    raise QEOutputParsingError('Error parsing the atoms')
-                except IndexError:
-                    raise QEOutputParsingError('Error with the indices in the atoms section')
-            header_dict['atoms_labels'] = atoms_labels
-            header_dict['atoms_coords'] = atoms_coords
-            header_dict['atoms_coords_units'] = 'angstrom'
-
-            starting_line += num_atoms
-
-            starting_line += 1  # Got to the next line to check
-            if 'Dynamical' not in data[starting_line]:
-                raise QEOutputParsingError("Wrong format (no 'Dynamical  Matrix' line)")
-
-            ## Here I finish the header parsing
-
-        except QEOutputParsingError as e:
-            logs.warning.append(
-                'Problem parsing the header of the matdyn file! (msg: {}). '
-                'Storing only the information I managed to retrieve'.format(e.message)
-            )
-            header_dict['warnings'].append(
-                'There was some parsing error and this dictionary is '
-                'not complete, see the warnings of the top parsed_data dict'
-            )
-
-        # I store what I got
-        parsed_data['header'] = header_dict
-
-    for line_counter, line in enumerate(data[starting_line:], start=starting_line):
-        if 'q = ' in line:
-            # q point is written several times, because it can also be rotated.
-            # I consider only the first point, which is the one computed
-            if 'q_point' not in parsed_data:
-                q_point = [float(i) for i in line.split('(')[1].split(')')[0].split()]
-                if lattice_parameter:
-                    parsed_data['q_point'] = [e * 2 * numpy.pi / lattice_parameter for e in q_point]
-                    parsed_data['q_point_units'] = 'angstrom-1'
-                else:
-                    parsed_data['q_point'] = q_point
-                    parsed_data['q_point_units'] = '2pi/lattice_parameter'
-
-        if 'freq' in line or 'omega' in line:
-            this_freq = line.split('[cm-1]')[0].split('=')[-1]
-
-            # exception for bad fortran coding: *** could be written instead of the number
-            if '*' in this_freq:
-                frequencies.append(None)
-                logs.warning.append('Wrong fortran formatting found while parsing frequencies')
-            else:
-                frequencies.append(float(this_freq))
-
-            this_eigenvectors = []
-            for new_line in data[line_counter + 1:]:
-                if (
-                    'freq' in new_line or 'omega' in new_line or
-                    '************************************************' in new_line
-                ):
-                    break
-                this_things = new_line.split('(')[1].split(')')[0].split()
-                try:
-                    this_flatlist = [float(i) for i in this_things]
-                except ValueError:
-                    logs.warning.append('Wrong fortran formatting found while parsing eigenvectors')
-                    # then save the three (xyz) complex numbers as [None,None]
-                    this_eigenvectors.append([[None, None]] * 3)
-                    continue
-
-                list_tuples = list(zip(*[iter(this_flatlist)] * 2))
-                # I save every complex number as a list of two numbers
-                this_eigenvectors.append([[i[0], i[1]] for i in list_tuples])
-
-            eigenvectors.append(this_eigenvectors)
-
-    parsed_data['frequencies'] = frequencies
+    parsed_data['frequencies'] = [None if numpy.isnan(value) else value for value in arrays['frequencies'].tolist()]
     parsed_data['frequencies_units'] = 'cm-1'
-    # TODO: the eigenvectors should be written in the database according to a parser_opts.
-    # for now, we don't store them, otherwise we get too much stuff
-    # We implement anyway the possibility to get it with an optional parameter
+
     if also_eigenvectors:
-        parsed_data['eigenvectors'] = eigenvectors
+        eigenvectors = numpy.stack([arrays['eigenvectors'].real, arrays['eigenvectors'].imag], axis=-1)
+        parsed_data['eigenvectors'] = numpy.where(numpy.isnan(eigenvectors), None, eigenvectors).tolist()
 
     return parsed_data
 
 
+def _parse_ph_dynmat_header(data, logs):
+    """Parse the header of a single dynamical matrix, with the lattice, the masses of the species and the atoms.
+
+    :param data: the text read with the function readlines()
+    :param logs: the logging container, to which a warning is added if the header cannot be parsed completely
+    :return: a dictionary with the parsed values and units
+    """
+    header_dict = {'warnings': []}
+    try:
+        pieces = data[2].split()
+        if len(pieces) != 9:
+            raise QEOutputParsingError('Wrong # of elements on line 3')
+        try:
+            num_species = int(pieces[0])
+            num_atoms = int(pieces[1])
+            header_dict['ibrav'] = int(pieces[2])
+            header_dict['celldm'] = [float(i) for i in pieces[3:]]
+            # In angstrom
+            alat = header_dict['celldm'][0] * CONSTANTS.bohr_to_ang
+            if abs(alat) < 1.e-5:
+                raise QEOutputParsingError(
+                    'Lattice constant=0! Probably you are using an '
+                    'old Quantum ESPRESSO version?'
+                )
+            header_dict['alat'] = alat
+            header_dict['alat_units'] = 'angstrom'
+        except ValueError:
+            raise QEOutputParsingError('Wrong data on line 3')
+
+        starting_line = 3
+        if header_dict['ibrav'] == 0:
+            if 'Basis vectors' not in data[3]:
+                raise QEOutputParsingError("Wrong format (no 'Basis vectors' line)")
+            try:
+                v1 = [float(_) * alat for _ in data[4].split()]
+                v2 = [float(_) * alat for _ in data[5].split()]
+                v3 = [float(_) * alat for _ in data[6].split()]
+                if len(v1) != 3 or len(v2) != 3 or len(v3) != 3:
+                    raise QEOutputParsingError('Wrong length for basis vectors')
+                header_dict['lattice_vectors'] = [v1, v2, v3]
+                header_dict['lattice_vectors_units'] = 'angstrom'
+            except ValueError:
+                raise QEOutputParsingError('Wrong data for basis vectors')
+            starting_line += 4
+
+        species = []
+        for idx, sp_line in enumerate(data[starting_line:starting_line + num_species], start=1):
+            pieces = sp_line.split("'")
+            if len(pieces) != 3:
+                raise QEOutputParsingError('Wrong # of elements for one of the species')
+            try:
+                if int(pieces[0]) != idx:
+                    raise QEOutputParsingError('Error with the indices of the species')
+                species.append([pieces[1].strip(), float(pieces[2]) / CONSTANTS.amu_Ry])
+            except ValueError:
+                raise QEOutputParsingError('Error parsing the species')
+
+        masses = dict(species)
+        header_dict['masses'] = masses
+
+        atoms_coords = []
+        atoms_labels = []
+        starting_line += num_species
+        for idx, atom_line in enumerate(data[starting_line:starting_line + num_atoms], start=1):
+            pieces = atom_line.split()
+            if len(pieces) != 5:
+                raise QEOutputParsingError(
+                    f'Wrong # of elements for one of the atoms: {len(pieces)}, line {starting_line + idx}: {pieces}'
+                )
+            try:
+                if int(pieces[0]) != idx:
+                    raise QEOutputParsingError(f'Error with the indices of the atoms: {int(pieces[0])} vs {idx}')
+                sp_idx = int(pieces[1])
+                if sp_idx > len(species):
+                    raise QEOutputParsingError(f'Wrong index for the species: {sp_idx}, but max={len(species)}')
+                atoms_labels.append(species[sp_idx - 1][0])
+                atoms_coords.append([float(pieces[2]) * alat, float(pieces[3]) * alat, float(pieces[4]) * alat])
+            except ValueError:
+                raise QEOutputParsingError('Error parsing the atoms')
+            except IndexError:
+                raise QEOutputParsingError('Error with the indices in the atoms section')
+        header_dict['atoms_labels'] = atoms_labels
+        header_dict['atoms_coords'] = atoms_coords
+        header_dict['atoms_coords_units'] = 'angstrom'
+
+        starting_line += num_atoms
+
+        starting_line += 1  # Got to the next line to check
+        if 'Dynamical' not in data[starting_line]:
+            raise QEOutputParsingError("Wrong format (no 'Dynamical  Matrix' line)")
+
+    except QEOutputParsingError as exception:
+        logs.warning.append(
+            f'Problem parsing the header of the matdyn file! (msg: {exception}). '
+            'Storing only the information I managed to retrieve'
+        )
+        header_dict['warnings'].append(
+            'There was some parsing error and this dictionary is '
+            'not complete, see the warnings of the top parsed_data dict'
+        )
+
+    return header_dict
+
+
 def parse_initialization_qpoints(stdout: str) -> dict:
     """Return the number of q-points from an initialization run.
 
@@ -5,13 +5,14 @@ The function that needs to be called from outside is parse_raw_output(). The fun
 specific functionalities. The parsing will try to convert whatever it can in some dictionary, which by operative
 decision doesn't have much structure encoded, [the values are simple ]
 """
+import io
 import re
 
 import numpy
 from qe_tools import CONSTANTS
 
 from aiida_quantumespresso.parsers import QEOutputParsingError
-from aiida_quantumespresso.parsers.parse_raw import convert_qe_time_to_sec
+from aiida_quantumespresso.parsers.parse_raw import GrowableArray, convert_qe_time_to_sec
 from aiida_quantumespresso.utils.mapping import get_logging_container
 
 lattice_tolerance = 1.e-5
@@ -236,60 +237,161 @@ def get_symmetry_mapping():
 
 REG_ERROR_NPOOLS_TOO_HIGH = re.compile(r'\s+some nodes have no k-points.*')
 
+IMPORTANT_MESSAGES = {
+    'error': {
+        'Maximum CPU time exceeded': 'ERROR_OUT_OF_WALLTIME',
+        'convergence NOT achieved after': 'ERROR_ELECTRONIC_CONVERGENCE_NOT_REACHED',
+        'history already reset at previous step: stopping': 'ERROR_IONIC_CYCLE_BFGS_HISTORY_FAILURE',
+        'problems computing cholesky': 'ERROR_COMPUTING_CHOLESKY',
+        'charge is wrong': 'ERROR_CHARGE_IS_WRONG',
+        'not orthogonal operation': 'ERROR_SYMMETRY_NON_ORTHOGONAL_OPERATION',
+        'dexx is negative': 'ERROR_DEXX_IS_NEGATIVE',
+        'too many bands are not converged': 'ERROR_DIAGONALIZATION_TOO_MANY_BANDS_NOT_CONVERGED',
+        'S matrix not positive definite': 'ERROR_S_MATRIX_NOT_POSITIVE_DEFINITE',
+        'zhegvd failed': 'ERROR_ZHEGVD_FAILED',
+        '[Q, R] = qr(X, 0) failed': 'ERROR_QR_FAILED',
+        'probably because G_par is NOT a reciprocal lattice vector': 'ERROR_G_PAR',
+        'eigenvectors failed to converge': 'ERROR_EIGENVECTOR_CONVERGENCE',
+        'Error in routine broyden': 'ERROR_BROYDEN_FACTORIZATION',
+        'Not enough space allocated for radial FFT: try restarting with a larger cell_factor': 'ERROR_RADIAL_FFT_SIGNIFICANT_VOLUME_CONTRACTION',
+        REG_ERROR_NPOOLS_TOO_HIGH: 'ERROR_NPOOLS_TOO_HIGH',
+    },
+    'warning': {
+        'Warning:': None,
+        'DEPRECATED:': None,
+    }
+}
+
+# Marker that separates the output of the self-consistent calculations of the individual ionic steps
+MARKER_SCF_CALCULATION = 'Self-consistent Calculation'
+
+# Marker that precedes the (final) printout of the Hubbard occupations
+MARKER_HUBBARD_PARAMETERS = 'LDA+U parameters'
+
+# Substrings that are required for a line of the stdout to be of any interest to ``parse_stdout``. Every condition in
+# the parsing logic below requires at least one of these to be present in the line. That way, the vast majority of the
+# lines can be discarded with a single regex search, instead of testing each of them against every condition.
+STDOUT_MARKERS = (
+    'JOB DONE',
+    MARKER_SCF_CALCULATION,
+    MARKER_HUBBARD_PARAMETERS,
+    'Tr[ns(na)]',
+    # Header
+    'lattice parameter (alat)',
+    'number of atoms/cell',
+    'number of atomic types',
+    'unit-cell volume',
+    'number of Kohn-Sham states',
+    'number of k points',
+    'Dense  grid',
+    'Smooth grid',
+    # Quantities that are printed once
+    'Non-local correlation energy',
+    'Cartesian axes',
+    'total cpu time spent up to now is',
+    'Estimated max dynamical RAM per process',
+    'Estimated total dynamical RAM',
+    'PWSCF',
+    'nstep',
+    'bfgs converged in',
+    'number of bfgs steps',
+    'A final scf calculation at the relaxed structure',
+    'point group',
+    'c_bands',
+    'iteration #',
+    # Quantities that are printed for each ionic step
+    'CELL_PARAMETERS',
+    'ATOMIC_POSITIONS',
+    'Computed dipole along edir',
+    'estimated scf accuracy',
+    'convergence has been achieved in',
+    'Calculation stopped in scf loop at iteration',
+    'End of self-consistent calculation',
+    '!',
+    'the Fermi energy is',
+    'Forces acting on atoms',
+    'Total force =',
+    'entering subroutine stress ...',
+    'Computing stress (Cartesian axis) and pressure',
+    'Electronic Dipole per cell',
+    'Ionic Dipole per cell',
+    'Electronic Dipole on Cartesian axes',
+    'Ionic Dipole on Cartesian axes',
+)
+
+
+def _compile_markers(markers):
+    """Compile the given substrings into a single regex that matches a line containing any of them."""
+    return re.compile('|'.join(re.escape(marker) for marker in markers))
+
+
+# The substring that is required for ``REG_ERROR_NPOOLS_TOO_HIGH`` to match is included explicitly
+MESSAGE_MARKERS = (
+    *(marker for marker in IMPORTANT_MESSAGES['error'] if isinstance(marker, str)),
+    'some nodes have no k-points',
+    *IMPORTANT_MESSAGES['warning'],
+)
+
+REG_IMPORTANT_MESSAGES = _compile_markers(MESSAGE_MARKERS)
+REG_STDOUT_MARKERS = _compile_markers(STDOUT_MARKERS + MESSAGE_MARKERS)
+
 
 def detect_important_message(logs, line):
+    """Compare the line to the known set of error and warning messages and add them to the log container.
 
-    message_map = {
-        'error': {
-            'Maximum CPU time exceeded': 'ERROR_OUT_OF_WALLTIME',
-            'convergence NOT achieved after': 'ERROR_ELECTRONIC_CONVERGENCE_NOT_REACHED',
-            'history already reset at previous step: stopping': 'ERROR_IONIC_CYCLE_BFGS_HISTORY_FAILURE',
-            'problems computing cholesky': 'ERROR_DIAGONALIZATION_CHOLESKY_DECOMPOSITION',
-            'charge is wrong': 'ERROR_CHARGE_IS_WRONG',
-            'not orthogonal operation': 'ERROR_SYMMETRY_NON_ORTHOGONAL_OPERATION',
-            'problems computing cholesky': 'ERROR_COMPUTING_CHOLESKY',
-            'dexx is negative': 'ERROR_DEXX_IS_NEGATIVE',
-            'too many bands are not converged': 'ERROR_DIAGONALIZATION_TOO_MANY_BANDS_NOT_CONVERGED',
-            'S matrix not positive definite': 'ERROR_S_MATRIX_NOT_POSITIVE_DEFINITE',
-            'zhegvd failed': 'ERROR_ZHEGVD_FAILED',
-            '[Q, R] = qr(X, 0) failed': 'ERROR_QR_FAILED',
-            'probably because G_par is NOT a reciprocal lattice vector': 'ERROR_G_PAR',
-            'eigenvectors failed to converge': 'ERROR_EIGENVECTOR_CONVERGENCE',
-            'Error in routine broyden': 'ERROR_BROYDEN_FACTORIZATION',
-            'Not enough space allocated for radial FFT: try restarting with a larger cell_factor': 'ERROR_RADIAL_FFT_SIGNIFICANT_VOLUME_CONTRACTION',
-            REG_ERROR_NPOOLS_TOO_HIGH: 'ERROR_NPOOLS_TOO_HIGH',
-        },
-        'warning': {
-            'Warning:': None,
-            'DEPRECATED:': None,
-        }
-    }
+    :param logs: the log container to add the messages to
+    :param line: a single line of the stdout or ``CRASH`` file
+    """
+    # Most lines contain none of the messages, so first check for any of them at once
+    if REG_IMPORTANT_MESSAGES.search(line) is None:
+        return
 
     # Match any known error and warning messages
-    for marker, message in message_map['error'].items():
-        # Replace with isinstance(marker, re.Pattern) once Python 3.6 is dropped
-        if hasattr(marker, 'search'):
+    for marker, message in IMPORTANT_MESSAGES['error'].items():
+        if isinstance(marker, re.Pattern):
             if marker.match(line):
-                if message is None:
-                    message = line
-                logs.error.append(message)
-        else:
-            if marker in line:
-                if message is None:
-                    message = line
                 logs.error.append(message)
+        elif marker in line:
+            logs.error.append(message)
 
-    for marker, message in message_map['warning'].items():
+    for marker, message in IMPORTANT_MESSAGES['warning'].items():
         if marker in line:
             if message is None:
                 message = line
             logs.warning.append(message)
 
 
+def iterate_lines(content):
+    """Iterate over the lines of the given content without their line terminators.
+
+    The lines are the same as those returned by ``content.split('\\n')`` for a string, but a file handle is read line by
+    line, such that its content never needs to be loaded in memory as a whole.
+
+    :param content: a string, or an iterable over lines that end with a newline, such as a file handle opened in text
+        mode with ``newline='\\n'``.
+    :returns: generator of lines
+    """
+    if isinstance(content, str):
+        content = io.StringIO(content)
+
+    line = ''
+
+    for line in content:
+        yield line[:-1] if line.endswith('\n') else line
+
+    # A string that ends with a newline (or is empty) yields an empty line as its final element when split on newlines
+    if line == '' or line.endswith('\n'):
+        yield ''
+
+
 def parse_stdout(stdout, input_parameters, parser_options=None, parsed_xml=None, crash_file=None):
     """Parses the stdout content of a Quantum ESPRESSO `pw.x` calculation.
 
-    :param stdout: the stdout content as a string
+    The stdout is parsed in a single pass over its lines, keeping only the lines of the current self-consistent
+    calculation in memory. An open file handle can therefore be passed for the stdout, to parse large outputs in
+    bounded memory.
+
+    :param stdout: the stdout content as a string, or an iterable over its lines, e.g. a file handle in text mode
     :param input_parameters: dictionary with the input parameters
     :param crash_file: the content of the ``CRASH`` file as a string if it was written, ``None`` otherwise.
     :param parser_options: the parser options from the settings input parameter node
@@ -302,12 +404,11 @@ def parse_stdout(stdout, input_parameters, parser_options=None, parsed_xml=None,
     if parsed_xml is None:
         parsed_xml = {}
 
-    # Separate the input string into separate lines
-    data_lines = stdout.split('\n')
-
     logs = get_logging_container()
+    logs_messages = get_logging_container()
 
     parsed_data = {}
+    parsed_data_steps = {}
     vdw_correction = False
     bands_data = parsed_xml.pop('bands', {})
     structure_data = parsed_xml.pop('structure', {})
@@ -315,71 +416,21 @@ def parse_stdout(stdout, input_parameters, parser_options=None, parsed_xml=None,
 
     maximum_ionic_steps = None
     marker_bfgs_converged = False
-
-    # First check whether the `JOB DONE` message was written, otherwise the job was interrupted
-    for line in data_lines:
-        if 'JOB DONE' in line:
-            break
-    else:
-        if crash_file is None:
-            logs.error.append('ERROR_OUTPUT_STDOUT_INCOMPLETE')
+    job_done = False
+    c_bands_error = False
 
     # Determine whether the input switched on an electric field
     lelfield = input_parameters.get('CONTROL', {}).get('lelfield', False)
 
-    # Find some useful quantities.
-    if not parsed_xml.get('number_of_bands', None):
-        try:
-            for line in stdout.split('\n'):
-                if 'lattice parameter (alat)' in line:
-                    alat = float(line.split('=')[1].split('a.u')[0])
-                elif 'number of atoms/cell' in line:
-                    nat = int(line.split('=')[1])
-                elif 'number of atomic types' in line:
-                    ntyp = int(line.split('=')[1])
-                elif 'unit-cell volume' in line:
-                    if '(a.u.)^3' in line:
-                        volume = float(line.split('=')[1].split('(a.u.)^3')[0])
-                    else:
-                        # occurs in v5.3.0
-                        volume = float(line.split('=')[1].split('a.u.^3')[0])
-                elif 'number of Kohn-Sham states' in line:
-                    nbnd = int(line.split('=')[1])
-                elif 'number of k points' in line:
-                    nk = int(line.split('=')[1].split()[0])
-                    if input_parameters.get('SYSTEM', {}).get('nspin', 1) > 1:
-                        # QE counts twice each k-point in spin-polarized calculations
-                        nk /= 2
-                elif 'Dense  grid' in line:
-                    FFT_grid = [int(g) for g in line.split('(')[1].split(')')[0].split(',')]
-                elif 'Smooth grid' in line:
-                    smooth_FFT_grid = [int(g) for g in line.split('(')[1].split(')')[0].split(',')]
-                    break
-            alat *= CONSTANTS.bohr_to_ang
-            volume *= CONSTANTS.bohr_to_ang**3
-            parsed_data['lattice_parameter_initial'] = alat
-            parsed_data['number_of_bands'] = nbnd
-            try:
-                parsed_data['number_of_k_points'] = nk
-                parsed_data['fft_grid'] = FFT_grid
-                parsed_data['smooth_fft_grid'] = smooth_FFT_grid
-            except NameError:  # these are not crucial, so parsing does not fail if they are not found
-                pass
-        except NameError:  # nat or other variables where not found, and thus not initialized
-
-            # Try to get some error messages
-            lines = stdout.split('\n') if crash_file is None else crash_file.split('\n')
-
-            for line_number, line in enumerate(lines):
-                # Compare the line to the known set of error and warning messages and add them to the log container
-                detect_important_message(logs, line)
+    # If specified in the parser options, parse the atomic occupations
+    parse_atomic_occupations = parser_options.get('parse_atomic_occupations', False)
+    lines_atomic_occupations = []
 
-            if len(logs.error) or len(logs.warning) > 0:
-                parsed_data['trajectory'] = trajectory_data
-                return parsed_data, logs
+    # Find some useful quantities in the header, unless they are already provided by the XML
+    parse_header = not parsed_xml.get('number_of_bands', None)
 
-            # did not find any error message -> raise an Error and do not return anything
-            raise QEOutputParsingError('Parser cannot load basic info.')
+    if parse_header:
+        alat = nat = ntyp = volume = nbnd = nk = FFT_grid = smooth_FFT_grid = None
     else:
         nat = structure_data['number_of_atoms']
         ntyp = structure_data['number_of_species']
@@ -388,20 +439,123 @@ def parse_stdout(stdout, input_parameters, parser_options=None, parsed_xml=None,
     # NOTE: lattice_parameter_xml is the lattice parameter of the xml file
     # in the units used by the code. lattice_parameter instead in angstroms.
 
-    # Save these two quantities in the parsed_data, because they will be
-    # useful for queries (maybe), and structure_data will not be stored as a Dict
-    parsed_data['number_of_atoms'] = nat
-    parsed_data['number_of_species'] = ntyp
-    parsed_data['volume'] = volume
-
-    c_bands_error = False
-
-    # now grep quantities that can be considered isolated informations.
-    for count, line in enumerate(data_lines):
+    header_from_stdout = parse_header
+
+    # State for the chemical symbols that are printed in the lines following the `Cartesian axes` marker
+    index_cartesian_axes = None
+    atomic_species = None
+    atomic_species_name = None
+
+    # Lines of the current self-consistent calculation, and the indices of those that contain any of the markers
+    data_step = None
+    counts = []
+
+    # Completed self-consistent calculations that still need to be parsed
+    steps_pending = []
+
+    def parse_steps_pending():
+        """Parse the completed self-consistent calculations, which requires the header to have been parsed."""
+        alat_steps = alat
+
+        if header_from_stdout:
+            if None in (alat, nat, ntyp, volume, nbnd):
+                return
+            alat_steps = alat * CONSTANTS.bohr_to_ang
+
+        for data_step_pending, counts_pending in steps_pending:
+            parse_self_consistent_calculation(
+                data_step_pending, counts_pending, alat_steps, nat, lelfield, vdw_correction, parsed_data_steps,
+                trajectory_data, logs
+            )
+
+        steps_pending.clear()
+
+    for count, line in enumerate(iterate_lines(stdout)):
+
+        # The table with the sites should start within 10 lines of the `Cartesian axes` marker, after which the chemical
+        # symbols are printed on the following `nat` lines
+        if index_cartesian_axes is not None:
+            if atomic_species is None:
+                if 'site n.' in line and 'atom' in line:
+                    atomic_species = []
+                elif count >= index_cartesian_axes + 10:
+                    index_cartesian_axes = None
+            else:
+                atomic_species.append(line.split()[1])
+                if len(atomic_species) == nat:
+                    atomic_species_name = atomic_species
+                    index_cartesian_axes = None
+
+        # I split the output text in the atomic SCF calculations.
+        # the initial part should be things already contained in the xml.
+        # (cell, initial positions, kpoints, ...) and I skip them.
+        # In case, parse for them before this point.
+        # Each step starts after its marker and ends before the marker of the next one. Once a step is complete, it is
+        # parsed, as soon as the header has been parsed, and its lines are discarded.
+        match = REG_STDOUT_MARKERS.search(line)
+
+        if match is not None and MARKER_SCF_CALCULATION in line:
+            head, _, tail = line.partition(MARKER_SCF_CALCULATION)
+
+            if data_step is not None:
+                data_step.append(head)
+                if REG_STDOUT_MARKERS.search(head):
+                    counts.append(len(data_step) - 1)
+                steps_pending.append((data_step, counts))
+                if not parse_header:
+                    parse_steps_pending()
+
+            data_step = [tail]
+            counts = [0] if REG_STDOUT_MARKERS.search(tail) else []
+
+        elif data_step is not None:
+            data_step.append(line)
+            if match is not None:
+                counts.append(len(data_step) - 1)
+
+        if match is None:
+            continue
+
+        if not job_done and 'JOB DONE' in line:
+            job_done = True
 
         # Compare the line to the known set of error and warning messages and add them to the log container
-        detect_important_message(logs, line)
-
+        detect_important_message(logs_messages, line)
+
+        if parse_atomic_occupations:
+            if MARKER_HUBBARD_PARAMETERS in line:
+                lines_atomic_occupations = [line.split(MARKER_HUBBARD_PARAMETERS)[-1]]
+            elif 'Tr[ns(na)]' in line:
+                lines_atomic_occupations.append(line)
+
+        if parse_header:
+            if 'lattice parameter (alat)' in line:
+                alat = float(line.split('=')[1].split('a.u')[0])
+            elif 'number of atoms/cell' in line:
+                nat = int(line.split('=')[1])
+            elif 'number of atomic types' in line:
+                ntyp = int(line.split('=')[1])
+            elif 'unit-cell volume' in line:
+                if '(a.u.)^3' in line:
+                    volume = float(line.split('=')[1].split('(a.u.)^3')[0])
+                else:
+                    # occurs in v5.3.0
+                    volume = float(line.split('=')[1].split('a.u.^3')[0])
+            elif 'number of Kohn-Sham states' in line:
+                nbnd = int(line.split('=')[1])
+            elif 'number of k points' in line:
+                nk = int(line.split('=')[1].split()[0])
+                if input_parameters.get('SYSTEM', {}).get('nspin', 1) > 1:
+                    # QE counts twice each k-point in spin-polarized calculations
+                    nk /= 2
+            elif 'Dense  grid' in line:
+                FFT_grid = [int(g) for g in line.split('(')[1].split(')')[0].split(',')]
+            elif 'Smooth grid' in line:
+                smooth_FFT_grid = [int(g) for g in line.split('(')[1].split(')')[0].split(',')]
+                # The header ends here: quantities with the same name further down refer to the ionic steps
+                parse_header = False
+
+        # now grep quantities that can be considered isolated informations.
         # to be used for later
         if 'Non-local correlation energy' in line:
             vdw_correction = True
@@ -409,11 +563,10 @@ def parse_stdout(stdout, input_parameters, parser_options=None, parsed_xml=None,
         elif 'Cartesian axes' in line:
             # this is the part when initial positions and chemical
             # symbols are printed (they do not change during a run)
-            i = count + 1
-            while i < count + 10 and not ('site n.' in data_lines[i] and 'atom' in data_lines[i]):
-                i += 1
-            if 'site n.' in data_lines[i] and 'atom' in data_lines[i]:
-                trajectory_data['atomic_species_name'] = [data_lines[i + 1 + j].split()[1] for j in range(nat)]
+            # the symbols are parsed from the lines that follow, see the start of the loop
+            if nat is not None:
+                index_cartesian_axes = count
+                atomic_species = None
 
         # parse the initialization time (take only first occurence)
         elif ('init_wall_time_seconds' not in parsed_data and 'total cpu time spent up to now is' in line):
@@ -504,375 +657,66 @@ def parse_stdout(stdout, input_parameters, parser_options=None, parsed_xml=None,
                 # I put a warning only if c_bands error appears in the last iteration
                 c_bands_error = False
 
-    if c_bands_error:
-        logs.warning.append('c_bands: at least 1 eigenvalues not converged')
-
-    # I split the output text in the atomic SCF calculations.
-    # the initial part should be things already contained in the xml.
-    # (cell, initial positions, kpoints, ...) and I skip them.
-    # In case, parse for them before this point.
-    # Put everything in a trajectory_data dictionary
-    relax_steps = stdout.split('Self-consistent Calculation')[1:]
-    relax_steps = [i.split('\n') for i in relax_steps]
-
-    # now I create a bunch of arrays for every step.
-
-    for data_step in relax_steps:
-        trajectory_frame = {}
-
-        for count, line in enumerate(data_step):
-
-            if 'CELL_PARAMETERS' in line:
-                try:
-                    a1 = [float(s) for s in data_step[count + 1].split()]
-                    a2 = [float(s) for s in data_step[count + 2].split()]
-                    a3 = [float(s) for s in data_step[count + 3].split()]
-                    # try except indexerror for not enough lines
-                    lattice = line.split('(')[1].split(')')[0].split('=')
-                    if lattice[0].lower() not in ['alat', 'bohr', 'angstrom']:
-                        raise QEOutputParsingError(
-                            'Error while parsing cell_parameters: ' + f'unsupported units {lattice[0]}'
-                        )
-
-                    if 'alat' in lattice[0].lower():
-                        a1 = [alat * CONSTANTS.bohr_to_ang * float(s) for s in a1]
-                        a2 = [alat * CONSTANTS.bohr_to_ang * float(s) for s in a2]
-                        a3 = [alat * CONSTANTS.bohr_to_ang * float(s) for s in a3]
-                        lattice_parameter_b = float(lattice[1])
-                        if abs(lattice_parameter_b - alat) > lattice_tolerance:
-                            raise QEOutputParsingError(
-                                'Lattice parameters mismatch! ' + f'{lattice_parameter_b} vs {alat}'
-                            )
-                    elif 'bohr' in lattice[0].lower():
-                        lattice_parameter_b *= CONSTANTS.bohr_to_ang
-                        a1 = [CONSTANTS.bohr_to_ang * float(s) for s in a1]
-                        a2 = [CONSTANTS.bohr_to_ang * float(s) for s in a2]
-                        a3 = [CONSTANTS.bohr_to_ang * float(s) for s in a3]
-                    trajectory_data.setdefault('lattice_vectors_relax', []).append([a1, a2, a3])
-
-                except Exception:
-                    logs.warning.append('Error while parsing relaxation cell parameters.')
-
-            elif 'ATOMIC_POSITIONS' in line:
-                try:
-                    this_key = 'atomic_positions_relax'
-                    # the inizialization of tau prevent parsed_data to be associated
-                    # to the pointer of the previous iteration
-                    metric = line.split('(')[1].split(')')[0]
-                    if metric == 'crystal':
-                        this_key = 'atomic_fractionals_relax'
-                    elif metric not in ['alat', 'bohr', 'angstrom']:
-                        raise QEOutputParsingError('Error while parsing atomic_positions: units not supported.')
-                    # TODO: check how to map the atoms in the original scheme
-                    positions = []
-                    for i in range(nat):
-                        line2 = data_step[count + 1 + i].split()
-                        tau = [float(s) for s in line2[1:4]]
-                        if metric == 'alat':
-                            tau = [alat * float(s) for s in tau]
-                        elif metric == 'bohr':
-                            tau = [CONSTANTS.bohr_to_ang * float(s) for s in tau]
-                        positions.append(tau)
-                    trajectory_data.setdefault(this_key, []).append(positions)
-                except Exception:
-                    logs.warning.append('Error while parsing relaxation atomic positions.')
-
-            # NOTE: in the above, the chemical symbols are not those of AiiDA
-            # since the AiiDA structure is different. So, I assume now that the
-            # order of atoms is the same of the input atomic structure.
-
-            # Computed dipole correction in slab geometries.
-            # save dipole in debye units, only at last iteration of scf cycle
-            elif 'Computed dipole along edir' in line:
-                j = count + 3
-                line2 = data_step[j]
-                try:
-                    units = line2.split()[-1]
-                    if default_dipole_units.lower() not in units.lower():  # only debye
-                        raise QEOutputParsingError(
-                            f'Error parsing the dipole correction. Units {units} are not supported.'
-                        )
-                    value = float(line2.split()[-2])
-                except IndexError:  # on units
-                    pass
-                # save only the last dipole correction
-                while 'Computed dipole along edir' not in line2:
-                    j += 1
-                    try:
-                        line2 = data_step[j]
-                    except IndexError:  # The dipole is also written at the beginning of a new bfgs iteration
-                        break
-                    if 'End of self-consistent calculation' in line2:
-                        trajectory_data.setdefault('dipole', []).append(value)
-                        parsed_data['dipole' + units_suffix] = default_dipole_units
-                        break
-
-            # saving the SCF convergence accuracy for each SCF cycle
-            # If for some step this line is not printed, the later check with the scf_accuracy array length should catch it
-            elif 'estimated scf accuracy' in line:
-                try:
-                    value = float(line.split()[-2]) * CONSTANTS.ry_to_ev
-                    trajectory_data.setdefault('scf_accuracy', []).append(value)
-                except Exception:
-                    logs.warning.append('Error while parsing scf accuracy.')
-
-            elif 'convergence has been achieved in' in line or 'convergence NOT achieved after' in line:
-                try:
-                    value = int(line.split('iterations')[0].split()[-1])
-                    trajectory_data.setdefault('scf_iterations', []).append(value)
-                except Exception:
-                    logs.warning.append('Error while parsing scf iterations.')
-
-            elif 'Calculation stopped in scf loop at iteration' in line:
-                try:
-                    value = int(line.split()[-1])
-                    trajectory_data.setdefault('scf_iterations', []).append(value)
-                except Exception:
-                    logs.warning.append('Error while parsing scf iterations.')
-
-            elif 'End of self-consistent calculation' in line:
-                # parse energy threshold for diagonalization algorithm
-                try:
-                    j = 0
-                    while True:
-                        j -= 1
-                        line2 = data_step[count + j]
-                        if 'ethr' in line2:
-                            value = float(line2.split('=')[1].split(',')[0])
-                            break
-                    trajectory_data.setdefault('energy_threshold', []).append(value)
-                except Exception:
-                    logs.warning.append('Error while parsing ethr.')
-
-                # parse final magnetic moments, if present
-                try:
-                    j = 0
-                    while True:
-                        j -= 1
-                        line2 = data_step[count + j]
-                        if 'Magnetic moment per site' in line2:
-                            break
-                        if 'iteration' in line2:
-                            raise QEOutputParsingError
-                    mag_moments = []
-                    charges = []
-                    while True:
-                        j += 1
-                        line2 = data_step[count + j]
-                        if 'atom:' in line2:
-                            mag_moments.append(float(line2.split('magn:')[1].split()[0]))
-                            charges.append(float(line2.split('charge:')[1].split()[0]))
-                        # Alternate parsing for new format introduced in v6.8
-                        elif 'atom' in line2:
-                            mag_moments.append(float(line2.split('magn=')[1].split()[0]))
-                            charges.append(float(line2.split('charge=')[1].split()[0]))
-                        if len(mag_moments) == nat:
-                            break
-                    trajectory_data.setdefault('atomic_magnetic_moments', []).append(mag_moments)
-                    trajectory_data.setdefault('atomic_charges', []).append(charges)
-                    parsed_data['atomic_magnetic_moments' + units_suffix] = default_magnetization_units
-                    parsed_data['atomic_charges' + units_suffix] = default_charge_units
-                except QEOutputParsingError:
-                    pass
-
-            # grep energy and possibly, magnetization
-            elif '!' in line:
-                try:
-
-                    En = float(line.split('=')[1].split('Ry')[0]) * CONSTANTS.ry_to_ev
-
-                    # Up till v6.5, the line after total energy would be the Harris-Foulkes estimate, followed by the
-                    # estimated SCF accuracy. However, pw.x v6.6 removed the HF estimate line.
-                    marker = 'estimated scf accuracy'
-                    for i in range(5):
-                        subline = data_step[count + i]
-                        if marker in subline:
-                            try:
-                                E_acc = float(subline.split('<')[1].split('Ry')[0]) * CONSTANTS.ry_to_ev
-                            except Exception:
-                                pass
-                            else:
-                                break
-                    else:
-                        raise KeyError(f'could not find and parse the line with `{marker}`')
-
-                    for key, value in [['energy', En], ['energy_accuracy', E_acc]]:
-                        trajectory_data.setdefault(key, []).append(value)
-                        parsed_data[key + units_suffix] = default_energy_units
-                    # TODO: decide units for magnetization. now bohr mag/cell
-                    j = 0
-                    while True:
-                        j += 1
-                        line2 = data_step[count + j]
-
-                        for string, key in [
-                            ['one-electron contribution', 'energy_one_electron'],
-                            ['hartree contribution', 'energy_hartree'],
-                            ['xc contribution', 'energy_xc'],
-                            ['ewald contribution', 'energy_ewald'],
-                            ['smearing contrib.', 'energy_smearing'],
-                            ['one-center paw contrib.', 'energy_one_center_paw'],
-                            ['est. exchange err', 'energy_est_exchange'],
-                            ['Fock energy', 'energy_fock'],
-                            ['Hubbard energy', 'energy_hubbard'],
-                            # Add also ENVIRON specific contribution to the total energy
-                            ['solvation energy', 'energy_solvation'],
-                            ['cavitation energy', 'energy_cavitation'],
-                            ['PV energy', 'energy_pv'],
-                            ['periodic energy correct.', 'energy_pbc_correction'],
-                            ['ionic charge energy', 'energy_ionic_charge'],
-                            ['external charges energy', 'energy_external_charges']
-                        ]:
-                            if string in line2:
-                                value = grep_energy_from_line(line2)
-                                trajectory_data.setdefault(key, []).append(value)
-                                parsed_data[key + units_suffix] = default_energy_units
-                        # magnetizations
-                        if 'total magnetization' in line2:
-                            this_m = line2.split('=')[1].split('Bohr')[0]
-                            try:  # magnetization might be a scalar
-                                value = float(this_m)
-                            except ValueError:  # but can also be a three vector component in non-collinear calcs
-                                value = [float(i) for i in this_m.split()]
-                            trajectory_data.setdefault('total_magnetization', []).append(value)
-                            parsed_data['total_magnetization' + units_suffix] = default_magnetization_units
-
-                        elif 'absolute magnetization' in line2:
-                            value = float(line2.split('=')[1].split('Bohr')[0])
-                            trajectory_data.setdefault('absolute_magnetization', []).append(value)
-                            parsed_data['absolute_magnetization' + units_suffix] = default_magnetization_units
-                        # exit loop
-                        elif 'convergence' in line2:
-                            break
-
-                    if vdw_correction:
-                        j = 0
-                        while True:
-                            j += -1
-                            line2 = data_step[count + j]
-                            if 'Non-local correlation energy' in line2:
-                                value = grep_energy_from_line(line2)
-                                trajectory_data.setdefault('energy_vdw', []).append(value)
-                                break
-                        parsed_data['energy_vdw' + units_suffix] = default_energy_units
-                except Exception as exception:
-                    import traceback
-                    traceback.print_exc()
-                    print(exception)
-                    logs.warning.append('Error while parsing for energy terms.')
-
-            elif 'the Fermi energy is' in line:
-                try:
-                    value = float(line.split('is')[1].split('ev')[0])
-                    trajectory_data.setdefault('fermi_energy', []).append(value)
-                    parsed_data['fermi_energy' + units_suffix] = default_energy_units
-                except Exception:
-                    logs.warning.append('Error while parsing Fermi energy from the output file.')
+    if data_step is not None:
+        steps_pending.append((data_step, counts))
 
-            elif 'Forces acting on atoms' in line:
-                try:
-                    forces = []
-                    j = 0
-                    while True:
-                        j += 1
-                        line2 = data_step[count + j]
-                        if 'atom ' in line2:
-                            line2 = line2.split('=')[1].split()
-                            # CONVERT FORCES IN eV/Ang
-                            vec = [float(s) * CONSTANTS.ry_to_ev / CONSTANTS.bohr_to_ang for s in line2]
-                            forces.append(vec)
-                        if len(forces) == nat:
-                            break
-                    trajectory_data.setdefault('forces', []).append(forces)
-                    parsed_data['forces' + units_suffix] = default_force_units
-                except Exception:
-                    logs.warning.append('Error while parsing forces.')
+    parse_steps_pending()
 
-            # TODO: adding the parsing support for the decomposition of the forces
+    if c_bands_error:
+        logs.warning.append('c_bands: at least 1 eigenvalues not converged')
 
-            elif 'Total force =' in line:
-                try:  # note that I can't check the units: not written in output!
-                    value = float(line.split('=')[1].split('Total')[0]) * CONSTANTS.ry_to_ev / CONSTANTS.bohr_to_ang
-                    trajectory_data.setdefault('total_force', []).append(value)
-                    parsed_data['total_force' + units_suffix] = default_force_units
-                except Exception:
-                    logs.warning.append('Error while parsing total force.')
+    # Check whether the `JOB DONE` message was written, otherwise the job was interrupted
+    if not job_done and crash_file is None:
+        logs.error.append('ERROR_OUTPUT_STDOUT_INCOMPLETE')
 
-            elif ('entering subroutine stress ...'
-                  in line) or ('Computing stress (Cartesian axis) and pressure' in line):
-                try:
-                    stress = []
-                    count2 = None
-                    for k in range(15):  # Up to 15 lines later - more than 10 are needed if vdW is turned on
-                        if 'P=' in data_step[count + k + 1]:
-                            count2 = count + k + 1
-                    if count2 is None:
-                        logs.warning.append(
-                            'Error while parsing stress tensor: '
-                            '"P=" not found within 15 lines from the start of the stress block'
-                        )
-                    else:
-                        if '(Ry/bohr**3)' not in data_step[count2]:
-                            raise QEOutputParsingError('Error while parsing stress: unexpected units.')
-                        for k in range(3):
-                            line2 = data_step[count2 + k + 1].split()
-                            vec = [float(s) * 10**(-9) * CONSTANTS.ry_si / (CONSTANTS.bohr_si)**3 for s in line2[0:3]]
-                            stress.append(vec)
-                        trajectory_data.setdefault('stress', []).append(stress)
-                        parsed_data['stress' + units_suffix] = default_stress_units
-                except Exception:
-                    import traceback
-                    logs.warning.append(f'Error while parsing stress tensor: {traceback.format_exc()}')
+    parsed_data_header = {}
 
-            # Electronic and ionic dipoles when 'lelfield' was set to True in input parameters
-            elif lelfield is True:
+    if header_from_stdout:
+        if alat is not None and volume is not None:
+            alat *= CONSTANTS.bohr_to_ang
+            volume *= CONSTANTS.bohr_to_ang**3
+            parsed_data_header['lattice_parameter_initial'] = alat
 
-                if 'Electronic Dipole per cell' in line:
-                    electronic_dipole = float(line.split()[-1])
-                    trajectory_frame.setdefault('electronic_dipole_cell_average', []).append(electronic_dipole)
+        if None in (alat, nat, ntyp, volume, nbnd):
+            # nat or other variables where not found: try to get some error messages
+            if crash_file is None:
+                logs_crash = logs_messages
+            else:
+                logs_crash = get_logging_container()
+                for line in crash_file.split('\n'):
+                    detect_important_message(logs_crash, line)
 
-                elif 'Ionic Dipole per cell' in line:
-                    ionic_dipole = float(line.split()[-1])
-                    trajectory_frame.setdefault('ionic_dipole_cell_average', []).append(ionic_dipole)
+            logs.error.extend(logs_crash.error)
+            logs.warning.extend(logs_crash.warning)
 
-                elif 'Electronic Dipole on Cartesian axes' in line:
-                    electronic_dipole = [float(data_step[count + i + 1].split()[1]) for i in range(3)]
-                    trajectory_frame.setdefault('electronic_dipole_cartesian_axes', []).append(electronic_dipole)
+            if len(logs.error) or len(logs.warning) > 0:
+                parsed_data_header['trajectory'] = {}
+                return parsed_data_header, logs
 
-                elif 'Ionic Dipole on Cartesian axes' in line:
-                    ionic_dipole = [float(data_step[count + i + 1].split()[1]) for i in range(3)]
-                    trajectory_frame.setdefault('ionic_dipole_cartesian_axes', []).append(ionic_dipole)
+            # did not find any error message -> raise an Error and do not return anything
+            raise QEOutputParsingError('Parser cannot load basic info.')
 
-        # End of trajectory frame, only keep last entries for dipole related values
-        if lelfield is True:
+        parsed_data_header['number_of_bands'] = nbnd
 
-            # For every property only get the last entry if possible
-            try:
-                ed_cell = trajectory_frame['electronic_dipole_cell_average'].pop()
-            except (IndexError, KeyError):
-                ed_cell = None
+        # these are not crucial, so parsing does not fail if they are not found
+        for key, value in (('number_of_k_points', nk), ('fft_grid', FFT_grid), ('smooth_fft_grid', smooth_FFT_grid)):
+            if value is None:
+                break
+            parsed_data_header[key] = value
 
-            try:
-                ed_axes = trajectory_frame['electronic_dipole_cartesian_axes'].pop()
-            except (IndexError, KeyError):
-                ed_axes = None
+    logs.error.extend(logs_messages.error)
+    logs.warning.extend(logs_messages.warning)
 
-            try:
-                id_cell = trajectory_frame['ionic_dipole_cell_average'].pop()
-            except (IndexError, KeyError):
-                id_cell = None
+    # Save these two quantities in the parsed_data, because they will be
+    # useful for queries (maybe), and structure_data will not be stored as a Dict
+    parsed_data_header['number_of_atoms'] = nat
+    parsed_data_header['number_of_species'] = ntyp
+    parsed_data_header['volume'] = volume
 
-            try:
-                id_axes = trajectory_frame['ionic_dipole_cartesian_axes'].pop()
-            except (IndexError, KeyError):
-                id_axes = None
+    parsed_data = {**parsed_data_header, **parsed_data, **parsed_data_steps}
 
-            # Only add them if all four properties were successfully parsed
-            if all([value is not None for value in [ed_cell, ed_axes, id_cell, id_axes]]):
-                trajectory_data.setdefault('electronic_dipole_cell_average', []).append(ed_cell)
-                trajectory_data.setdefault('electronic_dipole_cartesian_axes', []).append(ed_axes)
-                trajectory_data.setdefault('ionic_dipole_cell_average', []).append(id_cell)
-                trajectory_data.setdefault('ionic_dipole_cartesian_axes', []).append(id_axes)
+    if atomic_species_name is not None:
+        trajectory_data = {'atomic_species_name': atomic_species_name, **trajectory_data}
 
     # check consistency of scf_accuracy and scf_iterations
     if 'scf_accuracy' in trajectory_data:
@@ -884,15 +728,12 @@ def parse_stdout(stdout, input_parameters, parser_options=None, parsed_xml=None,
         else:
             logs.warning.append('"the scf_accuracy array was parsed but the scf_iterations was not.')
 
-    # If specified in the parser options, parse the atomic occupations
-    parse_atomic_occupations = parser_options.get('parse_atomic_occupations', False)
-
     if parse_atomic_occupations:
 
         atomic_occupations = {}
-        hubbard_blocks = stdout.split('LDA+U parameters')
 
-        for line in hubbard_blocks[-1].split('\n'):
+        # Only the occupations printed after the last occurrence of the Hubbard parameters are considered
+        for line in lines_atomic_occupations:
 
             if 'Tr[ns(na)]' in line:
 
@@ -942,6 +783,394 @@ def parse_stdout(stdout, input_parameters, parser_options=None, parsed_xml=None,
     return parsed_data, logs
 
 
+
+def parse_self_consistent_calculation(
+    data_step, counts, alat, nat, lelfield, vdw_correction, parsed_data, trajectory_data, logs
+):
+    """Parse the output of a single self-consistent calculation, i.e. one ionic step, of a `pw.x` calculation.
+
+    :param data_step: list of the lines of the self-consistent calculation
+    :param counts: indices of the lines that contain any of the ``STDOUT_MARKERS``, the others are only used as context
+    :param alat: the lattice parameter
+    :param nat: the number of atoms
+    :param lelfield: whether the input switched on an electric field
+    :param vdw_correction: whether a non-local correlation energy is printed
+    :param parsed_data: dictionary to which the units of the parsed quantities are added
+    :param trajectory_data: dictionary to whose lists the parsed quantities are appended
+    :param logs: the log container to add the messages to
+    """
+    trajectory_frame = {}
+
+    for count in counts:
+        line = data_step[count]
+
+        if 'CELL_PARAMETERS' in line:
+            try:
+                a1 = [float(s) for s in data_step[count + 1].split()]
+                a2 = [float(s) for s in data_step[count + 2].split()]
+                a3 = [float(s) for s in data_step[count + 3].split()]
+                # try except indexerror for not enough lines
+                lattice = line.split('(')[1].split(')')[0].split('=')
+                if lattice[0].lower() not in ['alat', 'bohr', 'angstrom']:
+                    raise QEOutputParsingError(
+                        'Error while parsing cell_parameters: ' + f'unsupported units {lattice[0]}'
+                    )
+
+                if 'alat' in lattice[0].lower():
+                    a1 = [alat * CONSTANTS.bohr_to_ang * float(s) for s in a1]
+                    a2 = [alat * CONSTANTS.bohr_to_ang * float(s) for s in a2]
+                    a3 = [alat * CONSTANTS.bohr_to_ang * float(s) for s in a3]
+                    lattice_parameter_b = float(lattice[1])
+                    if abs(lattice_parameter_b - alat) > lattice_tolerance:
+                        raise QEOutputParsingError(
+                            'Lattice parameters mismatch! ' + f'{lattice_parameter_b} vs {alat}'
+                        )
+                elif 'bohr' in lattice[0].lower():
+                    lattice_parameter_b *= CONSTANTS.bohr_to_ang
+                    a1 = [CONSTANTS.bohr_to_ang * float(s) for s in a1]
+                    a2 = [CONSTANTS.bohr_to_ang * float(s) for s in a2]
+                    a3 = [CONSTANTS.bohr_to_ang * float(s) for s in a3]
+                append_trajectory_frame(trajectory_data, 'lattice_vectors_relax', [a1, a2, a3])
+
+            except Exception:
+                logs.warning.append('Error while parsing relaxation cell parameters.')
+
+        elif 'ATOMIC_POSITIONS' in line:
+            try:
+                this_key = 'atomic_positions_relax'
+                # the inizialization of tau prevent parsed_data to be associated
+                # to the pointer of the previous iteration
+                metric = line.split('(')[1].split(')')[0]
+                if metric == 'crystal':
+                    this_key = 'atomic_fractionals_relax'
+                elif metric not in ['alat', 'bohr', 'angstrom']:
+                    raise QEOutputParsingError('Error while parsing atomic_positions: units not supported.')
+                # TODO: check how to map the atoms in the original scheme
+                positions = numpy.array([data_step[count + 1 + i].split()[1:4] for i in range(nat)], dtype=float)
+                if metric == 'alat':
+                    positions *= alat
+                elif metric == 'bohr':
+                    positions *= CONSTANTS.bohr_to_ang
+                append_trajectory_frame(trajectory_data, this_key, positions)
+            except Exception:
+                logs.warning.append('Error while parsing relaxation atomic positions.')
+
+        # NOTE: in the above, the chemical symbols are not those of AiiDA
+        # since the AiiDA structure is different. So, I assume now that the
+        # order of atoms is the same of the input atomic structure.
+
+        # Computed dipole correction in slab geometries.
+        # save dipole in debye units, only at last iteration of scf cycle
+        elif 'Computed dipole along edir' in line:
+            j = count + 3
+            line2 = data_step[j]
+            try:
+                units = line2.split()[-1]
+                if default_dipole_units.lower() not in units.lower():  # only debye
+                    raise QEOutputParsingError(
+                        f'Error parsing the dipole correction. Units {units} are not supported.'
+                    )
+                value = float(line2.split()[-2])
+            except IndexError:  # on units
+                pass
+            # save only the last dipole correction
+            while 'Computed dipole along edir' not in line2:
+                j += 1
+                try:
+                    line2 = data_step[j]
+                except IndexError:  # The dipole is also written at the beginning of a new bfgs iteration
+                    break
+                if 'End of self-consistent calculation' in line2:
+                    trajectory_data.setdefault('dipole', []).append(value)
+                    parsed_data['dipole' + units_suffix] = default_dipole_units
+                    break
+
+        # saving the SCF convergence accuracy for each SCF cycle
+        # If for some step this line is not printed, the later check with the scf_accuracy array length should catch it
+        elif 'estimated scf accuracy' in line:
+            try:
+                value = float(line.split()[-2]) * CONSTANTS.ry_to_ev
+                trajectory_data.setdefault('scf_accuracy', []).append(value)
+            except Exception:
+                logs.warning.append('Error while parsing scf accuracy.')
+
+        elif 'convergence has been achieved in' in line or 'convergence NOT achieved after' in line:
+            try:
+                value = int(line.split('iterations')[0].split()[-1])
+                trajectory_data.setdefault('scf_iterations', []).append(value)
+            except Exception:
+                logs.warning.append('Error while parsing scf iterations.')
+
+        elif 'Calculation stopped in scf loop at iteration' in line:
+            try:
+                value = int(line.split()[-1])
+                trajectory_data.setdefault('scf_iterations', []).append(value)
+            except Exception:
+                logs.warning.append('Error while parsing scf iterations.')
+
+        elif 'End of self-consistent calculation' in line:
+            # parse energy threshold for diagonalization algorithm
+            try:
+                j = 0
+                while True:
+                    j -= 1
+                    line2 = data_step[count + j]
+                    if 'ethr' in line2:
+                        value = float(line2.split('=')[1].split(',')[0])
+                        break
+                trajectory_data.setdefault('energy_threshold', []).append(value)
+            except Exception:
+                logs.warning.append('Error while parsing ethr.')
+
+            # parse final magnetic moments, if present
+            try:
+                j = 0
+                while True:
+                    j -= 1
+                    line2 = data_step[count + j]
+                    if 'Magnetic moment per site' in line2:
+                        break
+                    if 'iteration' in line2:
+                        raise QEOutputParsingError
+                mag_moments = []
+                charges = []
+                while True:
+                    j += 1
+                    line2 = data_step[count + j]
+                    if 'atom:' in line2:
+                        mag_moments.append(float(line2.split('magn:')[1].split()[0]))
+                        charges.append(float(line2.split('charge:')[1].split()[0]))
+                    # Alternate parsing for new format introduced in v6.8
+                    elif 'atom' in line2:
+                        mag_moments.append(float(line2.split('magn=')[1].split()[0]))
+                        charges.append(float(line2.split('charge=')[1].split()[0]))
+                    if len(mag_moments) == nat:
+                        break
+                trajectory_data.setdefault('atomic_magnetic_moments', []).append(mag_moments)
+                trajectory_data.setdefault('atomic_charges', []).append(charges)
+                parsed_data['atomic_magnetic_moments' + units_suffix] = default_magnetization_units
+                parsed_data['atomic_charges' + units_suffix] = default_charge_units
+            except QEOutputParsingError:
+                pass
+
+        # grep energy and possibly, magnetization
+        elif '!' in line:
+            try:
+
+                En = float(line.split('=')[1].split('Ry')[0]) * CONSTANTS.ry_to_ev
+
+                # Up till v6.5, the line after total energy would be the Harris-Foulkes estimate, followed by the
+                # estimated SCF accuracy. However, pw.x v6.6 removed the HF estimate line.
+                marker = 'estimated scf accuracy'
+                for i in range(5):
+                    subline = data_step[count + i]
+                    if marker in subline:
+                        try:
+                            E_acc = float(subline.split('<')[1].split('Ry')[0]) * CONSTANTS.ry_to_ev
+                        except Exception:
+                            pass
+                        else:
+                            break
+                else:
+                    raise KeyError(f'could not find and parse the line with `{marker}`')
+
+                for key, value in [['energy', En], ['energy_accuracy', E_acc]]:
+                    trajectory_data.setdefault(key, []).append(value)
+                    parsed_data[key + units_suffix] = default_energy_units
+                # TODO: decide units for magnetization. now bohr mag/cell
+                j = 0
+                while True:
+                    j += 1
+                    line2 = data_step[count + j]
+
+                    for string, key in [
+                        ['one-electron contribution', 'energy_one_electron'],
+                        ['hartree contribution', 'energy_hartree'],
+                        ['xc contribution', 'energy_xc'],
+                        ['ewald contribution', 'energy_ewald'],
+                        ['smearing contrib.', 'energy_smearing'],
+                        ['one-center paw contrib.', 'energy_one_center_paw'],
+                        ['est. exchange err', 'energy_est_exchange'],
+                        ['Fock energy', 'energy_fock'],
+                        ['Hubbard energy', 'energy_hubbard'],
+                        # Add also ENVIRON specific contribution to the total energy
+                        ['solvation energy', 'energy_solvation'],
+                        ['cavitation energy', 'energy_cavitation'],
+                        ['PV energy', 'energy_pv'],
+                        ['periodic energy correct.', 'energy_pbc_correction'],
+                        ['ionic charge energy', 'energy_ionic_charge'],
+                        ['external charges energy', 'energy_external_charges']
+                    ]:
+                        if string in line2:
+                            value = grep_energy_from_line(line2)
+                            trajectory_data.setdefault(key, []).append(value)
+                            parsed_data[key + units_suffix] = default_energy_units
+                    # magnetizations
+                    if 'total magnetization' in line2:
+                        this_m = line2.split('=')[1].split('Bohr')[0]
+                        try:  # magnetization might be a scalar
+                            value = float(this_m)
+                        except ValueError:  # but can also be a three vector component in non-collinear calcs
+                            value = [float(i) for i in this_m.split()]
+                        trajectory_data.setdefault('total_magnetization', []).append(value)
+                        parsed_data['total_magnetization' + units_suffix] = default_magnetization_units
+
+                    elif 'absolute magnetization' in line2:
+                        value = float(line2.split('=')[1].split('Bohr')[0])
+                        trajectory_data.setdefault('absolute_magnetization', []).append(value)
+                        parsed_data['absolute_magnetization' + units_suffix] = default_magnetization_units
+                    # exit loop
+                    elif 'convergence' in line2:
+                        break
+
+                if vdw_correction:
+                    j = 0
+                    while True:
+                        j += -1
+                        line2 = data_step[count + j]
+                        if 'Non-local correlation energy' in line2:
+                            value = grep_energy_from_line(line2)
+                            trajectory_data.setdefault('energy_vdw', []).append(value)
+                            break
+                    parsed_data['energy_vdw' + units_suffix] = default_energy_units
+            except Exception as exception:
+                import traceback
+                traceback.print_exc()
+                print(exception)
+                logs.warning.append('Error while parsing for energy terms.')
+
+        elif 'the Fermi energy is' in line:
+            try:
+                value = float(line.split('is')[1].split('ev')[0])
+                trajectory_data.setdefault('fermi_energy', []).append(value)
+                parsed_data['fermi_energy' + units_suffix] = default_energy_units
+            except Exception:
+                logs.warning.append('Error while parsing Fermi energy from the output file.')
+
+        elif 'Forces acting on atoms' in line:
+            try:
+                forces = []
+                j = 0
+                while True:
+                    j += 1
+                    line2 = data_step[count + j]
+                    if 'atom ' in line2:
+                        forces.append(line2.split('=')[1].split())
+                    if len(forces) == nat:
+                        break
+                # CONVERT FORCES IN eV/Ang
+                forces = numpy.array(forces, dtype=float) * CONSTANTS.ry_to_ev / CONSTANTS.bohr_to_ang
+                append_trajectory_frame(trajectory_data, 'forces', forces)
+                parsed_data['forces' + units_suffix] = default_force_units
+            except Exception:
+                logs.warning.append('Error while parsing forces.')
+
+        # TODO: adding the parsing support for the decomposition of the forces
+
+        elif 'Total force =' in line:
+            try:  # note that I can't check the units: not written in output!
+                value = float(line.split('=')[1].split('Total')[0]) * CONSTANTS.ry_to_ev / CONSTANTS.bohr_to_ang
+                trajectory_data.setdefault('total_force', []).append(value)
+                parsed_data['total_force' + units_suffix] = default_force_units
+            except Exception:
+                logs.warning.append('Error while parsing total force.')
+
+        elif ('entering subroutine stress ...'
+              in line) or ('Computing stress (Cartesian axis) and pressure' in line):
+            try:
+                stress = []
+                count2 = None
+                for k in range(15):  # Up to 15 lines later - more than 10 are needed if vdW is turned on
+                    if 'P=' in data_step[count + k + 1]:
+                        count2 = count + k + 1
+                if count2 is None:
+                    logs.warning.append(
+                        'Error while parsing stress tensor: '
+                        '"P=" not found within 15 lines from the start of the stress block'
+                    )
+                else:
+                    if '(Ry/bohr**3)' not in data_step[count2]:
+                        raise QEOutputParsingError('Error while parsing stress: unexpected units.')
+                    for k in range(3):
+                        line2 = data_step[count2 + k + 1].split()
+                        vec = [float(s) * 10**(-9) * CONSTANTS.ry_si / (CONSTANTS.bohr_si)**3 for s in line2[0:3]]
+                        stress.append(vec)
+                    append_trajectory_frame(trajectory_data, 'stress', stress)
+                    parsed_data['stress' + units_suffix] = default_stress_units
+            except Exception:
+                import traceback
+                logs.warning.append(f'Error while parsing stress tensor: {traceback.format_exc()}')
+
+        # Electronic and ionic dipoles when 'lelfield' was set to True in input parameters
+        elif lelfield is True:
+
+            if 'Electronic Dipole per cell' in line:
+                electronic_dipole = float(line.split()[-1])
+                trajectory_frame.setdefault('electronic_dipole_cell_average', []).append(electronic_dipole)
+
+            elif 'Ionic Dipole per cell' in line:
+                ionic_dipole = float(line.split()[-1])
+                trajectory_frame.setdefault('ionic_dipole_cell_average', []).append(ionic_dipole)
+
+            elif 'Electronic Dipole on Cartesian axes' in line:
+                electronic_dipole = [float(data_step[count + i + 1].split()[1]) for i in range(3)]
+                trajectory_frame.setdefault('electronic_dipole_cartesian_axes', []).append(electronic_dipole)
+
+            elif 'Ionic Dipole on Cartesian axes' in line:
+                ionic_dipole = [float(data_step[count + i + 1].split()[1]) for i in range(3)]
+                trajectory_frame.setdefault('ionic_dipole_cartesian_axes', []).append(ionic_dipole)
+
+    # End of trajectory frame, only keep last entries for dipole related values
+    if lelfield is True:
+
+        # For every property only get the last entry if possible
+        try:
+            ed_cell = trajectory_frame['electronic_dipole_cell_average'].pop()
+        except (IndexError, KeyError):
+            ed_cell = None
+
+        try:
+            ed_axes = trajectory_frame['electronic_dipole_cartesian_axes'].pop()
+        except (IndexError, KeyError):
+            ed_axes = None
+
+        try:
+            id_cell = trajectory_frame['ionic_dipole_cell_average'].pop()
+        except (IndexError, KeyError):
+            id_cell = None
+
+        try:
+            id_axes = trajectory_frame['ionic_dipole_cartesian_axes'].pop()
+        except (IndexError, KeyError):
+            id_axes = None
+
+        # Only add them if all four properties were successfully parsed
+        if all([value is not None for value in [ed_cell, ed_axes, id_cell, id_axes]]):
+            trajectory_data.setdefault('electronic_dipole_cell_average', []).append(ed_cell)
+            trajectory_data.setdefault('electronic_dipole_cartesian_axes', []).append(ed_axes)
+            trajectory_data.setdefault('ionic_dipole_cell_average', []).append(id_cell)
+            trajectory_data.setdefault('ionic_dipole_cartesian_axes', []).append(id_axes)
+
+
+
+def append_trajectory_frame(trajectory_data, key, frame):
+    """Append a frame to the array of the trajectory data with the given key, which is created if it does not exist.
+
+    Quantities with a fixed shape per ionic step, such as the positions and forces, are accumulated in a
+    ``GrowableArray`` instead of a list of nested lists, which can be stored directly as an array of the trajectory.
+
+    :param trajectory_data: dictionary with the trajectory data
+    :param key: the key of the array
+    :param frame: array-like with the value of the quantity for a single step
+    """
+    try:
+        array = trajectory_data[key]
+    except KeyError:
+        array = trajectory_data[key] = GrowableArray(numpy.shape(frame))
+
+    array.append(frame)
+
+
 def grep_energy_from_line(line):
     try:
         return float(line.split('=')[1].split('Ry')[0]) * CONSTANTS.ry_to_ev
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Functions to parse the raw output files of the XSpectra code."""
+import numpy
+
+from aiida_quantumespresso.parsers import QEOutputParsingError
+
+__all__ = ('parse_lanczos_coefficients',)
+
+
+def _to_floats(tokens):
+    """Return the tokens of a line as floats, or ``None`` if any of them is not a number.
+
+    Fortran writes the exponent of double precision numbers with a ``D``, which is converted to an ``E`` first.
+    """
+    try:
+        return [float(token.upper().replace('D', 'E')) for token in tokens]
+    except ValueError:
+        return None
+
+
+def parse_lanczos_coefficients(content):
+    """Parse the Lanczos coefficients from the content of the ``x_save_file`` written by XSpectra.
+
+    The save file is written with one record per line, and ends with the data that is needed to compute the spectrum
+    again, which is the part that is read here: for each k-point the number of Lanczos iterations ``ncalcv`` that were
+    computed and the norm ``xnorm`` of the initial Lanczos vector, each on their own line, followed by the ``a`` and
+    ``b`` coefficients of all k-points as pairs on consecutive lines. The k-points and their weights are read from the
+    block of lines with four values that precedes this data, if present, otherwise all k-points get the same weight.
+
+    Since the header of the file changes between versions of XSpectra, the data is located from the end of the file and
+    only accepted if the number of pairs of coefficients is the sum of the number of iterations of all k-points.
+
+    .. warning:: this layout has only been tested on a synthetic save file and not yet on one written by xspectra.x.
+
+    :param content: the content of the save file.
+    :return: dictionary with the arrays ``a`` and ``b`` with shape ``(nkpoints, max(ncalcv))``, padded with zeros, and
+        the arrays ``ncalcv``, ``xnorm`` and ``weights`` with shape ``(nkpoints,)``.
+    :raises QEOutputParsingError: if the content does not end with a consistent set of Lanczos coefficients.
+    """
+    lines = [_to_floats(line.split()) for line in content.splitlines() if line.strip()]
+
+    end = len(lines)
+    start = end
+    while start > 0 and lines[start - 1] is not None and len(lines[start - 1]) == 2:
+        start -= 1
+
+    coefficients = numpy.array(lines[start:end], dtype=float).reshape(-1, 2)
+    number_of_coefficients = len(coefficients)
+
+    if number_of_coefficients == 0:
+        raise QEOutputParsingError('the save file does not end with the Lanczos coefficients.')
+
+    stop = start
+    while start > 0 and lines[start - 1] is not None and len(lines[start - 1]) == 1:
+        start -= 1
+
+    values = numpy.array(lines[start:stop], dtype=float).ravel()
+
+    # The lines with a single value may be preceded by a header line with a single value, so the number of k-points is
+    # the largest one for which the iterations are integers that add up to the number of pairs of coefficients.
+    for nkpoints in range(len(values) // 2, 0, -1):
+        ncalcv, xnorm = numpy.split(values[len(values) - 2 * nkpoints:], 2)
+
+        if numpy.all(ncalcv >= 1) and numpy.all(ncalcv == numpy.round(ncalcv)) and ncalcv.sum() == len(coefficients):
+            break
+    else:
+        raise QEOutputParsingError('the number of Lanczos iterations does not match the number of coefficients.')
+
+    ncalcv = ncalcv.astype(int)
+    start = stop - 2 * nkpoints
+    kpoints = []
+
+    while start > 0 and lines[start - 1] is not None and len(lines[start - 1]) == 4 and len(kpoints) < nkpoints:
+        start -= 1
+        kpoints.insert(0, lines[start])
+
+    if len(kpoints) == nkpoints:
+        weights = numpy.array(kpoints)[:, 3]
+    else:
+        weights = numpy.ones(nkpoints)
+
+    # Scatter the coefficients of all k-points into a padded array at once
+    rows = numpy.repeat(numpy.arange(nkpoints), ncalcv)
+    columns = numpy.arange(number_of_coefficients) - numpy.repeat(numpy.cumsum(ncalcv) - ncalcv, ncalcv)
+    padded = numpy.zeros((2, nkpoints, ncalcv.max()))
+    padded[:, rows, columns] = coefficients.T
+
+    return {
+        'a': padded[0],
+        'b': padded[1],
+        'ncalcv': ncalcv,
+        'xnorm': xnorm,
+        'weights': weights / weights.sum(),
+    }
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""Schema-free decoding of the XML output files of Quantum ESPRESSO into dictionaries.
+
+Decoding an XML output file with ``XMLSchema.to_dict`` validates every element against the schema while converting it,
+which is expensive for large files, e.g. with many k-points. Here, the XSD schema is only used once per process, to
+compile a table with, for each element, the decoders of its attributes and text and the specifications of its children.
+The XML document is then decoded by walking the ``ElementTree`` directly with this table. The resulting dictionary has
+the same structure as the one returned by ``XMLSchema.to_dict``, except for the namespace declarations of the root.
+"""
+import functools
+
+from xmlschema.validators import XsdAtomicBuiltin
+
+from .versions import get_xml_schema
+
+
+class ElementSpecification:
+    """Specification of how to decode an XML element of a given XSD type."""
+
+    __slots__ = ('is_simple', 'text_decoder', 'attribute_decoders', 'attribute_defaults', 'children')
+
+    def __init__(self):
+        self.is_simple = False
+        self.text_decoder = None
+        self.attribute_decoders = {}
+        self.attribute_defaults = {}
+        self.children = None
+
+
+def _decode_boolean(text):
+    """Decode the text of an ``xs:boolean``."""
+    return text.strip() in ('true', '1')
+
+
+def get_simple_type_decoder(simple_type):
+    """Return a function that decodes the text of the given XSD simple type into its Python value.
+
+    :param simple_type: the ``XsdSimpleType`` instance.
+    :return: callable that takes the text as its only argument.
+    """
+    if simple_type.is_list():
+        list_type = simple_type
+
+        while not hasattr(list_type, 'item_type'):
+            list_type = list_type.base_type
+
+        item_decoder = get_simple_type_decoder(list_type.item_type)
+
+        return lambda text: [item_decoder(item) for item in text.split()]
+
+    # Restrictions of builtin types, e.g. of ``xs:integer``, do not define their Python type, so take that of the builtin
+    builtin_type = simple_type
+
+    while builtin_type is not None and not isinstance(builtin_type, XsdAtomicBuiltin):
+        builtin_type = getattr(builtin_type, 'base_type', None)
+
+    python_type = getattr(builtin_type, 'python_type', None)
+
+    if python_type is bool:
+        return _decode_boolean
+
+    if python_type in (int, float):
+
+        def decode_number(text):
+            try:
+                return python_type(text)
+            except ValueError:
+                return simple_type.decode(text, validation='skip')
+
+        return decode_number
+
+    if python_type is str:
+        return simple_type.normalize
+
+    return functools.partial(simple_type.decode, validation='skip')
+
+
+def _build_element_specification(xsd_type, specifications):
+    """Build the ``ElementSpecification`` for the given XSD type, recursing into the types of its children.
+
+    :param xsd_type: the ``XsdType`` of the element.
+    :param specifications: dictionary of specifications that were already built, keyed on the ``id`` of their type.
+    :return: the ``ElementSpecification``.
+    """
+    try:
+        return specifications[id(xsd_type)]
+    except KeyError:
+        pass
+
+    # Register the specification before recursing into the children, in case a type contains itself
+    specification = ElementSpecification()
+    specifications[id(xsd_type)] = specification
+
+    if xsd_type.is_simple():
+        specification.is_simple = True
+        specification.text_decoder = get_simple_type_decoder(xsd_type)
+        return specification
+
+    for name, attribute in xsd_type.attributes.items():
+        if name is None:
+            continue
+        specification.attribute_decoders[name] = get_simple_type_decoder(attribute.type)
+        value = attribute.fixed if attribute.fixed is not None else attribute.default
+        if value is not None:
+            specification.attribute_defaults[name] = specification.attribute_decoders[name](value)
+
+    if xsd_type.has_simple_content():
+        specification.text_decoder = get_simple_type_decoder(xsd_type.content)
+        return specification
+
+    model_group = xsd_type.model_group
+
+    if model_group is not None:
+        has_single_group = model_group.is_single()
+        specification.children = {}
+
+        for xsd_child in model_group.iter_elements():
+            default = xsd_child.fixed if xsd_child.fixed is not None else xsd_child.default
+            specification.children[xsd_child.local_name] = (
+                _build_element_specification(xsd_child.type, specifications),
+                has_single_group and xsd_child.is_single(),
+                default,
+            )
+
+    return specification
+
+
+@functools.lru_cache(maxsize=None)
+def get_xml_decoding_table(schema_filename):
+    """Return the decoding table for the given XML schema, which is built once per process.
+
+    :param schema_filename: the filename of the XSD schema in the `DIRPATH_SCHEMAS` folder, e.g. `qes-1.0.xsd`.
+    :return: the ``ElementSpecification`` of the root element of the schema.
+    :raises URLError: if the schema file cannot be opened
+    """
+    xsd = get_xml_schema(schema_filename)
+    root = list(xsd.elements.values())[0]
+
+    return _build_element_specification(root.type, {})
+
+
+def _decode_text(specification, text, default):
+    """Decode the text content of a simple element, returning ``None`` for empty content without a default."""
+    if not text:
+        if default is None:
+            return None
+        text = default
+
+    return specification.text_decoder(text)
+
+
+def _decode_element(element, specification, default=None, skip=frozenset()):
+    """Decode the given XML element with its ``ElementSpecification``.
+
+    :param element: the ``Element`` to decode.
+    :param specification: the ``ElementSpecification`` of the element.
+    :param default: the default value of the element as defined in the schema, if any.
+    :param skip: set of tags of child elements that should not be decoded, at any depth.
+    :return: the decoded value, following the conventions of ``XMLSchema.to_dict``.
+    """
+    if specification.is_simple:
+        return _decode_text(specification, element.text, default)
+
+    attributes = element.attrib
+    result = {}
+
+    if attributes or specification.attribute_defaults:
+        decoders = specification.attribute_decoders
+
+        for name, value in specification.attribute_defaults.items():
+            if name not in attributes:
+                result[f'@{name}'] = value
+
+        for name, value in attributes.items():
+            try:
+                decoder = decoders[name]
+            except KeyError:
+                continue
+            result[f'@{name}'] = decoder(value)
+
+    if specification.children is None:
+        value = None if specification.text_decoder is None else _decode_text(specification, element.text, default)
+
+        if not result:
+            return value
+
+        if value is not None:
+            result['$'] = value
+
+        return result
+
+    children = specification.children
+
+    for child in element:
+        if child.tag in skip:
+            continue
+
+        try:
+            child_specification, is_single, child_default = children[child.tag]
+        except KeyError:
+            continue
+
+        value = _decode_element(child, child_specification, child_default, skip)
+        name = child.tag
+
+        try:
+            existing = result[name]
+        except KeyError:
+            result[name] = value if is_single else [value]
+        else:
+            if not isinstance(existing, list) or not existing:
+                result[name] = [existing, value]
+            elif isinstance(existing[0], list) or not isinstance(value, list):
+                existing.append(value)
+            else:
+                result[name] = [existing, value]
+
+    return result or None
+
+
+def decode_xml(xml, schema_filename, skip=()):
+    """Decode the given XML document into a dictionary, using the decoding table of the given XML schema.
+
+    .. note:: the XML document is not validated against the schema. Use ``XMLSchema.to_dict`` for that purpose.
+
+    :param xml: the pre-parsed XML object
+    :param schema_filename: the filename of the XSD schema in the `DIRPATH_SCHEMAS` folder, e.g. `qes-1.0.xsd`.
+    :param skip: tags of elements that should not be decoded, for example because they are parsed separately.
+    :return: dictionary with the decoded XML content
+    """
+    specification = get_xml_decoding_table(schema_filename)
+
+    return _decode_element(xml.getroot(), specification, skip=frozenset(skip)) or {}
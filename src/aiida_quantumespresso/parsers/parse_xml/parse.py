@@ -4,12 +4,12 @@ from urllib.error import URLError
 import numpy as np
 from packaging.version import Version
 from qe_tools import CONSTANTS
-from xmlschema import XMLSchema
 
 from aiida_quantumespresso.utils.mapping import get_logging_container
 
+from .decode import decode_xml
 from .exceptions import XMLParseError
-from .versions import get_default_schema_filepath, get_schema_filepath
+from .versions import DEFAULT_SCHEMA_FILENAME, get_schema_filename, get_xml_schema
 
 
 def raise_parsing_error(message):
@@ -39,35 +39,74 @@ def cell_volume(a1, a2, a3):
     return abs(float(a1[0] * a_mid_0 + a1[1] * a_mid_1 + a1[2] * a_mid_2))
 
 
-def parse_xml_post_6_2(xml):
+def parse_ks_energies(element_band_structure, num_k_points, num_bands, num_spins=1):
+    """Parse the ``ks_energies`` elements of the band structure directly into preallocated arrays.
+
+    The text of each element is converted with a single call to ``np.fromstring`` and written into the arrays in place,
+    such that no intermediate lists of Python floats are created, which for dense k-point grids can be very large.
+
+    :param element_band_structure: the ``band_structure`` XML element.
+    :param num_k_points: the number of k-points.
+    :param num_bands: the number of bands per spin channel.
+    :param num_spins: the number of spin channels whose bands are concatenated in the ``eigenvalues`` and
+        ``occupations`` elements, i.e. 2 for collinear spin-polarized calculations and 1 otherwise.
+    :return: tuple of four arrays: the k-points of shape (nk, 3) in units of 2 pi / alat, the k-point weights of shape
+        (nk,), the eigenvalues and the occupations, both of shape (nspin, nk, nbnd) with eigenvalues in Hartree.
+    """
+    elements_ks_energies = element_band_structure.findall('ks_energies')
+
+    parser_assert_equal(len(elements_ks_energies), num_k_points, 'Unexpected number of ks_energies')
+
+    k_points = np.empty((num_k_points, 3))
+    k_points_weights = np.empty(num_k_points)
+    eigenvalues = np.empty((num_spins, num_k_points, num_bands))
+    occupations = np.empty((num_spins, num_k_points, num_bands))
+
+    for index, element in enumerate(elements_ks_energies):
+        element_k_point = element.find('k_point')
+        k_points[index] = np.fromstring(element_k_point.text, sep=' ')
+        k_points_weights[index] = float(element_k_point.get('weight'))
+
+        for array, tag in ((eigenvalues, 'eigenvalues'), (occupations, 'occupations')):
+            values = np.fromstring(element.find(tag).text, sep=' ')
+            parser_assert_equal(values.size, num_spins * num_bands, f'Unexpected number of {tag}')
+            array[:, index, :] = values.reshape(num_spins, num_bands)
+
+    return k_points, k_points_weights, eigenvalues, occupations
+
+
+def parse_xml_post_6_2(xml, validate=False):
     """Parse the content of XML output file written by `pw.x` and `cp.x` with the new schema-based XML format.
 
+    By default, the XML is decoded directly with the decoding table of its schema, see ``decode_xml``, which is much
+    faster than decoding it through the schema. Validation against the schema is only performed if ``validate=True``, in
+    which case any validation errors are added to the error logs.
+
     :param xml: parsed XML
+    :param validate: validate the XML against its schema while decoding it.
     :returns: tuple of two dictionaries, with the parsed data and log messages, respectively
     """
     e_bohr2_to_coulomb_m2 = 57.214766  # e/a0^2 to C/m^2 (electric polarization) from Wolfram Alpha
 
     logs = get_logging_container()
 
-    schema_filepath = get_schema_filepath(xml)
+    schema_filename = get_schema_filename(xml)
 
     try:
-        xsd = XMLSchema(schema_filepath)
+        xsd = get_xml_schema(schema_filename)
     except URLError:
 
         # If loading the XSD file specified in the XML file fails, we try the default
-        schema_filepath_default = get_default_schema_filepath()
-
         try:
-            xsd = XMLSchema(schema_filepath_default)
+            xsd = get_xml_schema(DEFAULT_SCHEMA_FILENAME)
         except URLError:
             raise XMLParseError(
-                f'Could not open or parse the XSD files {schema_filepath} and {schema_filepath_default}'
+                f'Could not open or parse the XSD files {schema_filename} and {DEFAULT_SCHEMA_FILENAME}'
             )
         else:
-            schema_filepath = schema_filepath_default
+            schema_filename = DEFAULT_SCHEMA_FILENAME
 
-    # Validate XML document against the schema
+    # Decode the XML document, optionally validating it against the schema
     # Returned dictionary has a structure where, if tag ['key'] is "simple", xml_dictionary['key'] returns its content.
     # Otherwise, the following keys are available:
     #
@@ -89,11 +128,15 @@ def parse_xml_post_6_2(xml):
             except (TypeError, ValueError):
                 pass
 
-    xml_dictionary, errors = xsd.to_dict(xml, validation='lax')
-    if errors:
-        logs.error.append(f'{len(errors)} XML schema validation error(s) schema: {schema_filepath}:')
-        for err in errors:
-            logs.error.append(str(err))
+    if validate:
+        xml_dictionary, errors = xsd.to_dict(xml, validation='lax')
+        if errors:
+            logs.error.append(f'{len(errors)} XML schema validation error(s) schema: {schema_filename}:')
+            for err in errors:
+                logs.error.append(str(err))
+    else:
+        # The ``ks_energies`` are parsed directly from the XML into arrays further down
+        xml_dictionary = decode_xml(xml, schema_filename, skip=['ks_energies'])
 
     xml_version = Version(xml_dictionary['general_info']['xml_format']['@VERSION'])
     inputs = xml_dictionary.get('input', {})
@@ -329,45 +372,15 @@ def parse_xml_post_6_2(xml):
             if num_bands is None:
                 num_bands = num_bands_up + num_bands_down  # backwards compatibility;
 
-        k_points = []
-        k_points_weights = []
-        ks_states = band_structure['ks_energies']
-        for ks_state in ks_states:
-            k_points.append([kp * 2 * np.pi / output_alat_angstrom for kp in ks_state['k_point']['$']])
-            k_points_weights.append(ks_state['k_point']['@weight'])
-
-        if not spins:
-            band_eigenvalues = [[]]
-            band_occupations = [[]]
-            for ks_state in ks_states:
-                band_eigenvalues[0].append(ks_state['eigenvalues']['$'])
-                band_occupations[0].append(ks_state['occupations']['$'])
-        else:
-            band_eigenvalues = [[], []]
-            band_occupations = [[], []]
-            for ks_state in ks_states:
-                band_eigenvalues[0].append(ks_state['eigenvalues']['$'][0:num_bands_up])
-                band_eigenvalues[1].append(ks_state['eigenvalues']['$'][num_bands_up:num_bands])
-                band_occupations[0].append(ks_state['occupations']['$'][0:num_bands_up])
-                band_occupations[1].append(ks_state['occupations']['$'][num_bands_up:num_bands])
-
-        band_eigenvalues = np.array(band_eigenvalues) * CONSTANTS.hartree_to_ev
-        band_occupations = np.array(band_occupations)
-
-        if not spins:
-            parser_assert_equal(
-                band_eigenvalues.shape, (1, num_k_points, num_bands), 'Unexpected shape of band_eigenvalues'
-            )
-            parser_assert_equal(
-                band_occupations.shape, (1, num_k_points, num_bands), 'Unexpected shape of band_occupations'
-            )
-        else:
-            parser_assert_equal(
-                band_eigenvalues.shape, (2, num_k_points, num_bands_up), 'Unexpected shape of band_eigenvalues'
-            )
-            parser_assert_equal(
-                band_occupations.shape, (2, num_k_points, num_bands_up), 'Unexpected shape of band_occupations'
-            )
+        k_points, k_points_weights, band_eigenvalues, band_occupations = parse_ks_energies(
+            xml.getroot().find('output/band_structure'),
+            num_k_points,
+            num_bands_up if spins else num_bands,
+            2 if spins else 1,
+        )
+        k_points *= 2 * np.pi
+        k_points /= output_alat_angstrom
+        band_eigenvalues *= CONSTANTS.hartree_to_ev
 
         if not spins:
             xml_data['number_of_bands'] = num_bands
@@ -397,8 +410,8 @@ def parse_xml_post_6_2(xml):
         xml_data['number_of_atomic_wfc'] = num_atomic_wfc
         xml_data['number_of_k_points'] = num_k_points
         xml_data['number_of_electrons'] = num_electrons
-        xml_data['k_points'] = k_points
-        xml_data['k_points_weights'] = k_points_weights
+        xml_data['k_points'] = k_points.tolist()
+        xml_data['k_points_weights'] = k_points_weights.tolist()
         xml_data['bands'] = bands_dict
 
     try:
@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 import enum
+import functools
 import os
 
+from xmlschema import XMLSchema
+
 from aiida_quantumespresso.parsers.parse_xml.exceptions import XMLUnsupportedFormatError
 
 DEFAULT_SCHEMA_FILENAME = 'qes-1.0.xsd'
@@ -99,6 +102,36 @@ def get_available_xml_schemas():
     return [file for file in os.listdir(DIRPATH_SCHEMAS) if file.endswith('.xsd')]
 
 
+@functools.lru_cache(maxsize=None)
+def get_xml_schema(schema_filename):
+    """Return the compiled XML schema for the given schema filename.
+
+    Building an ``XMLSchema`` from the XSD file is expensive, typically more so than decoding the XML output file that it
+    is used for. The compiled schema is therefore cached per process, such that each schema is only ever built once.
+
+    :param schema_filename: the filename of the XSD schema in the `DIRPATH_SCHEMAS` folder, e.g. `qes-1.0.xsd`.
+    :return: the compiled ``XMLSchema`` instance
+    :raises URLError: if the schema file cannot be opened
+    """
+    return XMLSchema(os.path.join(DIRPATH_SCHEMAS, schema_filename))
+
+
+def load_available_xml_schemas():
+    """Compile and cache all the available XML schemas.
+
+    Calling this function once, for example when a daemon worker is started, moves the cost of building the schemas out
+    of the parsing of the first calculation that uses each of them.
+
+    :return: a list of XML schema filenames that were compiled
+    """
+    schema_filenames = sorted(get_available_xml_schemas())
+
+    for schema_filename in schema_filenames:
+        get_xml_schema(schema_filename)
+
+    return schema_filenames
+
+
 def is_valid_post_6_2_version(xml):
     """Return whether the given XML object corresponds to an XML output file of Quantum ESPRESSO pw.x post v6.2.
 
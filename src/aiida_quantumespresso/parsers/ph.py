@@ -4,9 +4,14 @@ import os
 import re
 
 from aiida import orm
+import numpy
 
 from aiida_quantumespresso.calculations.ph import PhCalculation
-from aiida_quantumespresso.parsers.parse_raw.ph import parse_initialization_qpoints, parse_raw_ph_output
+from aiida_quantumespresso.parsers.parse_raw.ph import (
+    parse_initialization_qpoints,
+    parse_ph_dynamical_matrices,
+    parse_raw_ph_output,
+)
 from aiida_quantumespresso.utils.mapping import get_logging_container
 
 from .base import BaseParser
@@ -67,8 +72,10 @@ class PhParser(BaseParser):
         except OSError:
             tensor_file = None
 
-        # Look for dynamical matrices
-        dynmat_files = []
+        # Look for dynamical matrices, keyed on the index of their q-point, which is the suffix of their filename. Since
+        # a run with `start_q` and `last_q` only writes the dynamical matrices of its own q-points, the indices are not
+        # necessarily contiguous.
+        dynmat_files = {}
         dynmat_folder = self.node.process_class._FOLDER_DYNAMICAL_MATRIX
         dynmat_prefix = os.path.split(self.node.process_class._OUTPUT_DYNAMICAL_MATRIX_PREFIX)[1]
 
@@ -77,15 +84,63 @@ class PhParser(BaseParser):
             if not filename.startswith(dynmat_prefix) or filename.endswith('.freq'):
                 continue
 
-            dynmat_files.append(self.retrieved.base.repository.get_object_content(os.path.join(dynmat_folder, filename)))
+            suffix = filename[len(dynmat_prefix):]
 
-        parsed_ph_data, logs = parse_raw_ph_output(stdout, logs, tensor_file, dynmat_files)
+            if suffix and not suffix.isdigit():
+                continue
+
+            dynmat_files[int(suffix or 0)] = self.retrieved.base.repository.get_object_content(
+                os.path.join(dynmat_folder, filename)
+            )
+
+        dynamical_matrices = parse_ph_dynamical_matrices(dynmat_files, logs)
+        parsed_ph_data, logs = parse_raw_ph_output(stdout, logs, tensor_file, dynamical_matrices)
         parsed_data.update(parsed_ph_data)
 
         self.out('output_parameters', orm.Dict(parsed_data))
 
+        if dynamical_matrices:
+            self.build_output_dynamical_matrices(dynamical_matrices, parsed_data, logs)
+
         for exit_code in list(self.get_error_map().values()) + ['ERROR_OUTPUT_STDOUT_INCOMPLETE']:
             if exit_code in logs.error:
                 return self.exit(self.exit_codes.get(exit_code), logs)
 
         return self.exit(logs=logs)
+
+    def build_output_dynamical_matrices(self, dynamical_matrices, parsed_data, logs):
+        """Stack the arrays of the dynamical matrices of all q-points with modes into the `output_dynamical_matrices`.
+
+        The symmetry labels of the modes, which are parsed from the stdout, are only added if known for all q-points.
+
+        :param dynamical_matrices: mapping of the index of each q-point onto the arrays of its dynamical matrix.
+        :param parsed_data: the parsed output parameters, with the symmetry labels of the dynamical matrices.
+        :param logs: the logging container, to which a warning is added if the arrays cannot be stacked.
+        """
+        indices = [index for index, arrays in sorted(dynamical_matrices.items()) if arrays['frequencies'].size]
+
+        if not indices:
+            return
+
+        labels = [parsed_data.get(f'dynamical_matrix_{index}', {}) for index in indices]
+
+        try:
+            arrays = {
+                'qpoint_indices': numpy.array(indices),
+                'q_points': numpy.stack([dynamical_matrices[index]['q_point'] for index in indices]),
+                'frequencies': numpy.stack([dynamical_matrices[index]['frequencies'] for index in indices]),
+                'eigenvectors': numpy.stack([dynamical_matrices[index]['eigenvectors'] for index in indices]),
+            }
+            if all('mode_symmetry' in label for label in labels):
+                arrays['mode_symmetry'] = numpy.array([label['mode_symmetry'] for label in labels])
+                arrays['point_group'] = numpy.array([label['point_group'] for label in labels])
+        except ValueError:
+            logs.warning.append('The dynamical matrices of the q-points have inconsistent shapes.')
+            return
+
+        output_dynamical_matrices = orm.ArrayData()
+
+        for name, array in arrays.items():
+            output_dynamical_matrices.set_array(name, array)
+
+        self.out('output_dynamical_matrices', output_dynamical_matrices)
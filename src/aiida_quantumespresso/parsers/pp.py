@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 """`Parser` implementation for the `PpCalculation` calculation job class."""
+import contextlib
+import io
 import os
 import re
 from typing import Tuple
@@ -9,6 +11,7 @@ from aiida.common import AttributeDict
 import numpy as np
 
 from aiida_quantumespresso.calculations.pp import PpCalculation
+from aiida_quantumespresso.parsers.parse_raw.base import read_numeric_array
 from aiida_quantumespresso.utils.mapping import get_logging_container
 
 from .base import BaseParser
@@ -85,13 +88,17 @@ class PpParser(BaseParser):
         # the same loop logic in each branch, we apply a somewhat dirty trick to define an `opener` which is a callable
         # that will open a handle to the output file given a certain filename. This works since it is guaranteed that
         # these output files (excluding the standard output) will all either be in the retrieved, or in the retrieved
-        # temporary folder.
+        # temporary folder. The files are opened as streams, such that they are never read into memory as a whole.
         if retrieve_temporary_list:
             filenames = os.listdir(retrieved_temporary_folder)
-            file_opener = lambda filename: open(os.path.join(retrieved_temporary_folder, filename))
+            file_opener = lambda filename: open(os.path.join(retrieved_temporary_folder, filename), encoding='utf-8')
         else:
             filenames = self.retrieved.base.repository.list_object_names()
-            file_opener = self.retrieved.base.repository.open
+
+            @contextlib.contextmanager
+            def file_opener(filename):
+                with self.retrieved.base.repository.open(filename, 'rb') as handle:
+                    yield io.TextIOWrapper(handle, encoding='utf-8')
 
         # The following check should in principle always succeed since the iflag should in principle be set by the
         # `PpCalculation` plugin which only ever sets 0 - 4, but we check in order for the code not to except.
@@ -119,20 +126,15 @@ class PpParser(BaseParser):
 
         if self.node.base.attributes.get('parse_data_files'):
             for filename in filenames:
-                # Directly parse the retrieved files after reading them to memory (`data_raw`). The raw data
-                # of each file is released from memory after parsing, to improve memory usage.
+                # Directly parse the retrieved files from a stream, which is converted to arrays in chunks, to
+                # improve memory usage.
                 if filename.endswith(filename_suffix):
-                    # Read the file to memory
                     try:
                         with file_opener(filename) as handle:
-                            data_raw = handle.read()
+                            key = get_key_from_filename(filename)
+                            data_parsed.append((key, parsers[iflag](handle, self.units_dict[parsed_data['plot_num']])))
                     except OSError:
                         return self.exit_codes.ERROR_OUTPUT_DATAFILE_READ.format(filename=filename)
-                    # Parse the file
-                    try:
-                        key = get_key_from_filename(filename)
-                        data_parsed.append((key, parsers[iflag](data_raw, self.units_dict[parsed_data['plot_num']])))
-                        del data_raw
                     except Exception as exception:  # pylint: disable=broad-except
                         return self.exit_codes.ERROR_OUTPUT_DATAFILE_PARSE.format(filename=filename, exception=exception)
 
@@ -176,114 +178,93 @@ class PpParser(BaseParser):
         return parsed_data, logs
 
     @staticmethod
-    def parse_gnuplot1D(data_file_str, data_units):
+    def parse_gnuplot1D(handle, data_units):
         """Parse 1D GNUPlot formatted output.
 
-        :param data_file_str: the data file read in as a single string
+        :param handle: a handle to the data file opened in text mode
         """
-        data_lines = data_file_str.splitlines()
+        first_line = handle.readline().split()
+        n_col = len(first_line)
+
+        if n_col not in (2, 3):
+            raise ValueError(f'expected 2 or 3 columns but found {n_col}')
 
-        n_col = len(data_lines[0].split())
+        columns = np.concatenate((np.array(first_line, dtype=float), read_numeric_array(handle)))
+        columns = columns.reshape(-1, n_col).T
+        coords = columns[0]
 
         # 1D case
         if n_col == 2:
-            coords = []
-            data = []
-            data_integral = []
-            for line in data_lines:
-                split_line = line.split()
-                coords.append(float(split_line[0]))
-                data.append(float(split_line[1]))
-            y_data = [data]
+            y_data = [columns[1]]
             y_names = ['data']
             y_units = [data_units]
 
         # 1D case with spherical averaging
         if n_col == 3:
-            coords = []
-            data = []
-            data_integral = []
-            for line in data_lines:
-                split_line = line.split()
-                coords.append(float(split_line[0]))
-                data.append(float(split_line[1]))
-                data_integral.append(float(split_line[2]))
-            y_data = [data, data_integral]
+            y_data = [columns[1], columns[2]]
             y_names = ['data', 'integrated_data']
             y_units = [data_units, data_units.replace('bohr^3', 'bohr')]
 
         x_units = 'bohr'
         arraydata = orm.ArrayData()
-        arraydata.set_array('x_coordinates', np.array(coords))
+        arraydata.set_array('x_coordinates', np.ascontiguousarray(coords))
         arraydata.set_array('x_coordinates_units', np.array(x_units))
         for name, data, units in zip(y_names, y_data, y_units):
-            arraydata.set_array(name, np.array(data))
+            arraydata.set_array(name, np.ascontiguousarray(data))
             arraydata.set_array(name + '_units', np.array(units))
 
         return arraydata
 
     @staticmethod
-    def parse_gnuplot_polar(data_file_str, data_units):
+    def parse_gnuplot_polar(handle, data_units):
         """Parse 2D Polar GNUPlot formatted, single column output.
 
-        :param data_file_str: the data file read in as a single string
+        :param handle: a handle to the data file opened in text mode
         """
-        data_lines = data_file_str.splitlines()
-        data_lines.pop(0)  # First line is a header
+        handle.readline()  # First line is a header
 
-        data = []
-        for line in data_lines:
-            data.append(float(line))
+        data = read_numeric_array(handle)
 
         arraydata = orm.ArrayData()
-        arraydata.set_array('data', np.array(data))
+        arraydata.set_array('data', data)
         arraydata.set_array('data_units', np.array([data_units]))
 
         return arraydata
 
     @staticmethod
-    def parse_gnuplot2D(data_file_str, data_units):
+    def parse_gnuplot2D(handle, data_units):
         """Parse 2D GNUPlot formatted output.
 
-        :param data_file_str: the data file read in as a single string
-        """
-        data_lines = data_file_str.splitlines()
-
-        coords = []
-        data = []
+        The data blocks of the file are separated by empty lines, which are skipped along with the other whitespace.
 
-        for line in data_lines:
-            stripped = line.strip()
-            if stripped == '':
-                continue
-            else:
-                split_line = stripped.split()
-                coords.append([float(split_line[0]), float(split_line[1])])
-                data.append(float(split_line[2]))
+        :param handle: a handle to the data file opened in text mode
+        """
+        columns = read_numeric_array(handle).reshape(-1, 3)
 
         coords_units = 'bohr'
         arraydata = orm.ArrayData()
-        arraydata.set_array('xy_coordinates', np.array(coords))
-        arraydata.set_array('data', np.array(data))
+        arraydata.set_array('xy_coordinates', np.ascontiguousarray(columns[:, :2]))
+        arraydata.set_array('data', np.ascontiguousarray(columns[:, 2]))
         arraydata.set_array('xy_coordinates_units', np.array(coords_units))
         arraydata.set_array('data_units', np.array(data_units))
 
         return arraydata
 
     @staticmethod
-    def parse_gaussian(data_file_str, data_units):
+    def parse_gaussian(handle, data_units):
         """Parse Gaussian Cube formatted output.
 
-        :param data_file_str: the data file read in as a single string
+        :param handle: a handle to the data file opened in text mode
         """
-        lines = data_file_str.splitlines()
+        # Header of the file: comments, the voxel, and the number of atoms and datapoints
+        header = [handle.readline() for _ in range(6)]
 
-        atoms_line = lines[2].split()
+        atoms_line = header[2].split()
         natoms = int(atoms_line[0])  # The number of atoms listed in the file
-        origin = np.array(atoms_line[1:], dtype=float)
 
-        header = lines[:6 + natoms]  # Header of the file: comments, the voxel, and the number of atoms and datapoints
-        data_lines = lines[6 + natoms:]  # The actual data: atoms and volumetric data
+        # Skip the atoms, after which follows the actual volumetric data
+        for _ in range(natoms):
+            handle.readline()
 
         # Parse the declared dimensions of the volumetric data
         x_line = header[3].split()
@@ -299,13 +280,7 @@ class PpParser(BaseParser):
                                dtype=np.float64)
 
         # Get the volumetric data
-        data_array = np.empty(xdim * ydim * zdim, dtype=float)
-        cursor = 0
-        for line in data_lines:
-            ls = line.split()
-            data_array[cursor:cursor + len(ls)] = ls
-            cursor += len(ls)
-        data_array = data_array.reshape((xdim, ydim, zdim))
+        data_array = read_numeric_array(handle, size=xdim * ydim * zdim).reshape((xdim, ydim, zdim))
 
         coordinates_units = 'bohr'
 
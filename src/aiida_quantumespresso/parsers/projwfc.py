@@ -1,18 +1,32 @@
 # -*- coding: utf-8 -*-
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
 import fnmatch
+import io
+import os
 from pathlib import Path
 import re
 
+from aiida.common import exceptions
 from aiida.orm import BandsData, Dict, ProjectionData, XyData
 from aiida.plugins import OrbitalFactory
 import numpy as np
 
+from aiida_quantumespresso.data.projection import SparseProjectionData
 from aiida_quantumespresso.parsers import QEOutputParsingError
-from aiida_quantumespresso.parsers.parse_raw.base import convert_qe_to_aiida_structure, convert_qe_to_kpoints
+from aiida_quantumespresso.parsers.parse_raw.base import (
+    convert_qe_to_aiida_structure,
+    convert_qe_to_kpoints,
+    read_numeric_array,
+)
 from aiida_quantumespresso.utils.mapping import get_logging_container
 
 from .base import BaseParser
 
+#: Replaces the characters around the coefficient and index of each term of a projection, e.g. ``+0.226*[#  27]``
+TRANSLATION_PROJECTION_TERMS = str.maketrans('*[#]', '    ')
+
 
 def find_orbitals_from_statelines(out_info_dict):
     """This function reads in all the state_lines, that is, the lines describing which atomic states, taken from the
@@ -84,17 +98,13 @@ def find_orbitals_from_statelines(out_info_dict):
             raise QEOutputParsingError('State lines are not formatted in a standard way.')
         state_dicts.append(state_dict)
 
-    # here is some logic to figure out the value of radial_nodes to use
-    new_state_dicts = []
-    for i in range(len(state_dicts)):
-        radial_nodes = 0
-        state_dict = state_dicts[i].copy()
-        for j in range(i - 1, -1, -1):
-            if state_dict == state_dicts[j]:
-                radial_nodes += 1
-        state_dict['radial_nodes'] = radial_nodes
-        new_state_dicts.append(state_dict)
-    state_dicts = new_state_dicts
+    # here is some logic to figure out the value of radial_nodes to use: it is the number of preceding states with the
+    # same quantum numbers on the same atom
+    counter = Counter()
+    for state_dict in state_dicts:
+        key = tuple(sorted(state_dict.items()))
+        state_dict['radial_nodes'] = counter[key]
+        counter[key] += 1
 
     # here is some logic to assign positions based on the atom_index
     structure = out_info_dict['structure']
@@ -123,50 +133,12 @@ def spin_dependent_subparser(out_info_dict):
     :param out_info_dict: contains various technical internals useful in parsing
     :return: ProjectionData, BandsData parsed from out_file
     """
-    out_file = out_info_dict['out_file']
     spin_down = out_info_dict['spin_down']
     od = out_info_dict  # using a shorter name for convenience
-    #   regular expressions needed for later parsing
-    WaveFraction1_re = re.compile(r'\=(.*?)\*')  # state composition 1
-    WaveFractionremain_re = re.compile(r'\+(.*?)\*')  # state comp 2
-    FunctionId_re = re.compile(r'\#(.*?)\]')  # state identity
-    # primes arrays for the later parsing
-    num_wfc = len(od['wfc_lines'])
-    bands = np.zeros([od['k_states'], od['num_bands']])
-    projection_arrays = np.zeros([od['k_states'], od['num_bands'], num_wfc])
-
-    try:
-        for i in range(od['k_states']):
-            if spin_down:
-                i += od['k_states']
-            # grabs band energy
-            for j in range(i * od['num_bands'], (i + 1) * od['num_bands'], 1):
-                out_ind = od['e_lines'][j]
-                try:
-                    # post ~6.3 <6.5 output format "e ="
-                    val = out_file[out_ind].split()[2]
-                    float(val)
-                except ValueError:
-                    # pre ~6.3 and 6.5+ output format "==== e("
-                    val = out_file[out_ind].split(' = ')[1].split()[0]
-                bands[i % od['k_states']][j % od['num_bands']] = val
-                #subloop grabs pdos
-                wave_fraction = []
-                wave_id = []
-                for k in range(od['e_lines'][j] + 1, od['psi_lines'][j], 1):
-                    out_line = out_file[k]
-                    wave_fraction += WaveFraction1_re.findall(out_line)
-                    wave_fraction += WaveFractionremain_re.findall(out_line)
-                    wave_id += FunctionId_re.findall(out_line)
-                if len(wave_id) != len(wave_fraction):
-                    raise IndexError
-                for l in range(len(wave_id)):
-                    wave_id[l] = int(wave_id[l])
-                    wave_fraction[l] = float(wave_fraction[l])
-                    #sets relevant values in pdos_array
-                    projection_arrays[i % od['k_states']][j % od['num_bands']][wave_id[l] - 1] = wave_fraction[l]
-    except IndexError:
-        raise QEOutputParsingError('the standard out file does not comply with the official documentation.')
+    # the spin down states are written after all the spin up states
+    k_slice = slice(od['k_states'], 2 * od['k_states']) if spin_down else slice(0, od['k_states'])
+    bands = od['bands'][k_slice]
+    projection_arrays = od['projections'][k_slice]
 
     bands_data = BandsData()
     kpoints = od['kpoints']
@@ -186,8 +158,6 @@ def spin_dependent_subparser(out_info_dict):
             ' the projection array shape does not agree'
             ' with the number of orbitals'
         )
-    projection_data = ProjectionData()
-    projection_data.set_reference_bandsdata(bands_data)
     projections = [projection_arrays[:, :, i] for i in range(len(orbitals))]
 
     # Do the bands_check manually here
@@ -197,18 +167,86 @@ def spin_dependent_subparser(out_info_dict):
 
     #insert here some logic to assign pdos to the orbitals
     pdos_arrays = spin_dependent_pdos_subparser(out_info_dict)
+
+    if out_info_dict.get('sparse_projections', False):
+        # the projections are stored as a sparse matrix and the energy grid is stored only once for all orbitals
+        projection_data = SparseProjectionData()
+        projection_data.set_reference_bandsdata(bands_data)
+        projection_data.set_sparse_projectiondata(
+            orbitals, projection_arrays, energy=out_info_dict['energy'], pdos=pdos_arrays
+        )
+        return bands_data, projection_data
+
+    projection_data = ProjectionData()
+    projection_data.set_reference_bandsdata(bands_data)
     energy_arrays = [out_info_dict['energy']] * len(orbitals)
     projection_data.set_projectiondata(
         orbitals,
         list_of_projections=projections,
         list_of_energy=energy_arrays,
-        list_of_pdos=pdos_arrays,
+        list_of_pdos=list(pdos_arrays),
         bands_check=False
     )
     # pdos=pdos_arrays
     return bands_data, projection_data
 
 
+def parse_band_energy(line):
+    """Parse the energy of a band from the line that precedes its projections.
+
+    :param line: the line with the energy of the band, e.g. ``==== e(   1) =   -68.36512 eV ====``.
+    :return: the energy as a float.
+    """
+    try:
+        # post ~6.3 <6.5 output format "e ="
+        return float(line.split()[2])
+    except ValueError:
+        # pre ~6.3 and 6.5+ output format "==== e("
+        return float(line.split(' = ')[1].split()[0])
+
+
+def parse_projections(out_file, e_lines, psi_lines, num_wfc):
+    """Parse the projections of all bands onto the atomic states from the standard output of ``projwfc.x``.
+
+    The projection of each band is printed between its energy line and its ``|psi|^2`` line, as a sum of terms like
+    ``+0.226*[#  27]``. The lines of all bands are joined and stripped of all but the coefficients and the indices of
+    the states, such that they can be converted in a single pass. States that are not printed, because their coefficient
+    is below the print threshold, have a zero projection.
+
+    :param out_file: the lines of the standard output.
+    :param e_lines: the indices of the energy line of each band, for all k-points and spins.
+    :param psi_lines: the indices of the ``|psi|^2`` line of each band, for all k-points and spins.
+    :param num_wfc: the number of atomic states.
+    :return: array with shape ``(len(e_lines), num_wfc)``.
+    :raises QEOutputParsingError: if the projections cannot be parsed or refer to a state that does not exist.
+    """
+    error_message = 'the standard out file does not comply with the official documentation.'
+    projections = np.zeros((len(e_lines), num_wfc))
+
+    blocks = [' '.join(out_file[e_line + 1:psi_line]) for e_line, psi_line in zip(e_lines, psi_lines)]
+    number_of_terms = [block.count('*') for block in blocks]
+    text = ' '.join(blocks).replace('psi =', ' ').translate(TRANSLATION_PROJECTION_TERMS)
+
+    try:
+        values = read_numeric_array(io.StringIO(text))
+    except ValueError as exception:
+        raise QEOutputParsingError(error_message) from exception
+
+    if values.size != 2 * sum(number_of_terms):
+        raise QEOutputParsingError(error_message)
+
+    band_indices = np.repeat(np.arange(len(blocks)), number_of_terms)
+    coefficients = values[0::2]
+    wfc_indices = values[1::2].astype(int) - 1
+
+    if wfc_indices.size and not 0 <= wfc_indices.min() <= wfc_indices.max() < num_wfc:
+        raise QEOutputParsingError(error_message)
+
+    projections[band_indices, wfc_indices] = coefficients
+
+    return projections
+
+
 def natural_sort_key(sort_key, _nsre=re.compile('([0-9]+)')):
     """Pass to ``key`` for ``str.sort`` to achieve natural sorting. For example, ``["2", "11", "1"]`` will be sorted to
     ``["1", "2", "11"]`` instead of ``["1", "11", "2"]``
@@ -228,8 +266,11 @@ def natural_sort_key(sort_key, _nsre=re.compile('([0-9]+)')):
 def spin_dependent_pdos_subparser(out_info_dict):
     """Finds and labels the pdos arrays associated with the out_info_dict.
 
+    The columns of all pdos files that belong to the spin channel are copied into a single array, which is allocated
+    once for all orbitals.
+
     :param out_info_dict: contains various technical internals useful in parsing
-    :return: (pdos_name, pdos_array) tuples for all the specific pdos
+    :return: array with shape ``(norbitals, nenergy)`` with the pdos of all orbitals
     """
     spin = out_info_dict['spin']
     collinear = out_info_dict.get('collinear', True)
@@ -249,23 +290,70 @@ def spin_dependent_pdos_subparser(out_info_dict):
     fa = first_array
     pdos_file_names = [k for k in pdos_atm_array_dict]
     pdos_file_names.sort(key=natural_sort_key)
-    out_arrays = []
     # we can keep the pdos in synch with the projections by relying on the fact
     # both are produced in the same order (thus the sorted file_names)
+    columns = []
     for name in pdos_file_names:
-        this_array = pdos_atm_array_dict[name]
+        number_of_columns = np.shape(pdos_atm_array_dict[name])[1]
         if not collinear and not spinorbit:
             # In the non-collinear, non-spinorbit case, the "up"-spin orbitals
             # come first, followed by all "down" orbitals
-            for i in range(3, np.shape(this_array)[1], 2):
-                out_arrays.append(this_array[:, i])
-            for i in range(4, np.shape(this_array)[1], 2):
-                out_arrays.append(this_array[:, i])
+            columns.append(list(range(3, number_of_columns, 2)) + list(range(4, number_of_columns, 2)))
         else:
-            for i in range(fa, np.shape(this_array)[1], mf):
-                out_arrays.append(this_array[:, i])
+            columns.append(list(range(fa, number_of_columns, mf)))
+
+    out_array = np.empty((sum(len(c) for c in columns), len(out_info_dict['energy'])))
+    row = 0
+    for name, this_columns in zip(pdos_file_names, columns):
+        out_array[row:row + len(this_columns)] = pdos_atm_array_dict[name][:, this_columns].T
+        row += len(this_columns)
 
-    return out_arrays
+    return out_array
+
+
+def read_pdos_file(handle):
+    """Read a pdos file written by ``projwfc.x`` into an array, with the energy in the first column.
+
+    The numbers are converted in a single pass, after the header line. Only if that fails, for example because a number
+    is written without the ``E`` of its exponent, the file is parsed by ``numpy.genfromtxt``, which sets the values that
+    cannot be converted to ``NaN``.
+
+    :param handle: a file handle opened in text mode.
+    :return: two-dimensional array with a row for each energy.
+    """
+    content = handle.read()
+    header, _, body = content.partition('\n')
+
+    if not header.lstrip().startswith('#'):
+        body = content
+
+    try:
+        values = read_numeric_array(io.StringIO(body))
+        number_of_columns = len(body.lstrip().partition('\n')[0].split())
+        return values.reshape(-1, number_of_columns)
+    except ValueError:
+        return np.atleast_2d(np.genfromtxt(io.StringIO(content)))
+
+
+def read_pdos_files(file_opener, filenames, max_workers=1):
+    """Read the pdos files with the given filenames, optionally concurrently with a pool of threads.
+
+    :param file_opener: callable that returns a context manager with a file handle in text mode for a filename.
+    :param filenames: the filenames of the pdos files.
+    :param max_workers: the maximum number of threads used to read the files, or ``None`` for the default of
+        ``concurrent.futures.ThreadPoolExecutor``. With 1, the files are read sequentially in the current thread.
+    :return: dictionary of the filenames onto the arrays returned by ``read_pdos_file``.
+    """
+
+    def read_file(filename):
+        with file_opener(filename) as handle:
+            return read_pdos_file(handle)
+
+    if max_workers == 1:
+        return {filename: read_file(filename) for filename in filenames}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(filenames, executor.map(read_file, filenames)))
 
 
 class ProjwfcParser(BaseParser):
@@ -280,6 +368,15 @@ class ProjwfcParser(BaseParser):
         # we create a dictionary the progressively accumulates more info
         out_info_dict = {}
 
+        try:
+            settings = self.node.inputs.settings.get_dict()
+        except exceptions.NotExistent:
+            settings = {}
+
+        # Look for optional settings input node and potential 'parser_options' dictionary within it
+        parser_options = settings.get(self.get_parser_settings_key(), {})
+        out_info_dict['sparse_projections'] = parser_options.get('sparse_projections', False)
+
         logs = get_logging_container()
 
         stdout, parsed_data, logs = self.parse_stdout_from_retrieved(logs)
@@ -314,24 +411,37 @@ class ProjwfcParser(BaseParser):
         out_info_dict['spinorbit'] = parsed_xml.get('spin_orbit_calculation')
         out_info_dict['spin'] = out_info_dict['nspin'] == 2
 
+        # The pdos files are in the retrieved temporary folder if they are not kept, in which case they are read
+        # concurrently, or otherwise in the retrieved folder, of which the repository is read from a single thread.
+        temporary_filenames = os.listdir(retrieved_temporary_folder)
+
+        if fnmatch.filter(temporary_filenames, '*pdos_tot*'):
+            out_filenames = temporary_filenames
+            file_opener = lambda filename: open(os.path.join(retrieved_temporary_folder, filename), encoding='utf-8')
+            max_workers = None
+        else:
+            out_filenames = self.retrieved.base.repository.list_object_names()
+            max_workers = 1
+
+            @contextlib.contextmanager
+            def file_opener(filename):
+                with self.retrieved.base.repository.open(filename, 'rb') as handle:
+                    yield io.TextIOWrapper(handle, encoding='utf-8')
+
         # check and read pdos_tot file
-        out_filenames = self.retrieved.base.repository.list_object_names()
         try:
             pdostot_filename = fnmatch.filter(out_filenames, '*pdos_tot*')[0]
-            with self.retrieved.base.repository.open(pdostot_filename, 'r') as pdostot_file:
+            with file_opener(pdostot_filename) as pdostot_file:
                 # Columns: Energy(eV), Ldos, Pdos
-                pdostot_array = np.atleast_2d(np.genfromtxt(pdostot_file))
+                pdostot_array = read_pdos_file(pdostot_file)
                 energy = pdostot_array[:, 0]
                 dos = pdostot_array[:, 1]
-        except (OSError, KeyError):
+        except (OSError, KeyError, IndexError):
             return self.exit(self.exit_codes.ERROR_READING_PDOSTOT_FILE, logs)
 
         # check and read all of the individual pdos_atm files
         pdos_atm_filenames = fnmatch.filter(out_filenames, '*pdos_atm*')
-        pdos_atm_array_dict = {}
-        for name in pdos_atm_filenames:
-            with self.retrieved.base.repository.open(name, 'r') as pdosatm_file:
-                pdos_atm_array_dict[name] = np.atleast_2d(np.genfromtxt(pdosatm_file))
+        pdos_atm_array_dict = read_pdos_files(file_opener, pdos_atm_filenames, max_workers=max_workers)
 
         # finding the bands and projections
         out_info_dict['energy'] = energy
@@ -351,6 +461,11 @@ class ProjwfcParser(BaseParser):
 
         return self.exit(logs=logs)
 
+    @staticmethod
+    def get_parser_settings_key():
+        """Return the key that contains the optional parser options in the `settings` input node."""
+        return 'parser_options'
+
     def _parse_xml(self, retrieved_temporary_folder):
         """Parse the XML file.
 
@@ -430,6 +545,20 @@ class ProjwfcParser(BaseParser):
         out_info_dict['k_vect'] = np.array(k_vect)
         out_info_dict['orbitals'] = find_orbitals_from_statelines(out_info_dict)
 
+        # parses the band energies and projections of all k-points and spins at once
+        num_k_lines = len(out_info_dict['k_lines'])
+        num_bands = out_info_dict['num_bands']
+        try:
+            bands = [parse_band_energy(out_file[e_line]) for e_line in out_info_dict['e_lines']]
+        except (IndexError, ValueError):
+            raise QEOutputParsingError('the standard out file does not comply with the official documentation.')
+        out_info_dict['bands'] = np.array(bands).reshape(num_k_lines, num_bands)
+
+        projections = parse_projections(
+            out_file, out_info_dict['e_lines'], out_info_dict['psi_lines'], len(out_info_dict['wfc_lines'])
+        )
+        out_info_dict['projections'] = projections.reshape(num_k_lines, num_bands, -1)
+
         spin = out_info_dict['spin']
 
         if spin:
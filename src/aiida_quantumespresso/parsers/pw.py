@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 """`Parser` implementation for the `PwCalculation` calculation job class."""
+import io
 import traceback
 
 from aiida import orm
@@ -317,6 +318,9 @@ class PwParser(BaseParser):
         logs = get_logging_container()
         parsed_data = {}
 
+        # If the parser option 'validate_xml' is True, the XML is validated against its schema, which is a lot slower
+        validate_xml = False if parser_options is None else parser_options.get('validate_xml', False)
+
         object_names = self.retrieved.base.repository.list_object_names()
         xml_files = [xml_file for xml_file in self.node.process_class.xml_filenames if xml_file in object_names]
 
@@ -331,7 +335,7 @@ class PwParser(BaseParser):
 
         try:
             with self.retrieved.base.repository.open(xml_files[0]) as xml_file:
-                parsed_data, logs = parse_xml(xml_file, dir_with_bands)
+                parsed_data, logs = parse_xml(xml_file, dir_with_bands, validate_xml)
         except IOError:
             self.exit_code_xml = self.exit_codes.ERROR_OUTPUT_XML_READ
         except XMLParseError:
@@ -363,18 +367,20 @@ class PwParser(BaseParser):
             self.exit_code_stdout = self.exit_codes.ERROR_OUTPUT_STDOUT_MISSING
             return parsed_data, logs
 
+        # The stdout is streamed from the repository line by line, since it can be very large for long runs. Only
+        # newlines are line terminators, as for the content returned by ``get_object_content``.
         try:
-            stdout = self.retrieved.base.repository.get_object_content(filename_stdout)
+            with self.retrieved.base.repository.open(filename_stdout, 'rb') as handle:
+                stdout = io.TextIOWrapper(handle, encoding='utf-8', newline='\n')
+                try:
+                    parsed_data, logs = parse_stdout(stdout, parameters, parser_options, parsed_xml, crash_file)
+                except Exception as exc:
+                    logs.critical.append(traceback.format_exc())
+                    self.exit_code_stdout = self.exit_codes.ERROR_UNEXPECTED_PARSER_EXCEPTION.format(exception=exc)
         except IOError:
             self.exit_code_stdout = self.exit_codes.ERROR_OUTPUT_STDOUT_READ
             return parsed_data, logs
 
-        try:
-            parsed_data, logs = parse_stdout(stdout, parameters, parser_options, parsed_xml, crash_file)
-        except Exception as exc:
-            logs.critical.append(traceback.format_exc())
-            self.exit_code_stdout = self.exit_codes.ERROR_UNEXPECTED_PARSER_EXCEPTION.format(exception=exc)
-
         # If the stdout was incomplete, most likely the job was interrupted before it could cleanly finish, so the
         # output files are most likely corrupt and cannot be restarted from
         if 'ERROR_OUTPUT_STDOUT_INCOMPLETE' in logs['error']:
@@ -445,16 +451,16 @@ class PwParser(BaseParser):
         fractional = False
 
         if 'atomic_positions_relax' in parsed_trajectory:
-            positions = numpy.array(parsed_trajectory.pop('atomic_positions_relax'))
+            positions = numpy.asarray(parsed_trajectory.pop('atomic_positions_relax'))
         elif 'atomic_fractionals_relax' in parsed_trajectory:
             fractional = True
-            positions = numpy.array(parsed_trajectory.pop('atomic_fractionals_relax'))
+            positions = numpy.asarray(parsed_trajectory.pop('atomic_fractionals_relax'))
         else:
             # The positions were never printed, the calculation did not change the structure
             positions = numpy.array([[site.position for site in structure.sites]])
 
         try:
-            cells = numpy.array(parsed_trajectory.pop('lattice_vectors_relax'))
+            cells = numpy.asarray(parsed_trajectory.pop('lattice_vectors_relax'))
         except KeyError:
             # The cell is never printed, the calculation was at fixed cell
             cells = numpy.array([structure.cell])
@@ -478,8 +484,9 @@ class PwParser(BaseParser):
             positions=positions,
         )
 
+        # The arrays with a fixed shape per step are already accumulated as arrays, which are stored without a copy
         for key, value in parsed_trajectory.items():
-            trajectory.set_array(key, numpy.array(value))
+            trajectory.set_array(key, numpy.asarray(value))
 
         return trajectory
 
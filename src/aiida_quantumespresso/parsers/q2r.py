@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+from aiida.common import exceptions
 from aiida.orm import Dict
 
 from aiida_quantumespresso.data.force_constants import ForceConstantsData
@@ -8,7 +9,12 @@ from .base import BaseParser
 
 
 class Q2rParser(BaseParser):
-    """``Parser`` implementation for the ``Q2rCalculation`` calculation job class."""
+    """``Parser`` implementation for the ``Q2rCalculation`` calculation job class.
+
+    By default, the real-space force constants are also stored as a binary array in the repository of the
+    ``force_constants`` output, such that they can be loaded without parsing the force constants file again. This can be
+    turned off with the ``store_force_constants`` key of the ``parser_options`` in the ``settings`` input.
+    """
 
     def parse(self, **kwargs):
         """Parse the retrieved files of a ``Q2rCalculation`` into output nodes."""
@@ -30,7 +36,20 @@ class Q2rParser(BaseParser):
         if filename_force_constants not in self.retrieved.base.repository.list_object_names():
             return self.exit(self.exit_codes.ERROR_READING_FORCE_CONSTANTS_FILE, logs)
 
+        try:
+            settings = self.node.inputs.settings.get_dict()
+        except exceptions.NotExistent:
+            settings = {}
+
+        parser_options = settings.get(self.get_parser_settings_key(), {})
+        store_force_constants = parser_options.get('store_force_constants', True)
+
         with self.retrieved.base.repository.open(filename_force_constants, 'rb') as handle:
-            self.out('force_constants', ForceConstantsData(file=handle))
+            self.out('force_constants', ForceConstantsData(file=handle, store_force_constants=store_force_constants))
 
         return self.exit(logs=logs)
+
+    @staticmethod
+    def get_parser_settings_key():
+        """Return the key that contains the optional parser options in the `settings` input node."""
+        return 'parser_options'
@@ -3,11 +3,12 @@ import re
 from typing import Tuple
 
 from aiida.common import AttributeDict
-from aiida.orm import Dict, XyData
+from aiida.orm import ArrayData, Dict, XyData
 import numpy as np
 
 from aiida_quantumespresso.parsers import QEOutputParsingError
 from aiida_quantumespresso.parsers.base import BaseParser
+from aiida_quantumespresso.parsers.parse_raw.xspectra import parse_lanczos_coefficients
 from aiida_quantumespresso.utils.mapping import get_logging_container
 
 
@@ -101,6 +102,20 @@ class XspectraParser(BaseParser):
 
         self.out('spectra', xy_data)
 
+        # The save file is only retrieved by more recent versions of the plugin, so it is not an error if it is missing
+        try:
+            with self.retrieved.base.repository.open(self.node.process_class._XSPECTRA_SAVE_FILE, 'r') as handle:
+                lanczos_coefficients = parse_lanczos_coefficients(handle.read())
+        except OSError:
+            pass
+        except QEOutputParsingError as exception:
+            logs.warning.append(f'The Lanczos coefficients could not be read from the save file: {exception}')
+        else:
+            arrays = ArrayData()
+            for name, array in lanczos_coefficients.items():
+                arrays.set_array(name, array)
+            self.out('lanczos_coefficients', arrays)
+
         return self.exit(logs=logs)
 
     @staticmethod
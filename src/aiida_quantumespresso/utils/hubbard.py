@@ -1,10 +1,13 @@
 # -*- coding: utf-8 -*-
 """Utility class for handling the :class:`aiida_quantumespresso.data.hubbard_structure.HubbardStructureData`."""
 # pylint: disable=no-name-in-module
+from concurrent.futures import ProcessPoolExecutor
+import functools
 from itertools import product
 import os
 from typing import Dict, List, Tuple, Union
 
+from aiida.common.hashing import make_hash
 from aiida.orm import StructureData
 import numpy as np
 
@@ -13,6 +16,8 @@ from aiida_quantumespresso.data.hubbard_structure import HubbardStructureData
 
 __all__ = (
     'HubbardUtils',
+    'NeighbourTable',
+    'get_neighbour_table',
     'initialize_hubbard_parameters',
     'get_supercell_atomic_index',
     'get_index_and_translation',
@@ -254,63 +259,90 @@ class HubbardUtils:
 
         :returns: a new ``HubbbardStructureData`` with all the mapped Hubbard parameters
         """
-        uc_pymat = self.hubbard_structure.get_pymatgen_structure()
-        sc_pymat = supercell.get_pymatgen_structure()
-        uc_positions = uc_pymat.cart_coords  # positions in Cartesian coordinates
-        sc_positions = sc_pymat.cart_coords
-        uc_cell = uc_pymat.lattice.matrix
+        from scipy.spatial import cKDTree  # pylint: disable=no-name-in-module
+
+        uc_positions = np.array([site.position for site in self.hubbard_structure.sites])  # Cartesian coordinates
+        sc_positions = np.array([site.position for site in supercell.sites])
+        uc_cell = np.array(self.hubbard_structure.cell)
         uc_cell_inv = np.linalg.inv(uc_cell)
+        sc_cell = np.array(supercell.cell)
+        sc_cell_inv = np.linalg.inv(sc_cell)
 
         hubbard = self.hubbard_structure.hubbard
-        sc_hubbard_parameters = []
+        arrays = hubbard.to_arrays()
+        images = {}
+
+        def get_images(index):
+            """Return the indices of the supercell atoms that are images of a unitcell atom, and their translations.
+
+            Each atom in supercell is matched if a unitcell translation vector is found.
+            """
+            if index not in images:
+                translations = np.dot(sc_positions - uc_positions[index], uc_cell_inv)
+                translations_int = np.rint(translations)
+                mask = np.all(np.isclose(translations, translations_int, thr), axis=1)
+                images[index] = (np.flatnonzero(mask), translations_int[mask])
+
+            return images[index]
 
-        # Dumb, but fairly safe, way to map all the hubbard parameters.
-        # The idea is to map for each interaction in unitcell the
-        # correspective one in supercell matching all the positions.
-        for param in hubbard.parameters:
+        sc_i_indices, sc_j_positions, parameter_indices = [], [], []
+
+        # The idea is to map for each interaction in unitcell the correspective one in supercell matching all the
+        # positions. First, the images in the supercell of the atom and its neighbour are computed for all parameters.
+        for index, (atom_index, neighbour_index, translation) in enumerate(
+            zip(arrays['atom_index'], arrays['neighbour_index'], arrays['translation'])
+        ):
             # i -> atom_index | j -> neighbour_index
-            uc_i_position = uc_positions[param.atom_index]
-            uc_j_position = uc_positions[param.neighbour_index]
-            sc_i_indices, sc_j_index, sc_i_translations = [], [], []
-
-            # Each atom in supercell is matched if a unitcell
-            # translation vector is found.
-            for i, position in enumerate(sc_positions):
-                translation = np.dot(position - uc_i_position, uc_cell_inv)
-                translation_int = np.rint(translation)
-                if np.all(np.isclose(translation, translation_int, thr)):
-                    sc_i_translations.append(translation_int.tolist())
-                    sc_i_indices.append(i)
-
-                translation = np.dot(position - uc_j_position, uc_cell_inv)
-                translation_int = np.rint(translation)
-                if np.all(np.isclose(translation, translation_int, thr)):
-                    uc_j_translation = np.array(translation_int)
-                    sc_j_index = i
-
-            # The position of the neighbour must be still translated;
-            # This might happen in the supercell itself, or outside, thus
-            # we neeed to recompute its position and its translation vector in supercell.
-            sc_j_position = sc_positions[sc_j_index]
-
-            for sc_i_index, sc_i_translation in zip(sc_i_indices, sc_i_translations):
-                j_position = sc_j_position + np.dot(sc_i_translation - uc_j_translation + param.translation, uc_cell)
-                local_site = sc_pymat.get_sites_in_sphere(pt=j_position, r=thr)[0]  # pymatgen PeriodicSite
-
-                sc_hubbard_parameter = [
-                    int(sc_i_index),
-                    param.atom_manifold,
-                    int(local_site.index),  # otherwise the class validator complains
-                    param.neighbour_manifold,
-                    param.value,
-                    np.array(local_site.image, dtype=np.int64).tolist(),  # otherwise the class validator complains
-                    param.hubbard_type,
-                ]
-
-                sc_hubbard_parameters.append(sc_hubbard_parameter)
-
-        args = (sc_hubbard_parameters, hubbard.projectors, hubbard.formulation)
-        new_hubbard = Hubbard.from_list(*args)
+            sc_i_index, sc_i_translations = get_images(atom_index)
+            sc_j_index, sc_j_translations = get_images(neighbour_index)
+
+            if sc_j_index.size == 0:
+                raise ValueError(f'the atom with index {neighbour_index} could not be mapped onto the supercell')
+
+            # The position of the neighbour must be still translated; This might happen in the supercell itself, or
+            # outside, thus we neeed to recompute its position and its translation vector in supercell.
+            uc_j_translation = sc_j_translations[-1]
+            sc_j_positions.append(
+                sc_positions[sc_j_index[-1]] + np.dot(sc_i_translations - uc_j_translation + translation, uc_cell)
+            )
+            sc_i_indices.append(sc_i_index)
+            parameter_indices.append(np.full(sc_i_index.size, index))
+
+        if parameter_indices:
+            sc_i_indices = np.concatenate(sc_i_indices)
+            sc_j_positions = np.concatenate(sc_j_positions)
+            parameter_indices = np.concatenate(parameter_indices)
+        else:
+            sc_i_indices = np.empty(0, dtype=np.int64)
+            sc_j_positions = np.empty((0, 3))
+            parameter_indices = np.empty(0, dtype=np.int64)
+
+        # Then, all the neighbours are resolved at once with a periodic KD-tree of the supercell in crystal coordinates
+        sc_scaled_positions = np.dot(sc_positions, sc_cell_inv)
+        sc_wrapped_positions = np.mod(sc_scaled_positions, 1.0)
+        sc_wrapped_positions[sc_wrapped_positions >= 1.0] = 0.0
+        tree = cKDTree(sc_wrapped_positions, boxsize=1.0)
+
+        j_scaled_positions = np.dot(sc_j_positions, sc_cell_inv)
+        j_wrapped_positions = np.mod(j_scaled_positions, 1.0)
+        j_wrapped_positions[j_wrapped_positions >= 1.0] = 0.0
+        _, sc_j_indices = tree.query(j_wrapped_positions)
+
+        sc_j_indices = np.asarray(sc_j_indices, dtype=np.int64)
+        sc_j_translations = j_scaled_positions - sc_scaled_positions[sc_j_indices]
+        sc_j_translations_int = np.rint(sc_j_translations)
+        distances = np.linalg.norm(np.dot(sc_j_translations - sc_j_translations_int, sc_cell), axis=1)
+
+        if np.any(distances > thr):
+            raise ValueError('not all the neighbours of the Hubbard parameters could be mapped onto the supercell')
+
+        sc_arrays = {key: value[parameter_indices] for key, value in arrays.items()}
+        sc_arrays['atom_index'] = sc_i_indices
+        sc_arrays['neighbour_index'] = sc_j_indices
+        sc_arrays['translation'] = sc_j_translations_int.astype(np.int64)
+
+        # The arrays are derived from the validated parameters of the unitcell, so they need not be validated again
+        new_hubbard = Hubbard.from_arrays(sc_arrays, hubbard.projectors, hubbard.formulation)
 
         return HubbardStructureData.from_structure(structure=supercell, hubbard=new_hubbard)
 
@@ -340,6 +372,34 @@ class HubbardUtils:
 
         return pairs_dict
 
+    def get_cn_dicts(
+        self,
+        nn_finder: str = 'crystal',
+        nn_inputs: Union[Dict, None] = None,
+        radius_max: float = 7.0,
+        max_workers: Union[int, None] = None,
+    ) -> Dict[int, Dict[str, float]]:
+        """Return the coordination numbers per species of the onsite Hubbard sites from nearest neighbour finders.
+
+        The nearest neighbour analysis is stored in the :class:`NeighbourTable` of the structure, such that it is only
+        performed once for each site, even across different instances of this class for the same structure.
+
+        :param nn_finder: string defining the nearest neighbour finder; options are:
+            * `crystal`: use :class:`pymatgen.analysis.local_env.CrystalNN`
+            * `voronoi`: use :class:`pymatgen.analysis.local_env.VoronoiNN`
+        :param nn_inputs: inputs for the nearest neighbours finder; when None, standard inputs
+            are used to find geometric first neighbours (recommended)
+        :param radius_max: max radius where to look for neighbouring atoms, in Angstrom
+        :param max_workers: number of processes over which to distribute the analysis of the sites that are not yet in
+            the table; when None, the sites are analysed in the current process
+        :return: dictionary with for each onsite Hubbard site index the coordination numbers, e.g. {'O': 4, 'S': 2}
+        """
+        pairs = self.get_interacting_pairs()
+        indices = [index for index, name in enumerate(self.hubbard_structure.get_site_kindnames()) if name in pairs]
+        table = get_neighbour_table(self.hubbard_structure, radius_max)
+
+        return table.get_cn_dicts(nn_finder, nn_inputs, indices, max_workers)
+
     def get_pairs_radius(
         self,
         onsite_index: int,
@@ -358,17 +418,14 @@ class HubbardUtils:
         :return: (radius min +thr, radius max -thr) defining the shells containing only the first neighbours
         """
         rmin = 0
-        pymat = self.hubbard_structure.get_pymatgen_structure()
-        _, neigh_indices, _, distances = pymat.get_neighbor_list(sites=[pymat[onsite_index]], r=radius_max)
-
-        sort = np.argsort(distances)
-        neigh_indices = neigh_indices[sort]
-        distances = distances[sort]
+        kind_names = self.hubbard_structure.get_site_kindnames()
+        table = get_neighbour_table(self.hubbard_structure, radius_max)
+        neigh_indices, _, distances = table.get_neighbours(onsite_index)
 
         count = 0
         for i in range(len(neigh_indices)):  # pylint: disable=consider-using-enumerate
             index = i
-            if self.hubbard_structure.sites[neigh_indices[i]].kind_name in neighbours_names:
+            if kind_names[neigh_indices[i]] in neighbours_names:
                 rmin = max(rmin, distances[i])
                 count += 1
             if count == number_of_neighbours:
@@ -386,6 +443,7 @@ class HubbardUtils:
         nn_inputs: Union[Dict, None] = None,
         radius_max: float = 7.0,
         thr: float = 1.0e-2,
+        max_workers: Union[int, None] = None,
         **_,
     ) -> float:
         """Return the radius (in Angstrom) for intersites from nearest neighbour finders.
@@ -402,32 +460,22 @@ class HubbardUtils:
             are used to find geometric first neighbours (recommended)
         :param radius_max: max radius where to look for neighbouring atoms, in Angstrom
         :param thr: threshold (in Angstrom) for defining the shells
+        :param max_workers: number of processes over which to distribute the nearest neighbour analysis of the sites
+            (see :meth:`get_cn_dicts`)
         :return: radius defining the shell containing only the first neighbours
         """
         import warnings
 
-        from pymatgen.analysis.local_env import CrystalNN, VoronoiNN
-
         rmin, rmax = 0.0, radius_max
 
-        if nn_finder not in ['crystal', 'voronoi']:
-            raise ValueError('`nn_finder` must be either `cyrstal` or `voronoi`')
-        if nn_inputs is None:
-            if nn_finder == 'crystal':
-                nn_inputs = {'distance_cutoffs': None, 'x_diff_weight': 0, 'porous_adjustment': False}
-            if nn_finder == 'voronoi':
-                nn_inputs = {'tol': 0.1, 'cutoff': radius_max}
-
-        voronoi = CrystalNN(**nn_inputs) if nn_finder == 'crystal' else VoronoiNN(**nn_inputs)  # pylint: disable=unexpected-keyword-arg
-
         sites = self.hubbard_structure.sites
         name_to_specie = {kind.name: kind.symbol for kind in self.hubbard_structure.kinds}
-        pymat = self.hubbard_structure.get_pymatgen_structure()
         pairs = self.get_interacting_pairs()
+        cn_dicts = self.get_cn_dicts(nn_finder, nn_inputs, radius_max, max_workers)
 
         for i, site in enumerate(sites):
             if site.kind_name in pairs:
-                neigh_species = voronoi.get_cn_dict(pymat, i)  # e.g. {'O': 4, 'S': 2, ...}
+                neigh_species = dict(cn_dicts[i])  # e.g. {'O': 4, 'S': 2, ...}
                 number_of_neighs = 0
 
                 for neigh_name in pairs[site.kind_name]:
@@ -452,6 +500,7 @@ class HubbardUtils:
         nn_finder: str = 'crystal',
         nn_inputs: Union[Dict, None] = None,
         radius_max: float = 7.0,
+        max_workers: Union[int, None] = None,
         **_,
     ) -> List[Tuple[int, int, Tuple[int, int, int]]]:
         """Return the list of intersites from nearest neighbour finders.
@@ -468,30 +517,21 @@ class HubbardUtils:
             are used to find geometric first neighbours (recommended)
         :param radius_max: max radius where to look for neighbouring atoms, in Angstrom
         :param thr: threshold (in Angstrom) for defining the shells
+        :param max_workers: number of processes over which to distribute the nearest neighbour analysis of the sites
+            (see :meth:`get_cn_dicts`)
         :return: list of lists, each having (atom index, neighbouring index, translation vector)
         """
-        from pymatgen.analysis.local_env import CrystalNN, VoronoiNN
-
-        if nn_finder not in ['crystal', 'voronoi']:
-            raise ValueError('`nn_finder` must be either `cyrstal` or `voronoi`')
-
-        if nn_inputs is None:
-            if nn_finder == 'crystal':
-                nn_inputs = {'distance_cutoffs': None, 'x_diff_weight': 0, 'porous_adjustment': False}
-            if nn_finder == 'voronoi':
-                nn_inputs = {'tol': 0.1, 'cutoff': radius_max}
-
-        voronoi = CrystalNN(**nn_inputs) if nn_finder == 'crystal' else VoronoiNN(**nn_inputs)  # pylint: disable=unexpected-keyword-arg
-
         sites = self.hubbard_structure.sites
         name_to_specie = {kind.name: kind.symbol for kind in self.hubbard_structure.kinds}
-        pymat = self.hubbard_structure.get_pymatgen_structure()
         pairs = self.get_interacting_pairs()
+        cn_dicts = self.get_cn_dicts(nn_finder, nn_inputs, radius_max, max_workers)
+        table = get_neighbour_table(self.hubbard_structure, radius_max)
+        pymat = table.structure
         neigh_list = []
 
         for i, site in enumerate(sites):  # pylint: disable=too-many-nested-blocks
             if site.kind_name in pairs:
-                neigh_species = voronoi.get_cn_dict(pymat, i)  # e.g. {'O': 4, 'S': 2, ...}
+                neigh_species = cn_dicts[i]  # e.g. {'O': 4, 'S': 2, ...}
                 neigh_list.append([i, i, (0, 0, 0)])
 
                 for neigh_name in pairs[site.kind_name]:
@@ -500,13 +540,7 @@ class HubbardUtils:
 
                         count = 0
                         if specie in neigh_species:
-                            _, neigh_indices, images, distances = pymat.get_neighbor_list(
-                                sites=[pymat[i]], r=radius_max
-                            )
-
-                            sort = np.argsort(distances)
-                            neigh_indices = neigh_indices[sort]
-                            images = images[sort]
+                            neigh_indices, images, _ = table.get_neighbours(i)
 
                             for index, image in zip(neigh_indices, images):
                                 if pymat[index].specie.name == specie:
@@ -529,6 +563,7 @@ class HubbardUtils:
         nn_finder: str = 'crystal',
         nn_inputs: Union[Dict, None] = None,
         radius_max: float = 7.0,
+        max_workers: Union[int, None] = None,
         **_,
     ) -> list:
         """Return the maximum number of nearest neighbours, aslo counting the non-interacting ones.
@@ -545,34 +580,144 @@ class HubbardUtils:
             are used to find geometric first neighbours (recommended)
         :param radius_max: max radius where to look for neighbouring atoms, in Angstrom
         :param thr: threshold (in Angstrom) for defining the shells
+        :param max_workers: number of processes over which to distribute the nearest neighbour analysis of the sites
+            (see :meth:`get_cn_dicts`)
         :return: list of lists, each having (atom index, neighbouring index, translation vector)
         """
-        from pymatgen.analysis.local_env import CrystalNN, VoronoiNN
-
-        if nn_finder not in ['crystal', 'voronoi']:
-            raise ValueError('`nn_finder` must be either `cyrstal` or `voronoi`')
-
-        if nn_inputs is None:
-            if nn_finder == 'crystal':
-                nn_inputs = {'distance_cutoffs': None, 'x_diff_weight': 0, 'porous_adjustment': False}
-            if nn_finder == 'voronoi':
-                nn_inputs = {'tol': 0.1, 'cutoff': radius_max}
-
-        voronoi = CrystalNN(**nn_inputs) if nn_finder == 'crystal' else VoronoiNN(**nn_inputs)  # pylint: disable=unexpected-keyword-arg
-
         sites = self.hubbard_structure.sites
-        pymat = self.hubbard_structure.get_pymatgen_structure()
         pairs = self.get_interacting_pairs()
+        cn_dicts = self.get_cn_dicts(nn_finder, nn_inputs, radius_max, max_workers)
         max_num_of_neighs = 0
 
         for i, site in enumerate(sites):  # pylint: disable=too-many-nested-blocks
             if site.kind_name in pairs:
-                neigh_species = voronoi.get_cn_dict(pymat, i)  # e.g. {'O': 4, 'S': 2, ...}
+                neigh_species = cn_dicts[i]  # e.g. {'O': 4, 'S': 2, ...}
                 max_num_of_neighs = max(max_num_of_neighs, np.sum(list(neigh_species.values())))
 
         return max_num_of_neighs
 
 
+class NeighbourTable:
+    """Nearest neighbour analysis of the sites of a structure, which is performed lazily and shared between queries.
+
+    For each site that is queried, the table holds the neighbours within ``radius_max`` sorted by distance, and the
+    coordination numbers per species found by each nearest neighbour finder. Use :func:`get_neighbour_table` to get the
+    table of a structure, which is cached on its content.
+    """
+
+    def __init__(self, structure, radius_max: float):
+        """Construct a new instance.
+
+        :param structure: the :class:`pymatgen.core.Structure` to analyse
+        :param radius_max: max radius where to look for neighbouring atoms, in Angstrom
+        """
+        self.structure = structure
+        self.radius_max = radius_max
+        self._neighbours = {}
+        self._cn_dicts = {}
+
+    def get_neighbours(self, index: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return the neighbours of a site within ``radius_max``, sorted by distance.
+
+        :param index: index of the site in the structure
+        :return: tuple with the arrays of the indices, the images and the distances of the neighbours
+        """
+        if index not in self._neighbours:
+            structure = self.structure
+            _, indices, images, distances = structure.get_neighbor_list(sites=[structure[index]], r=self.radius_max)
+            sort = np.argsort(distances)
+            self._neighbours[index] = (indices[sort], images[sort], distances[sort])
+
+        return self._neighbours[index]
+
+    def get_cn_dicts(
+        self,
+        nn_finder: str,
+        nn_inputs: Union[Dict, None],
+        indices: List[int],
+        max_workers: Union[int, None] = None,
+    ) -> Dict[int, Dict[str, float]]:
+        """Return the coordination numbers per species of the given sites, as found by a nearest neighbour finder.
+
+        :param nn_finder: string defining the nearest neighbour finder, either `crystal` or `voronoi`
+        :param nn_inputs: inputs for the nearest neighbours finder; when None, standard inputs are used
+        :param indices: indices of the sites in the structure
+        :param max_workers: number of processes over which to distribute the analysis of the sites that are not yet in
+            the table; when None, the sites are analysed in the current process
+        :return: dictionary with for each site index a copy of its coordination numbers, e.g. {'O': 4, 'S': 2}
+        """
+        finder = get_nn_finder(nn_finder, nn_inputs, self.radius_max)
+        cn_dicts = self._cn_dicts.setdefault(make_hash([nn_finder, nn_inputs]), {})
+        missing = [index for index in indices if index not in cn_dicts]
+
+        if max_workers is not None and max_workers > 1 and len(missing) > 1:
+            chunks = [missing[start::max_workers] for start in range(min(max_workers, len(missing)))]
+            with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+                results = executor.map(_get_cn_dicts, [finder] * len(chunks), [self.structure] * len(chunks), chunks)
+                for chunk, result in zip(chunks, results):
+                    cn_dicts.update(zip(chunk, result))
+        elif missing:
+            cn_dicts.update(zip(missing, _get_cn_dicts(finder, self.structure, missing)))
+
+        return {index: dict(cn_dicts[index]) for index in indices}
+
+
+def _get_cn_dicts(finder, structure, indices: List[int]) -> List[Dict[str, float]]:
+    """Return the coordination numbers per species of the given sites, e.g. {'O': 4, 'S': 2, ...}."""
+    return [finder.get_cn_dict(structure, index) for index in indices]
+
+
+@functools.lru_cache(maxsize=16)
+def _get_cached_neighbour_table(structure_hash: str, radius_max: float) -> NeighbourTable:
+    """Return an empty :class:`NeighbourTable` for the structure with the given hash, which is created once."""
+    del structure_hash  # only used as key of the cache
+    return NeighbourTable(None, radius_max)
+
+
+def get_neighbour_table(structure: StructureData, radius_max: float = 7.0) -> NeighbourTable:
+    """Return the :class:`NeighbourTable` of a structure, which is cached on the content of the structure.
+
+    Since the key is the hash of the cell, the sites and the kinds of the structure, the same table is returned for
+    e.g. the different ``HubbardStructureData`` of the iterations of a self-consistent Hubbard calculation.
+
+    :param structure: a StructureData instance
+    :param radius_max: max radius where to look for neighbouring atoms, in Angstrom
+    """
+    table = _get_cached_neighbour_table(make_hash(structure.base.attributes.all), radius_max)
+
+    if table.structure is None:
+        table.structure = structure.get_pymatgen_structure()
+
+    return table
+
+
+def get_nn_finder(nn_finder: str = 'crystal', nn_inputs: Union[Dict, None] = None, radius_max: float = 7.0):
+    """Return the nearest neighbour finder with the given inputs.
+
+    :param nn_finder: string defining the nearest neighbour finder; options are:
+        * `crystal`: use :class:`pymatgen.analysis.local_env.CrystalNN`
+        * `voronoi`: use :class:`pymatgen.analysis.local_env.VoronoiNN`
+    :param nn_inputs: inputs for the nearest neighbours finder; when None, standard inputs
+        are used to find geometric first neighbours (recommended)
+    :param radius_max: max radius where to look for neighbouring atoms, in Angstrom
+    """
+    from pymatgen.analysis.local_env import CrystalNN, VoronoiNN
+
+    if nn_finder not in ['crystal', 'voronoi']:
+        raise ValueError('`nn_finder` must be either `cyrstal` or `voronoi`')
+
+    if nn_inputs is None:
+        if nn_finder == 'crystal':
+            nn_inputs = {'distance_cutoffs': None, 'x_diff_weight': 0, 'porous_adjustment': False}
+        if nn_finder == 'voronoi':
+            nn_inputs = {'tol': 0.1, 'cutoff': radius_max}
+
+    if nn_finder == 'crystal':
+        return CrystalNN(**nn_inputs)
+
+    return VoronoiNN(**nn_inputs)  # pylint: disable=unexpected-keyword-arg
+
+
 def initialize_hubbard_parameters(
     structure: StructureData,
     pairs: Dict[str, Tuple[str, float, float, Dict[str, str]]],
@@ -583,6 +728,7 @@ def initialize_hubbard_parameters(
     radius_max: float = 7.0,
     thr: float = 1e-5,
     use_kinds: bool = True,
+    max_workers: Union[int, None] = None,
     **_,
 ) -> HubbardStructureData:
     """Initialize the on-site and intersite parameters using nearest neighbour finders.
@@ -606,23 +752,13 @@ def initialize_hubbard_parameters(
     :param thr: threshold to refold the atoms with crystal coordinates close to 1.0
     :param use_kinds: whether to use kinds for initializing the parameters; when False, it
         initializes all the ``Kinds`` matching the given specie
+    :param max_workers: number of processes over which to distribute the nearest neighbour analysis of the sites
+        (see :meth:`NeighbourTable.get_cn_dicts`)
     :return: HubbardStructureData with initialized Hubbard parameters
     """
     from aiida.tools.data import spglib_tuple_to_structure, structure_to_spglib_tuple
-    from pymatgen.analysis.local_env import CrystalNN, VoronoiNN
     from spglib import standardize_cell
 
-    if nn_finder not in ['crystal', 'voronoi']:
-        raise ValueError('`nn_finder` must be either `cyrstal` or `voronoi`')
-
-    if nn_inputs is None:
-        if nn_finder == 'crystal':
-            nn_inputs = {'distance_cutoffs': None, 'x_diff_weight': 0, 'porous_adjustment': False}
-        if nn_finder == 'voronoi':
-            nn_inputs = {'tol': 0.1, 'cutoff': radius_max}
-
-    voronoi = CrystalNN(**nn_inputs) if nn_finder == 'crystal' else VoronoiNN(**nn_inputs)  # pylint: disable=unexpected-keyword-arg
-
     if not standardize and not fold:
         hubbard_structure = HubbardStructureData.from_structure(structure=structure)
 
@@ -643,13 +779,18 @@ def initialize_hubbard_parameters(
 
     sites = hubbard_structure.sites
     name_to_specie = {kind.name: kind.symbol for kind in hubbard_structure.kinds}
-    pymat = hubbard_structure.get_pymatgen_structure()
-
-    for i, site in enumerate(sites):  # pylint: disable=too-many-nested-blocks
-        site_name = site.kind_name if use_kinds else name_to_specie[site.kind_name]
-        if site_name in pairs:
-            neigh_species = voronoi.get_cn_dict(pymat, i)  # e.g. {'O': 4, 'S': 2, ...}
-            onsite = pairs[site.kind_name]
+    table = get_neighbour_table(hubbard_structure, radius_max)
+    pymat = table.structure
+
+    indices = [
+        i for i, site in enumerate(sites) if (site.kind_name if use_kinds else name_to_specie[site.kind_name]) in pairs
+    ]
+    cn_dicts = table.get_cn_dicts(nn_finder, nn_inputs, indices, max_workers)
+
+    with hubbard_structure.edit_hubbard_parameters():
+        for i in indices:  # pylint: disable=too-many-nested-blocks
+            neigh_species = cn_dicts[i]  # e.g. {'O': 4, 'S': 2, ...}
+            onsite = pairs[sites[i].kind_name]
             hubbard_structure.append_hubbard_parameter(i, onsite[0], i, onsite[0], onsite[1])
 
             for neigh_name in onsite[3]:
@@ -658,18 +799,14 @@ def initialize_hubbard_parameters(
 
                     count = 0
                     if specie in neigh_species:
-                        _, neigh_indices, images, distances = pymat.get_neighbor_list(sites=[pymat[i]], r=radius_max)
-
-                        sort = np.argsort(distances)
-                        neigh_indices = neigh_indices[sort]
-                        images = images[sort]
+                        neigh_indices, images, _ = table.get_neighbours(i)
 
                         for index, image in zip(neigh_indices, images):
                             if pymat[index].specie.name == specie:
                                 hubbard_structure.append_hubbard_parameter(
                                     atom_index=i,
                                     atom_manifold=onsite[0],
-                                    neighbour_index=int(index), # otherwise the validator complains
+                                    neighbour_index=int(index),  # otherwise the validator complains
                                     neighbour_manifold=onsite[3][neigh_name],
                                     value=onsite[2],
                                     translation=np.array(image, dtype=np.int64).tolist(),
@@ -5,10 +5,11 @@ from typing import Mapping
 from aiida import orm
 from aiida.common import AttributeDict
 from aiida.common.lang import type_check
-from aiida.engine import BaseRestartWorkChain, ProcessHandlerReport, process_handler, while_
+from aiida.engine import BaseRestartWorkChain, ProcessHandlerReport, ToContext, if_, process_handler, while_
 from aiida.plugins import CalculationFactory
 
 from aiida_quantumespresso.calculations.functions.create_kpoints_from_distance import create_kpoints_from_distance
+from aiida_quantumespresso.calculations.functions.merge_ph_dynamical_matrices import merge_ph_dynamical_matrices
 from aiida_quantumespresso.calculations.functions.merge_ph_outputs import merge_ph_outputs
 from aiida_quantumespresso.common.types import ElectronicType
 from aiida_quantumespresso.workflows.protocols.utils import ProtocolMixin
@@ -44,20 +45,34 @@ class PhBaseWorkChain(ProtocolMixin, BaseRestartWorkChain):
             help='Optional input when constructing the qpoints based on a desired `qpoints_distance`. Setting this to '
                  '`True` will force the qpoint mesh to have an even number of points along each lattice vector except '
                  'for any non-periodic directions.')
+        spec.input('parallelize_qpoints', valid_type=orm.Bool, default=lambda: orm.Bool(False),
+            help='If `True`, the q-points are distributed over independent `ph.x` calculations that run in parallel. '
+                 'The q-points are first determined by an initialization run, after which a `PhBaseWorkChain` is '
+                 'launched for each q-point. The `remote_folder` output is then not returned, but the `retrieved` '
+                 'output contains the dynamical matrices of all q-points. Cannot be combined with the `start_irr` '
+                 'and `last_irr` parameters.')
         spec.inputs.validator = cls.validate_inputs
         spec.outline(
             cls.setup,
             cls.validate_parameters,
             cls.set_qpoints,
-            while_(cls.should_run_process)(
-                cls.prepare_process,
-                cls.run_process,
-                cls.inspect_process,
+            if_(cls.should_parallelize_qpoints)(
+                cls.run_initialization,
+                cls.inspect_initialization,
+                cls.run_qpoints,
+                cls.inspect_qpoints,
+            ).else_(
+                while_(cls.should_run_process)(
+                    cls.prepare_process,
+                    cls.run_process,
+                    cls.inspect_process,
+                ),
             ),
             cls.create_merged_output,
             cls.results,
         )
         spec.expose_outputs(PhCalculation, exclude=('retrieved_folder',))
+        spec.outputs['remote_folder'].required = False
         spec.exit_code(204, 'ERROR_INVALID_INPUT_RESOURCES_UNDERSPECIFIED',
             message='The `metadata.options` did not specify both `resources.num_machines` and `max_wallclock_seconds`. '
                     'This exit status has been deprecated as the check it corresponded to was incorrect.')
@@ -66,6 +81,10 @@ class PhBaseWorkChain(ProtocolMixin, BaseRestartWorkChain):
         spec.exit_code(401, 'ERROR_MERGING_QPOINTS',
             message='The work chain failed to merge the q-points data from multiple `PhCalculation`s because not all '
                     'q-points were parsed.')
+        spec.exit_code(402, 'ERROR_SUB_PROCESS_FAILED_INITIALIZATION',
+            message='The initialization `PhBaseWorkChain` sub process failed.')
+        spec.exit_code(403, 'ERROR_SUB_PROCESS_FAILED_QPOINTS',
+            message='One or more of the `PhBaseWorkChain` sub processes of the individual q-points failed.')
         # yapf: enable
 
     @classmethod
@@ -76,6 +95,24 @@ class PhBaseWorkChain(ProtocolMixin, BaseRestartWorkChain):
             'qpoints_distance' not in value and 'qpoints' not in value):
             return 'Neither `qpoints` nor `qpoints_distance` were specified.'
 
+        if 'parallelize_qpoints' in value and value['parallelize_qpoints'].value:
+
+            if 'only_initialization' in value and value['only_initialization'].value:
+                return 'The `parallelize_qpoints` and `only_initialization` inputs cannot both be `True`.'
+
+            parameters = value['ph']['parameters'].get_dict().get('INPUTPH', {})
+
+            if 'start_irr' in parameters or 'last_irr' in parameters:
+                return 'The `parallelize_qpoints` input cannot be combined with `start_irr` or `last_irr`.'
+
+            try:
+                value['qpoints'].get_kpoints_mesh()
+            except AttributeError:
+                if len(value['qpoints'].get_kpoints()) < 2:
+                    return 'The `parallelize_qpoints` input requires a mesh or a list of more than one q-point.'
+            except KeyError:
+                pass
+
     @classmethod
     def get_protocol_filepath(cls):
         """Return ``pathlib.Path`` to the ``.yaml`` file that defines the protocols."""
@@ -200,6 +237,79 @@ class PhBaseWorkChain(ProtocolMixin, BaseRestartWorkChain):
 
         self.ctx.inputs['qpoints'] = qpoints
 
+    def should_parallelize_qpoints(self):
+        """Return whether the q-points should be distributed over independent calculations."""
+        return self.inputs.parallelize_qpoints.value
+
+    def get_qpoint_inputs(self, parameters):
+        """Return the inputs of a `PhBaseWorkChain` that runs with the given parameters, but is otherwise the same.
+
+        :param parameters: the dictionary with the parameters of the `ph.x` calculation.
+        :return: the inputs for the `PhBaseWorkChain`.
+        """
+        inputs = AttributeDict({
+            'ph': AttributeDict(self.exposed_inputs(PhCalculation, 'ph')),
+            'qpoints': self.ctx.inputs.qpoints,
+            'max_iterations': self.inputs.max_iterations,
+        })
+        inputs.ph.parameters = orm.Dict(parameters)
+
+        return inputs
+
+    def run_initialization(self):
+        """Run a `PhBaseWorkChain` that only determines the q-points, by setting `start_irr` and `last_irr` to 0."""
+        parameters = self.inputs.ph.parameters.get_dict()
+        parameters.setdefault('INPUTPH', {}).update({'start_irr': 0, 'last_irr': 0})
+
+        inputs = self.get_qpoint_inputs(parameters)
+        inputs.metadata = {'call_link_label': 'initialization'}
+
+        running = self.submit(PhBaseWorkChain, **inputs)
+        self.report(f'launched initialization PhBaseWorkChain<{running.pk}>')
+
+        return ToContext(initialization=running)
+
+    def inspect_initialization(self):
+        """Verify that the initialization `PhBaseWorkChain` finished successfully and determine the q-points to run."""
+        workchain = self.ctx.initialization
+
+        if not workchain.is_finished_ok:
+            self.report(f'initialization PhBaseWorkChain failed with exit status {workchain.exit_status}')
+            return self.exit_codes.ERROR_SUB_PROCESS_FAILED_INITIALIZATION
+
+        parameters = self.inputs.ph.parameters.get_dict().get('INPUTPH', {})
+        number_of_qpoints = workchain.outputs.output_parameters['number_of_qpoints']
+
+        self.ctx.qpoint_indices = list(
+            range(parameters.get('start_q', 1),
+                  parameters.get('last_q', number_of_qpoints) + 1)
+        )
+
+    def run_qpoints(self):
+        """Run a `PhBaseWorkChain` for each q-point, which are all submitted at once to run in parallel."""
+        futures = {}
+
+        for index in self.ctx.qpoint_indices:
+            parameters = self.inputs.ph.parameters.get_dict()
+            parameters.setdefault('INPUTPH', {}).update({'start_q': index, 'last_q': index})
+
+            inputs = self.get_qpoint_inputs(parameters)
+            inputs.metadata = {'call_link_label': f'qpoint_{index}'}
+
+            futures[f'qpoint_{index}'] = self.submit(PhBaseWorkChain, **inputs)
+
+        self.report(f'launched {len(futures)} PhBaseWorkChains for the q-points {self.ctx.qpoint_indices}')
+
+        return ToContext(**futures)
+
+    def inspect_qpoints(self):
+        """Verify that the `PhBaseWorkChain` of each q-point finished successfully."""
+        failed = [index for index in self.ctx.qpoint_indices if not self.ctx[f'qpoint_{index}'].is_finished_ok]
+
+        if failed:
+            self.report(f'the PhBaseWorkChains of the q-points {failed} failed')
+            return self.exit_codes.ERROR_SUB_PROCESS_FAILED_QPOINTS
+
     def set_max_seconds(self, max_wallclock_seconds: None):
         """Set the `max_seconds` to a fraction of `max_wallclock_seconds` option to prevent out-of-walltime problems.
 
@@ -229,6 +339,9 @@ class PhBaseWorkChain(ProtocolMixin, BaseRestartWorkChain):
         if self.inputs.only_initialization.value:
             return
 
+        if self.should_parallelize_qpoints():
+            return self.create_merged_output_qpoints()
+
         if len(self.ctx.children) == 1:
             return
 
@@ -246,17 +359,65 @@ class PhBaseWorkChain(ProtocolMixin, BaseRestartWorkChain):
 
         if num_qpoints_found == num_qpoints:
             self.report(f'Merging {num_qpoints} q-points data from `PhCalculation`s.')
-            self.ctx.merged_output_parameters = merge_ph_outputs(**output_dict)
+            self.ctx.merged_outputs = merge_ph_outputs(**output_dict, **self.get_dynamical_matrices_outputs())
         else:
             self.report(f'Only {num_qpoints_found} of {num_qpoints} q-points were parsed.')
             return self.exit_codes.ERROR_MERGING_QPOINTS
 
+    def create_merged_output_qpoints(self):
+        """Merge the outputs of the `PhBaseWorkChain` of each q-point, checking that each q-point is complete."""
+        workchains = {index: self.ctx[f'qpoint_{index}'] for index in self.ctx.qpoint_indices}
+
+        missing = [
+            index for index, workchain in workchains.items()
+            if 'mode_symmetry' not in workchain.outputs.output_parameters.get(f'dynamical_matrix_{index}', {})
+        ]
+
+        if missing:
+            self.report(f'The dynamical matrices of the q-points {missing} were not parsed.')
+            return self.exit_codes.ERROR_MERGING_QPOINTS
+
+        self.report(f'Merging {len(workchains)} q-points data from `PhBaseWorkChain`s.')
+
+        self.ctx.merged_outputs = merge_ph_outputs(
+            **{f'output_{index}': workchain.outputs.output_parameters for index, workchain in workchains.items()},
+            **self.get_dynamical_matrices_outputs(workchains),
+        )
+        self.ctx.merged_retrieved = merge_ph_dynamical_matrices(
+            initialization=self.ctx.initialization.outputs.retrieved,
+            **{f'retrieved_{index}': workchain.outputs.retrieved for index, workchain in workchains.items()}
+        )
+
+    def get_dynamical_matrices_outputs(self, processes=None):
+        """Return the `output_dynamical_matrices` of the given processes, labeled such that they are merged right after
+        the `output_parameters` of the same process.
+
+        :param processes: mapping of the index of each process onto its node, by default the calculations that were run.
+        :return: dictionary of the label of each `output_dynamical_matrices` onto the node.
+        """
+        if processes is None:
+            processes = {index + 1: child for index, child in enumerate(self.ctx.children)}
+
+        return {
+            f'output_{index}_dynamical_matrices': process.outputs.output_dynamical_matrices
+            for index, process in processes.items()
+            if 'output_dynamical_matrices' in process.outputs
+        }
+
+    def results(self):
+        """Attach the merged outputs of the q-points, or those of the last calculation if they were not distributed."""
+        if not self.should_parallelize_qpoints():
+            return super().results()
+
+        self.out_many(self.ctx.merged_outputs)
+        self.out('retrieved', self.ctx.merged_retrieved)
+
     def get_outputs(self, node) -> Mapping[str, orm.Node]:
         """Return a mapping of the outputs that should be attached as outputs to the work chain."""
         outputs = super().get_outputs(node)
 
-        if 'merged_output_parameters' in self.ctx:
-            outputs['output_parameters'] = self.ctx.merged_output_parameters
+        if 'merged_outputs' in self.ctx:
+            outputs.update(self.ctx.merged_outputs)
 
         return outputs
 
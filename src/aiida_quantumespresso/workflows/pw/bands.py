@@ -4,7 +4,9 @@ from aiida import orm
 from aiida.common import AttributeDict
 from aiida.engine import ToContext, WorkChain, if_
 
+from aiida_quantumespresso.calculations.functions.merge_bands_data import merge_bands_data
 from aiida_quantumespresso.calculations.functions.seekpath_structure_analysis import seekpath_structure_analysis
+from aiida_quantumespresso.calculations.functions.split_kpoints import split_kpoints
 from aiida_quantumespresso.utils.mapping import prepare_process_inputs
 from aiida_quantumespresso.workflows.pw.base import PwBaseWorkChain
 from aiida_quantumespresso.workflows.pw.relax import PwRelaxWorkChain
@@ -23,6 +25,24 @@ def validate_inputs(inputs, ctx=None):  # pylint: disable=unused-argument
     if all(key in inputs for key in ['bands_kpoints', 'bands_kpoints_distance']):
         return PwBandsWorkChain.exit_codes.ERROR_INVALID_INPUT_KPOINTS.message
 
+    if 'max_bands_shards' in inputs and inputs['max_bands_shards'].value < 1:
+        return PwBandsWorkChain.exit_codes.ERROR_INVALID_INPUT_MAX_BANDS_SHARDS.message
+
+
+def get_number_of_pools(settings):
+    """Return the number of k-point pools that are requested in the command line options of the given settings.
+
+    :param settings: the dictionary of the ``settings`` input of a ``PwCalculation``.
+    :return: the number of pools, which is one if it is not specified.
+    """
+    cmdline = [str(option) for option in settings.get('CMDLINE', [])]
+
+    for flag in ('-nk', '-npool', '-npools'):
+        if flag in cmdline[:-1]:
+            return max(int(cmdline[cmdline.index(flag) + 1]), 1)
+
+    return 1
+
 
 class PwBandsWorkChain(ProtocolMixin, WorkChain):
     """Workchain to compute a band structure for a given structure using Quantum ESPRESSO pw.x.
@@ -45,8 +65,18 @@ class PwBandsWorkChain(ProtocolMixin, WorkChain):
         In the two other cases, the structure will first be normalized using SeekPath and the path along high-symmetry
         k-points will be generated on that structure. The distance between kpoints for the path will be equal to that
         of `bands_kpoints_distance` or the SeekPath default if not specified.
+
+    Sharding:
+        If `max_bands_shards` is specified, the k-points of the BANDS step can be split into contiguous shards that are
+        computed by independent `PwBaseWorkChain`s, which all run in parallel from the `remote_folder` of the SCF
+        calculation. The number of shards is the largest number up to `max_bands_shards` for which each shard has at
+        least `min_kpoints_per_pool` k-points for each of the pools in `bands.pw.settings.CMDLINE`. The bands of the
+        shards are then stitched back together into a single `BandsData`.
     """
 
+    #: The minimum number of k-points for each pool of a shard of the BANDS step
+    min_kpoints_per_pool = 4
+
     @classmethod
     def define(cls, spec):
         """Define the process specification."""
@@ -70,6 +100,11 @@ class PwBandsWorkChain(ProtocolMixin, WorkChain):
             help='Explicit kpoints to use for the BANDS calculation. Specify either this or `bands_kpoints_distance`.')
         spec.input('bands_kpoints_distance', valid_type=orm.Float, required=False,
             help='Minimum kpoints distance for the BANDS calculation. Specify either this or `bands_kpoints`.')
+        spec.input('max_bands_shards', valid_type=orm.Int, required=False,
+            help='The maximum number of shards in which the k-points of the BANDS step are split, to be computed by '
+                 'independent `PwBaseWorkChain`s that run in parallel. The actual number is chosen such that each '
+                 'shard has enough k-points for the pools of each calculation. If not specified, all k-points are '
+                 'computed by a single `PwBaseWorkChain`.')
 
         spec.inputs.validator = validate_inputs
         spec.outline(
@@ -83,20 +118,29 @@ class PwBandsWorkChain(ProtocolMixin, WorkChain):
             ),
             cls.run_scf,
             cls.inspect_scf,
-            cls.run_bands,
-            cls.inspect_bands,
+            if_(cls.should_shard_bands)(
+                cls.run_bands_shards,
+                cls.inspect_bands_shards,
+            ).else_(
+                cls.run_bands,
+                cls.inspect_bands,
+            ),
             cls.results,
         )
         spec.exit_code(201, 'ERROR_INVALID_INPUT_NUMBER_OF_BANDS',
             message='Cannot specify both `nbands_factor` and `bands.pw.parameters.SYSTEM.nbnd`.')
         spec.exit_code(202, 'ERROR_INVALID_INPUT_KPOINTS',
             message='Cannot specify both `bands_kpoints` and `bands_kpoints_distance`.')
+        spec.exit_code(203, 'ERROR_INVALID_INPUT_MAX_BANDS_SHARDS',
+            message='The `max_bands_shards` should be at least one.')
         spec.exit_code(401, 'ERROR_SUB_PROCESS_FAILED_RELAX',
             message='The PwRelaxWorkChain sub process failed')
         spec.exit_code(402, 'ERROR_SUB_PROCESS_FAILED_SCF',
             message='The scf PwBasexWorkChain sub process failed')
         spec.exit_code(403, 'ERROR_SUB_PROCESS_FAILED_BANDS',
             message='The bands PwBasexWorkChain sub process failed')
+        spec.exit_code(404, 'ERROR_SUB_PROCESS_FAILED_BANDS_SHARDS',
+            message='One or more of the bands PwBaseWorkChain sub processes of the k-point shards failed.')
         spec.output('primitive_structure', valid_type=orm.StructureData,
             required=False,
             help='The normalized and primitivized structure for which the bands are computed.')
@@ -106,7 +150,7 @@ class PwBandsWorkChain(ProtocolMixin, WorkChain):
         spec.output('scf_parameters', valid_type=orm.Dict,
             help='The output parameters of the SCF `PwBaseWorkChain`.')
         spec.output('band_parameters', valid_type=orm.Dict,
-            help='The output parameters of the BANDS `PwBaseWorkChain`.')
+            help='The output parameters of the BANDS `PwBaseWorkChain`, or of that of the first shard.')
         spec.output('band_structure', valid_type=orm.BandsData,
             help='The computed band structure.')
         # yapf: enable
@@ -256,11 +300,38 @@ class PwBandsWorkChain(ProtocolMixin, WorkChain):
         self.ctx.current_folder = workchain.outputs.remote_folder
         self.ctx.current_number_of_bands = workchain.outputs.output_parameters.base.attributes.get('number_of_bands')
 
-    def run_bands(self):
-        """Run the PwBaseWorkChain in bands mode along the path of high-symmetry determined by seekpath."""
+    def should_shard_bands(self):
+        """Return whether the k-points of the BANDS step are split into shards that are computed in parallel."""
+        return self.get_number_of_bands_shards() > 1
+
+    def get_number_of_bands_shards(self):
+        """Return the number of shards in which the k-points of the BANDS step are split.
+
+        The number of shards is limited by the `max_bands_shards` input and by the number of k-points, such that each
+        shard has at least `min_kpoints_per_pool` k-points for each of the pools of its calculation.
+
+        :return: the number of shards, which is one if the `max_bands_shards` input is not specified or if the k-points
+            of the BANDS step are defined as a mesh instead of an explicit list.
+        """
+        if 'max_bands_shards' not in self.inputs:
+            return 1
+
+        try:
+            number_of_kpoints = len(self.ctx.bands_kpoints.get_kpoints())
+        except AttributeError:
+            return 1
+
+        settings = self.inputs.bands.pw.settings.get_dict() if 'settings' in self.inputs.bands.pw else {}
+        kpoints_per_shard = self.min_kpoints_per_pool * get_number_of_pools(settings)
+
+        return max(min(self.inputs.max_bands_shards.value, number_of_kpoints // kpoints_per_shard), 1)
+
+    def get_bands_inputs(self):
+        """Return the inputs for the `PwBaseWorkChain` of the BANDS step, without the k-points.
+
+        :return: the inputs as an `AttributeDict`.
+        """
         inputs = AttributeDict(self.exposed_inputs(PwBaseWorkChain, namespace='bands'))
-        inputs.metadata.call_link_label = 'bands'
-        inputs.kpoints = self.ctx.bands_kpoints
         inputs.pw.structure = self.ctx.current_structure
         inputs.pw.parent_folder = self.ctx.current_folder
         inputs.pw.parameters = inputs.pw.parameters.get_dict()
@@ -281,6 +352,14 @@ class PwBandsWorkChain(ProtocolMixin, WorkChain):
         else:
             inputs.pw.parameters['SYSTEM'].setdefault('nbnd', self.ctx.current_number_of_bands)
 
+        return inputs
+
+    def run_bands(self):
+        """Run the PwBaseWorkChain in bands mode along the path of high-symmetry determined by seekpath."""
+        inputs = self.get_bands_inputs()
+        inputs.metadata.call_link_label = 'bands'
+        inputs.kpoints = self.ctx.bands_kpoints
+
         inputs = prepare_process_inputs(PwBaseWorkChain, inputs)
         running = self.submit(PwBaseWorkChain, **inputs)
 
@@ -296,12 +375,52 @@ class PwBandsWorkChain(ProtocolMixin, WorkChain):
             self.report(f'bands PwBaseWorkChain failed with exit status {workchain.exit_status}')
             return self.exit_codes.ERROR_SUB_PROCESS_FAILED_BANDS
 
+        self.ctx.band_parameters = workchain.outputs.output_parameters
+        self.ctx.band_structure = workchain.outputs.output_band
+
+    def run_bands_shards(self):
+        """Run a PwBaseWorkChain in bands mode for each shard of the k-points, which are all submitted at once."""
+        shards = split_kpoints(
+            self.ctx.bands_kpoints,
+            orm.Int(self.get_number_of_bands_shards()),
+            metadata={'call_link_label': 'split_kpoints'},
+        )
+        self.ctx.bands_shards = [f'bands_{index}' for index in range(len(shards))]
+        futures = {}
+
+        for index, label in enumerate(self.ctx.bands_shards):
+            inputs = self.get_bands_inputs()
+            inputs.metadata.call_link_label = label
+            inputs.kpoints = shards[f'kpoints_{index}']
+
+            inputs = prepare_process_inputs(PwBaseWorkChain, inputs)
+            futures[label] = self.submit(PwBaseWorkChain, **inputs)
+
+        self.report(f'launched {len(futures)} PwBaseWorkChains in bands mode for the shards of the k-points')
+
+        return ToContext(**futures)
+
+    def inspect_bands_shards(self):
+        """Verify that the PwBaseWorkChain of each shard finished successfully and merge their band structures."""
+        workchains = [self.ctx[label] for label in self.ctx.bands_shards]
+        failed = [workchain.pk for workchain in workchains if not workchain.is_finished_ok]
+
+        if failed:
+            self.report(f'the bands PwBaseWorkChains {failed} of the k-point shards failed')
+            return self.exit_codes.ERROR_SUB_PROCESS_FAILED_BANDS_SHARDS
+
+        self.ctx.band_parameters = workchains[0].outputs.output_parameters
+        self.ctx.band_structure = merge_bands_data(
+            **{label: self.ctx[label].outputs.output_band for label in self.ctx.bands_shards},
+            metadata={'call_link_label': 'merge_bands_data'},
+        )
+
     def results(self):
         """Attach the desired output nodes directly as outputs of the workchain."""
         self.report('workchain succesfully completed')
         self.out('scf_parameters', self.ctx.workchain_scf.outputs.output_parameters)
-        self.out('band_parameters', self.ctx.workchain_bands.outputs.output_parameters)
-        self.out('band_structure', self.ctx.workchain_bands.outputs.output_band)
+        self.out('band_parameters', self.ctx.band_parameters)
+        self.out('band_structure', self.ctx.band_structure)
 
     def on_terminated(self):
         """Clean the working directories of all child calculations if `clean_workdir=True` in the inputs."""
@@ -286,33 +286,45 @@ class PwBaseWorkChain(ProtocolMixin, BaseRestartWorkChain):
 
     def set_restart_type(self, restart_type, parent_folder=None):
         """Set the restart type for the next iteration."""
+        self.set_inputs_restart_type(self.ctx.inputs, restart_type, parent_folder)
 
+    @staticmethod
+    def set_inputs_restart_type(inputs, restart_type, parent_folder=None):
+        """Set the restart type in the inputs of a ``PwCalculation``.
+
+        :param inputs: the inputs of the ``PwCalculation``, with the ``parameters`` as a regular dictionary.
+        :param restart_type: the ``RestartType`` of the calculation.
+        :param parent_folder: the ``RemoteData`` to restart from, which is required unless restarting from scratch.
+        """
         if parent_folder is None and restart_type != RestartType.FROM_SCRATCH:
             raise ValueError('When not restarting from scratch, a `parent_folder` must be provided.')
 
+        control = inputs.parameters.setdefault('CONTROL', {})
+        electrons = inputs.parameters.setdefault('ELECTRONS', {})
+
         if restart_type == RestartType.FROM_SCRATCH:
-            self.ctx.inputs.parameters['CONTROL']['restart_mode'] = 'from_scratch'
-            self.ctx.inputs.parameters['ELECTRONS'].pop('startingpot', None)
-            self.ctx.inputs.parameters['ELECTRONS'].pop('startingwfc', None)
-            self.ctx.inputs.pop('parent_folder', None)
+            control['restart_mode'] = 'from_scratch'
+            electrons.pop('startingpot', None)
+            electrons.pop('startingwfc', None)
+            inputs.pop('parent_folder', None)
 
         elif restart_type == RestartType.FULL:
-            self.ctx.inputs.parameters['CONTROL']['restart_mode'] = 'restart'
-            self.ctx.inputs.parameters['ELECTRONS'].pop('startingpot', None)
-            self.ctx.inputs.parameters['ELECTRONS'].pop('startingwfc', None)
-            self.ctx.inputs.parent_folder = parent_folder
+            control['restart_mode'] = 'restart'
+            electrons.pop('startingpot', None)
+            electrons.pop('startingwfc', None)
+            inputs.parent_folder = parent_folder
 
         elif restart_type == RestartType.FROM_CHARGE_DENSITY:
-            self.ctx.inputs.parameters['CONTROL']['restart_mode'] = 'from_scratch'
-            self.ctx.inputs.parameters['ELECTRONS']['startingpot'] = 'file'
-            self.ctx.inputs.parameters['ELECTRONS'].pop('startingwfc', None)
-            self.ctx.inputs.parent_folder = parent_folder
+            control['restart_mode'] = 'from_scratch'
+            electrons['startingpot'] = 'file'
+            electrons.pop('startingwfc', None)
+            inputs.parent_folder = parent_folder
 
         elif restart_type == RestartType.FROM_WAVE_FUNCTIONS:
-            self.ctx.inputs.parameters['CONTROL']['restart_mode'] = 'from_scratch'
-            self.ctx.inputs.parameters['ELECTRONS'].pop('startingpot', None)
-            self.ctx.inputs.parameters['ELECTRONS']['startingwfc'] = 'file'
-            self.ctx.inputs.parent_folder = parent_folder
+            control['restart_mode'] = 'from_scratch'
+            electrons.pop('startingpot', None)
+            electrons['startingwfc'] = 'file'
+            inputs.parent_folder = parent_folder
 
     def prepare_process(self):
         """Prepare the inputs for the next calculation."""
@@ -5,8 +5,9 @@ from aiida.common import AttributeDict, exceptions
 from aiida.common.lang import type_check
 from aiida.engine import ToContext, WorkChain, append_, if_, while_
 from aiida.plugins import CalculationFactory, WorkflowFactory
+import numpy
 
-from aiida_quantumespresso.common.types import RelaxType
+from aiida_quantumespresso.common.types import RelaxType, RestartType
 from aiida_quantumespresso.utils.mapping import prepare_process_inputs
 
 from ..protocols.utils import ProtocolMixin
@@ -23,8 +24,33 @@ def validate_inputs(inputs, _):
         return 'The parameters in `base.pw.parameters` do not specify the required key `CONTROL.calculation`.'
 
 
+def validate_warm_start(value, _):
+    """Validate the `warm_start` input."""
+    restart_types = (RestartType.FROM_CHARGE_DENSITY.value, RestartType.FROM_WAVE_FUNCTIONS.value)
+
+    if value and value.value not in restart_types:
+        return f'`warm_start` should be one of {restart_types}, but got `{value.value}`.'
+
+
+def get_relative_cell_change(cell_initial, cell_final):
+    """Return the largest relative change of the lattice vectors, in units of the initial lattice vectors.
+
+    :param cell_initial: the initial cell, with the lattice vectors as rows.
+    :param cell_final: the final cell, with the lattice vectors as rows.
+    :return: the largest absolute element of the deformation of the initial into the final cell, minus the identity.
+    """
+    deformation = numpy.linalg.solve(numpy.array(cell_initial).T, numpy.array(cell_final).T)
+    return float(numpy.abs(deformation - numpy.eye(3)).max())
+
+
 class PwRelaxWorkChain(ProtocolMixin, WorkChain):
-    """Workchain to relax a structure using Quantum ESPRESSO pw.x."""
+    """Workchain to relax a structure using Quantum ESPRESSO pw.x.
+
+    If the `warm_start` input is specified, each meta-convergence iteration and the final scf are restarted from the
+    `remote_folder` of the previous iteration, reading the charge density or the wave functions from file instead of
+    starting from the superposition of atomic ones. The next calculation is started from scratch if the previous
+    iteration did not finish successfully, or if it changed the cell by more than `warm_start_threshold`.
+    """
 
     @classmethod
     def define(cls, spec):
@@ -45,6 +71,13 @@ class PwRelaxWorkChain(ProtocolMixin, WorkChain):
             help='The maximum number of variable cell relax iterations in the meta convergence cycle.')
         spec.input('volume_convergence', valid_type=orm.Float, default=lambda: orm.Float(0.01),
             help='The volume difference threshold between two consecutive meta convergence iterations.')
+        spec.input('warm_start', valid_type=orm.Str, required=False, validator=validate_warm_start,
+            help='If specified, the meta convergence iterations and the final scf are restarted from the previous '
+                 'iteration, either `from_charge_density` or `from_wave_functions`. Note that the wave functions can '
+                 'only be restarted from if the k-points do not change between the calculations.')
+        spec.input('warm_start_threshold', valid_type=orm.Float, default=lambda: orm.Float(0.05),
+            help='The maximum relative change of the lattice vectors of an iteration, for which the next calculation '
+                 'is warm-started. Above it, the next calculation starts from scratch.')
         spec.input('clean_workdir', valid_type=orm.Bool, default=lambda: orm.Bool(False),
             help='If `True`, work directories of all called calculation will be cleaned at the end of execution.')
         spec.inputs.validator = validate_inputs
@@ -174,6 +207,7 @@ class PwRelaxWorkChain(ProtocolMixin, WorkChain):
         self.ctx.current_cell_volume = None
         self.ctx.is_converged = False
         self.ctx.iteration = 0
+        self.ctx.restart_folder = None
 
         self.ctx.relax_inputs = AttributeDict(self.exposed_inputs(PwBaseWorkChain, namespace='base'))
         self.ctx.relax_inputs.pw.parameters = self.ctx.relax_inputs.pw.parameters.get_dict()
@@ -236,6 +270,8 @@ class PwRelaxWorkChain(ProtocolMixin, WorkChain):
         if self.ctx.current_number_of_bands is not None:
             inputs.pw.parameters.setdefault('SYSTEM', {})['nbnd'] = self.ctx.current_number_of_bands
 
+        self.set_warm_start(inputs)
+
         # Set the `CALL` link label
         inputs.metadata.call_link_label = f'iteration_{self.ctx.iteration:02d}'
 
@@ -278,6 +314,8 @@ class PwRelaxWorkChain(ProtocolMixin, WorkChain):
         prev_cell_volume = self.ctx.current_cell_volume
         curr_cell_volume = structure.get_cell_volume()
 
+        self.ctx.restart_folder = self.get_restart_folder(workchain, self.ctx.current_structure, structure)
+
         # Set relaxed structure as input structure for next iteration
         self.ctx.current_structure = structure
         self.ctx.current_number_of_bands = workchain.outputs.output_parameters.get_dict()['number_of_bands']
@@ -319,6 +357,8 @@ class PwRelaxWorkChain(ProtocolMixin, WorkChain):
         if self.ctx.current_number_of_bands is not None and inputs_nbnd is None:
             inputs.pw.parameters.setdefault('SYSTEM', {})['nbnd'] = self.ctx.current_number_of_bands
 
+        self.set_warm_start(inputs)
+
         inputs = prepare_process_inputs(PwBaseWorkChain, inputs)
         running = self.submit(PwBaseWorkChain, **inputs)
 
@@ -326,6 +366,50 @@ class PwRelaxWorkChain(ProtocolMixin, WorkChain):
 
         return ToContext(workchain_scf=running)
 
+    def get_restart_folder(self, workchain, structure_initial, structure_final):
+        """Return the folder of a relax `PwBaseWorkChain` from which the next calculation can be warm-started.
+
+        The next calculation should start from scratch if the workchain did not finish successfully, in which case the
+        files of its last calculation may not correspond to its output structure, or if the cell changed by more than
+        the `warm_start_threshold`. The files are written for the final cell and pw.x maps them onto the plane waves of
+        the next calculation by their Miller indices, so they remain a good guess if the cell, and with it the FFT grid,
+        changed only slightly, as is the case for the later iterations of a `vc-relax` and for the final scf.
+
+        :param workchain: the relax `PwBaseWorkChain`.
+        :param structure_initial: the input structure of the workchain.
+        :param structure_final: the output structure of the workchain, which is the input structure of the next one.
+        :return: the `remote_folder` of the workchain, or `None` if the next calculation should start from scratch.
+        """
+        if 'warm_start' not in self.inputs:
+            return None
+
+        if not workchain.is_finished_ok:
+            self.report('relax PwBaseWorkChain did not finish successfully: next calculation starts from scratch')
+            return None
+
+        threshold = self.inputs.warm_start_threshold.value
+        cell_change = get_relative_cell_change(structure_initial.cell, structure_final.cell)
+
+        if cell_change > threshold:
+            self.report(f'relative cell change {cell_change} larger than {threshold}: next calculation from scratch')
+            return None
+
+        return workchain.outputs.remote_folder
+
+    def set_warm_start(self, inputs):
+        """Set the restart type of the next calculation in its inputs, depending on the current restart folder.
+
+        :param inputs: the inputs of the next `PwBaseWorkChain`.
+        """
+        if 'warm_start' not in self.inputs:
+            return
+
+        if self.ctx.restart_folder is None:
+            PwBaseWorkChain.set_inputs_restart_type(inputs.pw, RestartType.FROM_SCRATCH)
+        else:
+            restart_type = RestartType(self.inputs.warm_start.value)
+            PwBaseWorkChain.set_inputs_restart_type(inputs.pw, restart_type, self.ctx.restart_folder)
+
     def inspect_final_scf(self):
         """Inspect the result of the final scf `PwBaseWorkChain`."""
         workchain = self.ctx.workchain_scf
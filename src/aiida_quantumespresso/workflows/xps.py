@@ -8,13 +8,14 @@ from typing import Optional, Union
 
 from aiida import orm
 from aiida.common import AttributeDict, ValidationError
-from aiida.engine import ToContext, WorkChain, if_
+from aiida.engine import ToContext, WorkChain, if_, while_
 from aiida.orm.nodes.data.base import to_aiida_type
 from aiida.plugins import CalculationFactory, DataFactory, WorkflowFactory
 from aiida_pseudo.data.pseudo import UpfData
 import yaml
 
 from aiida_quantumespresso.calculations.functions.xspectra.get_xps_spectra import get_spectra_by_element
+from aiida_quantumespresso.common.types import RestartType
 from aiida_quantumespresso.utils.mapping import prepare_process_inputs
 from aiida_quantumespresso.workflows.protocols.utils import ProtocolMixin, recursive_merge
 
@@ -43,6 +44,36 @@ def validate_inputs(inputs, _):
                     f'The ``correction_energies`` provided ({ce_list}) does not match the list of'
                     f' absorbing elements ({absorbing_elements_list})'
                 )
+    if 'grid_parameters' in inputs:
+        invalid_keys = set(inputs['grid_parameters'].keys()) - {'number_of_points', 'points_per_fwhm', 'margin'}
+        if invalid_keys:
+            raise ValidationError(f'The ``grid_parameters`` contain unsupported keys: {sorted(invalid_keys)}.')
+    if 'max_concurrent_scf' in inputs and inputs['max_concurrent_scf'].value < 1:
+        raise ValidationError('The ``max_concurrent_scf`` should be at least one.')
+    if inputs['restart_from_ground_state'].value and not inputs['calc_binding_energy'].value:
+        raise ValidationError(
+            'The ``restart_from_ground_state`` input requires the ground state scf, which is only run if '
+            '``calc_binding_energy`` is ``True``.'
+        )
+
+
+def get_scf_cost_estimate(structure, pseudos, parameters):
+    """Return an estimate of the relative cost of a ``pw.x`` scf calculation.
+
+    The cost is estimated as the number of spin components times the square of the number of valence electrons times
+    the volume of the cell, i.e. the cost of the orthogonalization of the bands, with the number of plane waves taken
+    proportional to the volume. Pseudopotentials that do not define their valence charge count as one electron.
+
+    :param structure: the ``StructureData`` of the calculation.
+    :param pseudos: the mapping of the kind names onto the pseudopotentials of the calculation.
+    :param parameters: the parameters of the calculation, as a plain dictionary.
+    :return: the estimated cost, in arbitrary units.
+    """
+    system = parameters.get('SYSTEM', {})
+    number_of_electrons = sum(getattr(pseudos[site.kind_name], 'z_valence', 1) for site in structure.sites)
+    number_of_electrons -= system.get('tot_charge', 0)
+
+    return system.get('nspin', 1) * number_of_electrons**2 * structure.get_cell_volume()
 
 
 class XpsWorkChain(ProtocolMixin, WorkChain):
@@ -136,6 +167,16 @@ class XpsWorkChain(ProtocolMixin, WorkChain):
                 'The sigma parameter for the gaussian broadening in the Voight method.'
             )
         )
+        spec.input(
+            'grid_parameters',
+            valid_type=orm.Dict,
+            required=False,
+            help=(
+                'The parameters of the energy grids of the final spectra: ``number_of_points`` (500 by default), or '
+                '``points_per_fwhm`` to adapt the density of the grids to the broadening, and ``margin`` (1.5 eV by '
+                'default), the energy by which the grids extend beyond the broadened peaks.'
+            )
+        )
         spec.input(
             'abs_atom_marker',
             valid_type=orm.Str,
@@ -184,6 +225,21 @@ class XpsWorkChain(ProtocolMixin, WorkChain):
             default=lambda: orm.Bool(False),
             help=('If `True`, run scf calculation for the supercell.'),
         )
+        spec.input(
+            'max_concurrent_scf',
+            valid_type=orm.Int,
+            required=False,
+            help=('The maximum number of scf calculations that are run at the same time. If specified, the scf '
+                  'calculations are launched in batches of at most this size, in order of decreasing estimated cost. '
+                  'If not specified, all of them are launched at once.')
+        )
+        spec.input(
+            'restart_from_ground_state',
+            valid_type=orm.Bool,
+            default=lambda: orm.Bool(False),
+            help=('If `True`, the ground state scf of the supercell is run first, and the core-hole scf of each site '
+                  'restarts from its charge density. Requires ``calc_binding_energy`` to be `True`.'),
+        )
         spec.input(
             'correction_energies',
             valid_type=orm.Dict,
@@ -212,7 +268,9 @@ class XpsWorkChain(ProtocolMixin, WorkChain):
                 cls.inspect_relax,
             ),
             cls.prepare_structures,
-            cls.run_all_scf,
+            while_(cls.should_run_all_scf)(
+                cls.run_all_scf,
+            ),
             cls.inspect_all_scf,
             cls.results,
         )
@@ -594,6 +652,7 @@ class XpsWorkChain(ProtocolMixin, WorkChain):
         structures_to_process = {f'{Key.split("_")[0]}_{Key.split("_")[1]}' : Value for Key, Value in result.items()}
         self.report(f'structures_to_process: {structures_to_process}')
         self.ctx.structures_to_process = structures_to_process
+        self.ctx.scf_queue = self.get_scf_queue()
 
     def should_run_gs_scf(self):
         """If the 'calc_binding_energy' input namespace is True, we run a scf calculation for the supercell."""
@@ -628,56 +687,109 @@ class XpsWorkChain(ProtocolMixin, WorkChain):
         scf_params = workchain.outputs.output_parameters
         self.out('output_parameters_scf', scf_params)
 
-    def run_all_scf(self):
-        """Call all PwBaseWorkChain's required to compute total energies for each absorbing atom site."""
+    def get_ch_scf_inputs(self, site):
+        """Return the inputs of the ``PwBaseWorkChain`` that computes the total energy for the given absorbing site.
 
-        # scf for supercell
-        futures = {}
-        if self.inputs.calc_binding_energy:
-            gs_future = self.run_gs_scf()
-            futures['ground_state'] = gs_future
-        # scf for core hole
-        structures_to_process = self.ctx.structures_to_process
-        equivalent_sites_data = self.ctx.equivalent_sites_data
+        :param site: the label of the absorbing site in ``self.ctx.structures_to_process``.
+        :return: the inputs as an ``AttributeDict``, with the ``parameters`` as a plain dictionary.
+        """
+        inputs = AttributeDict(self.exposed_inputs(PwBaseWorkChain, namespace='ch_scf'))
+        structure = self.ctx.structures_to_process[site]
+        inputs.pw.structure = structure
         abs_atom_marker = self.inputs.abs_atom_marker.value
+        abs_element = self.ctx.equivalent_sites_data[site]['symbol']
+
+        if 'core_hole_treatments' in self.inputs:
+            ch_treatments = self.inputs.core_hole_treatments.get_dict()
+            ch_treatment = ch_treatments.get(abs_element, 'xch_smear')
+        else:
+            ch_treatment = 'xch_smear'
 
-        for site in structures_to_process:
-            inputs = AttributeDict(self.exposed_inputs(PwBaseWorkChain, namespace='ch_scf'))
-            structure = structures_to_process[site]
-            inputs.pw.structure = structure
-            abs_element = equivalent_sites_data[site]['symbol']
+        inputs.metadata.call_link_label = f'{site}_xps'
 
-            if 'core_hole_treatments' in self.inputs:
-                ch_treatments = self.inputs.core_hole_treatments.get_dict()
-                ch_treatment = ch_treatments.get(abs_element, 'xch_smear')
-            else:
-                ch_treatment = 'xch_smear'
+        # Get the given settings for the SCF inputs and then overwrite them with the
+        # chosen core-hole approximation, then apply the correct pseudopotential pair
+        scf_params = inputs.pw.parameters.get_dict()
+        ch_treatment_inputs = self.get_treatment_inputs(treatment=ch_treatment)
 
+        new_scf_params = recursive_merge(left=scf_params, right=ch_treatment_inputs)
+        if ch_treatment == 'xch_smear':
+            structure_kinds = [kind.name for kind in structure.kinds]
+            structure_kinds.sort()
+            abs_species = structure_kinds.index(abs_atom_marker)
+            new_scf_params['SYSTEM'][f'starting_magnetization({abs_species + 1})'] = 1
+
+        core_hole_pseudo = self.inputs.core_hole_pseudos[abs_element]
+        inputs.pw.pseudos[abs_atom_marker] = core_hole_pseudo
+        # pseudos for all elements to be calculated should be replaced
+        for key in self.ctx.equivalent_sites_data:
+            abs_element = self.ctx.equivalent_sites_data[key]['symbol']
+            inputs.pw.pseudos[abs_element] = self.inputs.gipaw_pseudos[abs_element]
+        # remove pseudo if the only element is replaced by the marker
+        inputs.pw.pseudos = {kind.name: inputs.pw.pseudos[kind.name] for kind in structure.kinds}
 
-            inputs.metadata.call_link_label = f'{site}_xps'
+        inputs.pw.parameters = new_scf_params
 
-            # Get the given settings for the SCF inputs and then overwrite them with the
-            # chosen core-hole approximation, then apply the correct pseudopotential pair
-            scf_params = inputs.pw.parameters.get_dict()
-            ch_treatment_inputs = self.get_treatment_inputs(treatment=ch_treatment)
+        return inputs
+
+    def get_scf_queue(self):
+        """Return the labels of all ``PwBaseWorkChain`` to run, in the order in which they should be launched.
+
+        The ground state comes first, since the absorbing sites may restart from it, followed by the sites in order of
+        decreasing estimated cost, such that the most expensive ones do not end up on the critical path when the
+        calculations are launched in batches.
+        """
+        costs = {
+            site: get_scf_cost_estimate(inputs.pw.structure, inputs.pw.pseudos, inputs.pw.parameters)
+            for site, inputs in ((site, self.get_ch_scf_inputs(site)) for site in self.ctx.structures_to_process)
+        }
+        queue = sorted(costs, key=costs.get, reverse=True)
+
+        if self.inputs.calc_binding_energy:
+            queue.insert(0, 'ground_state')
 
-            new_scf_params = recursive_merge(left=scf_params, right=ch_treatment_inputs)
-            if ch_treatment == 'xch_smear':
-                structure_kinds = [kind.name for kind in structure.kinds]
-                structure_kinds.sort()
-                abs_species = structure_kinds.index(abs_atom_marker)
-                new_scf_params['SYSTEM'][f'starting_magnetization({abs_species + 1})'] = 1
+        return queue
 
-            core_hole_pseudo = self.inputs.core_hole_pseudos[abs_element]
-            inputs.pw.pseudos[abs_atom_marker] = core_hole_pseudo
-            # pseudos for all elements to be calculated should be replaced
-            for key in self.ctx.equivalent_sites_data:
-                abs_element = self.ctx.equivalent_sites_data[key]['symbol']
-                inputs.pw.pseudos[abs_element] = self.inputs.gipaw_pseudos[abs_element]
-            # remove pseudo if the only element is replaced by the marker
-            inputs.pw.pseudos = {kind.name: inputs.pw.pseudos[kind.name] for kind in structure.kinds}
+    def should_run_all_scf(self):
+        """Return whether there are still ``PwBaseWorkChain`` in the queue that should be launched."""
+        return len(self.ctx.scf_queue) > 0
 
-            inputs.pw.parameters = orm.Dict(dict=new_scf_params)
+    def run_all_scf(self):
+        """Call the next batch of PwBaseWorkChain's required to compute total energies for each absorbing atom site.
+
+        Unless ``max_concurrent_scf`` is specified, all the calculations in ``self.ctx.scf_queue`` are launched at once.
+        Otherwise, they are launched in batches of at most ``max_concurrent_scf`` calculations, and the next batch is
+        only launched once all calculations of the previous one have finished. If ``restart_from_ground_state`` is
+        ``True``, the ground state is launched on its own and the sites restart from its charge density.
+        """
+        if self.inputs.restart_from_ground_state.value and 'ground_state' in self.ctx:
+            if not self.ctx.ground_state.is_finished_ok:
+                self.report(f'PwBaseWorkChain failed with exit status {self.ctx.ground_state.exit_status}')
+                return self.exit_codes.ERROR_SUB_PROCESS_FAILED_SCF
+
+        queue = self.ctx.scf_queue
+
+        if queue[0] == 'ground_state' and self.inputs.restart_from_ground_state.value:
+            batch_size = 1
+        else:
+            batch_size = self.inputs.max_concurrent_scf.value if 'max_concurrent_scf' in self.inputs else len(queue)
+
+        batch, self.ctx.scf_queue = queue[:batch_size], queue[batch_size:]
+        futures = {}
+
+        for site in batch:
+            # scf for supercell
+            if site == 'ground_state':
+                futures[site] = self.run_gs_scf()
+                continue
+
+            # scf for core hole
+            inputs = self.get_ch_scf_inputs(site)
+
+            if self.inputs.restart_from_ground_state.value:
+                PwBaseWorkChain.set_inputs_restart_type(
+                    inputs.pw, RestartType.FROM_CHARGE_DENSITY, self.ctx.ground_state.outputs.remote_folder
+                )
 
             inputs = prepare_process_inputs(PwBaseWorkChain, inputs)
 
@@ -713,6 +825,8 @@ class XpsWorkChain(ProtocolMixin, WorkChain):
         if self.inputs.calc_binding_energy:
             kwargs['ground_state'] = self.ctx['ground_state'].outputs.output_parameters
             kwargs['correction_energies'] = self.inputs.correction_energies
+        if 'grid_parameters' in self.inputs:
+            kwargs['grid_parameters'] = self.inputs.grid_parameters
         kwargs['metadata'] = {'call_link_label' : 'compile_final_spectra'}
 
         if self.ctx.elements_list:
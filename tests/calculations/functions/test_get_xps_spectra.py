@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Tests for the `get_xps_spectra` module."""
+from aiida.orm import Dict, Float, List
+import numpy
+import pytest
+from scipy.special import voigt_profile  # pylint: disable=no-name-in-module
+
+from aiida_quantumespresso.calculations.functions.xspectra.get_xps_spectra import (
+    broaden_peaks,
+    get_spectra_by_element,
+    rebroaden_spectra,
+)
+
+PEAKS = {
+    'C': [(2, 0.0, 'site_0'), (1, 0.4, 'site_1'), (3, 1.1, 'site_2')],
+    'O': [(4, -0.2, 'site_3')],
+}
+
+
+def test_broaden_peaks():
+    """Test that the peaks of all elements are broadened as if each peak were evaluated separately."""
+    sigma, gamma = 0.3, 0.2
+    fwhm = gamma / 2 + numpy.sqrt(gamma**2 / 4 + sigma**2)
+    results = broaden_peaks(PEAKS, sigma, gamma)
+
+    assert list(results) == ['C', 'O']
+
+    for element, peaks in PEAKS.items():
+        energies, spectra, total = results[element]
+        positions = [peak[1] for peak in peaks]
+        total_multiplicity = sum(peak[0] for peak in peaks)
+        expected = [
+            multiplicity * voigt_profile(energies - position, sigma, gamma) / total_multiplicity
+            for multiplicity, position, _ in peaks
+        ]
+
+        bounds = (min(positions) - fwhm - 1.5, max(positions) + fwhm + 1.5)
+
+        numpy.testing.assert_allclose(energies, numpy.linspace(*bounds, 500))
+        numpy.testing.assert_allclose(spectra, expected, rtol=1e-12)
+        numpy.testing.assert_allclose(total, sum(expected), rtol=1e-12)
+
+
+def test_broaden_peaks_points_per_fwhm():
+    """Test that ``points_per_fwhm`` adapts the number of points of the grids to the broadening."""
+    for sigma in (0.1, 0.4):
+        fwhm = 0.05 + numpy.sqrt(0.05**2 + sigma**2)
+        results = broaden_peaks(PEAKS, sigma, 0.1, points_per_fwhm=10, margin=0.5)
+        energies = {element: result[0] for element, result in results.items()}
+
+        assert len(energies['C']) == len(energies['O'])
+        assert numpy.diff(energies['C']).max() <= fwhm / 10
+        assert numpy.diff(energies['C']).max() > fwhm / 11
+
+    with pytest.raises(ValueError, match='at least two points'):
+        broaden_peaks(PEAKS, 0.1, 0.1, number_of_points=1)
+
+
+@pytest.mark.usefixtures('aiida_profile')
+def test_rebroaden_spectra():
+    """Test that ``rebroaden_spectra`` reproduces the spectra of ``get_spectra_by_element`` from the stored shifts."""
+    equivalent_sites_data = {
+        label: {
+            'symbol': element,
+            'multiplicity': multiplicity
+        } for element, peaks in PEAKS.items() for multiplicity, _, label in peaks
+    }
+    kwargs = {label: Dict({'energy': energy}) for peaks in PEAKS.values() for _, energy, label in peaks}
+
+    results = get_spectra_by_element(
+        List(list(PEAKS)),
+        Dict(equivalent_sites_data),
+        Float(0.2),
+        Float(0.3),
+        grid_parameters=Dict({'points_per_fwhm': 20}),
+        **kwargs,
+    )
+    spectra = rebroaden_spectra(
+        {element: results[f'{element}_cls'] for element in PEAKS},
+        Dict(equivalent_sites_data),
+        0.3,
+        0.2,
+        points_per_fwhm=20,
+    )
+
+    for element, xy_data in spectra.items():
+        expected = results[f'{element}_cls_spectra']
+
+        assert not xy_data.is_stored
+        assert [y[0] for y in xy_data.get_y()] == [y[0] for y in expected.get_y()]
+        numpy.testing.assert_array_equal(xy_data.get_x()[1], expected.get_x()[1])
+
+        for (_, array, _), (_, expected_array, _) in zip(xy_data.get_y(), expected.get_y()):
+            numpy.testing.assert_array_equal(array, expected_array)
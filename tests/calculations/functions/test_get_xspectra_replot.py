@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""Tests for the `get_xspectra_replot` calculation function."""
+from aiida.orm import ArrayData, Dict
+import numpy
+import pytest
+from qe_tools import CONSTANTS
+
+from aiida_quantumespresso.calculations.functions.xspectra.get_xspectra_replot import (
+    FINE_STRUCTURE_CONSTANT,
+    get_lanczos_spectrum,
+    get_xspectra_replot,
+)
+
+
+def get_resolvent(energies, a_coefficients, b_coefficients):
+    """Return the first diagonal element of the resolvent of the tridiagonal Lanczos matrix by inverting it."""
+    matrix = numpy.diag(a_coefficients) + numpy.diag(b_coefficients[:-1], 1) + numpy.diag(b_coefficients[:-1], -1)
+    identity = numpy.eye(len(a_coefficients))
+    return numpy.array([numpy.linalg.inv(energy * identity - matrix)[0, 0] for energy in energies])
+
+
+def test_get_lanczos_spectrum():
+    """Test that the continued fractions of chains of different length match the inverse of their Lanczos matrix."""
+    rng = numpy.random.default_rng(0)
+    ncalcv = numpy.array([6, 3])
+    a_coefficients = rng.random((2, 6)) * (numpy.arange(6) < ncalcv[:, None])
+    b_coefficients = rng.random((2, 6)) * (numpy.arange(6) < ncalcv[:, None])
+    xnorm = numpy.array([0.5, 2.0])
+    weights = numpy.array([0.25, 0.75])
+    energies = numpy.linspace(-1, 2, 50)
+    gamma = numpy.linspace(0.05, 0.1, 50)
+
+    spectrum = get_lanczos_spectrum(energies, a_coefficients, b_coefficients, ncalcv, xnorm, weights, gamma)
+    expected = sum(
+        weight * norm**2 * -get_resolvent(energies + 1j * gamma, a[:n], b[:n]).imag / numpy.pi
+        for a, b, n, norm, weight in zip(a_coefficients, b_coefficients, ncalcv, xnorm, weights)
+    )
+
+    numpy.testing.assert_allclose(spectrum, expected, rtol=1e-10)
+
+
+def test_get_lanczos_spectrum_terminator():
+    """Test that the terminator reproduces the semi-elliptic band of an infinite chain with constant coefficients."""
+    energies = numpy.linspace(-1.45, 1.45, 30)
+    spectrum = get_lanczos_spectrum(energies, [[0.0] * 4], [[0.5] * 4], [4], [1.0], [1.0], 1e-8, terminator=True)
+
+    expected = numpy.sqrt(numpy.clip(1 - energies**2, 0, None)) * 2 / numpy.pi
+    numpy.testing.assert_allclose(spectrum, expected, atol=1e-6)
+
+
+@pytest.mark.usefixtures('aiida_profile')
+@pytest.mark.parametrize('lsda', (False, True))
+def test_get_xspectra_replot(lsda):
+    """Test that a single Lanczos coefficient gives the dipole cross-section of a Lorentzian with the requested width."""
+    energy_zero, core_level_energy = 4.1718, -1839.0
+    lanczos_coefficients = ArrayData()
+    lanczos_coefficients.set_array('a', numpy.full((2, 1), (energy_zero + 1.0) / CONSTANTS.ry_to_ev))
+    lanczos_coefficients.set_array('b', numpy.zeros((2, 1)))
+    lanczos_coefficients.set_array('ncalcv', numpy.array([1, 1]))
+    lanczos_coefficients.set_array('xnorm', numpy.array([1.0, 1.0]))
+    lanczos_coefficients.set_array('weights', numpy.array([0.5, 0.5]))
+    output_parameters = Dict({
+        'xepsilon': [1.0, 0.0, 0.0],
+        'energy_zero': str(energy_zero),
+        'core_level_energy': str(core_level_energy),
+        'lsda': lsda,
+    })
+    parameters = Dict({'xemin': -5.0, 'xemax': 5.0, 'xnepoint': 101, 'xgamma': 0.5})
+
+    results = get_xspectra_replot(lanczos_coefficients, output_parameters, parameters)
+
+    assert results['output_parameters']['xepsilon'] == [1.0, 0.0, 0.0]
+    assert results['output_parameters']['xonly_plot'] is True
+
+    energies = results['spectra'].get_x()[1]
+    labels = [label for label, _, _ in results['spectra'].get_y()]
+    spectrum = results['spectra'].get_y()[0][1]
+
+    gamma = 0.5 / CONSTANTS.ry_to_ev
+    shift = (energies - 1.0) / CONSTANTS.ry_to_ev
+    photon_energies = (energies + energy_zero - core_level_energy) / CONSTANTS.ry_to_ev
+    expected = 4 * numpy.pi**2 * FINE_STRUCTURE_CONSTANT * photon_energies * 2 * gamma / numpy.pi / (shift**2 + gamma**2)
+
+    assert labels == (['sigma_tot', 'sigma_up', 'sigma_down'] if lsda else ['sigma'])
+    numpy.testing.assert_allclose(energies, numpy.linspace(-5, 5, 101))
+    numpy.testing.assert_allclose(spectrum, expected, rtol=1e-8)
+
+
+@pytest.mark.usefixtures('aiida_profile')
+def test_get_xspectra_replot_core_level_energy():
+    """Test that the spectrum cannot be normalised without the ``core_level_energy``."""
+    lanczos_coefficients = ArrayData()
+    for name, array in (('a', [[0.0]]), ('b', [[0.0]]), ('ncalcv', [1]), ('xnorm', [1.0]), ('weights', [1.0])):
+        lanczos_coefficients.set_array(name, numpy.array(array))
+
+    with pytest.raises(ValueError, match='do not contain the `core_level_energy`'):
+        get_xspectra_replot(lanczos_coefficients, Dict({'energy_zero': '0.0'}), Dict({}))
+
+
+@pytest.mark.usefixtures('aiida_profile')
+def test_get_xspectra_replot_gamma_mode():
+    """Test that an unsupported ``gamma_mode`` raises."""
+    lanczos_coefficients = ArrayData()
+    for name, array in (('a', [[0.0]]), ('b', [[0.0]]), ('ncalcv', [1]), ('xnorm', [1.0]), ('weights', [1.0])):
+        lanczos_coefficients.set_array(name, numpy.array(array))
+
+    with pytest.raises(ValueError, match='the `gamma_mode` `file` is not supported'):
+        get_xspectra_replot(lanczos_coefficients, Dict({}), Dict({'gamma_mode': 'file'}))
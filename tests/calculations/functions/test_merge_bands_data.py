@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""Tests for the `split_kpoints` and `merge_bands_data` calculation functions."""
+from aiida import orm
+import numpy
+import pytest
+
+from aiida_quantumespresso.calculations.functions.merge_bands_data import merge_bands_data
+from aiida_quantumespresso.calculations.functions.split_kpoints import split_kpoints
+
+
+def generate_kpoints(number_of_kpoints=10):
+    """Return a `KpointsData` with an explicit path of k-points with labels and weights."""
+    kpoints = orm.KpointsData()
+    kpoints.set_cell(numpy.eye(3) * 5.)
+    kpoints.set_kpoints(
+        numpy.linspace(0, 0.5, number_of_kpoints)[:, None] * [1., 0., 0.],
+        weights=numpy.full(number_of_kpoints, 1. / number_of_kpoints)
+    )
+    kpoints.labels = [(0, 'G'), (4, 'Y'), (5, 'Z'), (number_of_kpoints - 1, 'X')]
+    return kpoints
+
+
+def generate_bands(kpoints, bands, occupations):
+    """Return the `BandsData` that would be computed for the given k-points."""
+    node = orm.BandsData()
+    node.set_kpointsdata(kpoints)
+    node.set_bands(bands, units='eV', occupations=occupations)
+    return node
+
+
+@pytest.mark.usefixtures('aiida_profile')
+def test_split_kpoints():
+    """Test that the k-points are split into contiguous shards that keep the labels, weights and cell."""
+    kpoints = generate_kpoints()
+    shards = split_kpoints(kpoints, orm.Int(3))
+
+    assert sorted(shards) == ['kpoints_0', 'kpoints_1', 'kpoints_2']
+    assert [len(shards[f'kpoints_{i}'].get_kpoints()) for i in range(3)] == [4, 3, 3]
+    assert shards['kpoints_0'].labels == [(0, 'G')]
+    assert shards['kpoints_1'].labels == [(0, 'Y'), (1, 'Z')]
+    assert shards['kpoints_2'].labels == [(2, 'X')]
+    numpy.testing.assert_array_equal(shards['kpoints_1'].cell, kpoints.cell)
+    numpy.testing.assert_array_equal(
+        numpy.concatenate([shards[f'kpoints_{i}'].get_kpoints() for i in range(3)]), kpoints.get_kpoints()
+    )
+
+    with pytest.raises(ValueError, match='the number of shards should be between 1'):
+        split_kpoints(kpoints, orm.Int(11))
+
+
+@pytest.mark.usefixtures('aiida_profile')
+@pytest.mark.parametrize('spin', (False, True))
+def test_merge_bands_data(spin):
+    """Test that the bands of the shards are stitched back into the bands of the original k-points."""
+    kpoints = generate_kpoints()
+    shape = (2, 10, 4) if spin else (10, 4)
+    bands = numpy.arange(numpy.prod(shape), dtype=float).reshape(shape)
+    occupations = numpy.ones(shape)
+
+    shards = split_kpoints(kpoints, orm.Int(3))
+    outputs = {}
+    start = 0
+
+    # Pass the shards in the wrong order, to check that they are merged in the natural order of their labels
+    for index in range(3):
+        shard = shards[f'kpoints_{index}']
+        stop = start + len(shard.get_kpoints())
+        outputs[f'bands_{index}'] = generate_bands(shard, bands[..., start:stop, :], occupations[..., start:stop, :])
+        start = stop
+
+    merged = merge_bands_data(**dict(reversed(outputs.items())))
+    expected = generate_bands(kpoints, bands, occupations)
+
+    assert merged.labels == expected.labels
+    assert merged.units == 'eV'
+    numpy.testing.assert_array_equal(merged.cell, expected.cell)
+    numpy.testing.assert_array_equal(merged.get_kpoints(), expected.get_kpoints())
+    numpy.testing.assert_array_equal(merged.get_kpoints(also_weights=True)[1], numpy.full(10, 0.1))
+    numpy.testing.assert_array_equal(merged.get_bands(), bands)
+    numpy.testing.assert_array_equal(merged.get_array('occupations'), occupations)
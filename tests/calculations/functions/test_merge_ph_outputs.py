@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""Tests for the `merge_ph_outputs` calculation function."""
+from aiida.orm import ArrayData, Dict
+import numpy
+import pytest
+
+from aiida_quantumespresso.calculations.functions.merge_ph_outputs import merge_ph_outputs
+
+
+def get_output_parameters(indices, complete=True):
+    """Return the `output_parameters` of a `ph.x` calculation that computed the q-points with the given indices."""
+    output_parameters = {
+        'number_of_irr_representations_for_each_q': [1] * len(indices) if complete else [],
+        'qpoint_indices': list(indices) if complete else [],
+        'wall_time_seconds': 10.0,
+        'number_of_atoms': 1,
+    }
+
+    for index in indices:
+        output_parameters[f'dynamical_matrix_{index}'] = {
+            'frequencies': [float(index), None, 3.0 * index],
+            'frequencies_units': 'cm-1',
+            'q_point': [0., 0., 0.1 * index],
+            'q_point_units': '2pi/lattice_parameter',
+        }
+
+        if complete:
+            output_parameters[f'dynamical_matrix_{index}'].update({
+                'mode_symmetry': ['A', 'A', 'B'],
+                'point_group': 'C_2',
+            })
+
+    return Dict(output_parameters)
+
+
+@pytest.mark.usefixtures('aiida_profile')
+def test_merge_ph_outputs():
+    """Test that the dynamical matrices are stacked into arrays and only the scalars are kept in the `Dict`."""
+    results = merge_ph_outputs(
+        output_1=get_output_parameters([1, 2]),
+        output_2=get_output_parameters([3], complete=False),
+        output_10=get_output_parameters([5]),
+        output_9=get_output_parameters([4]),
+    )
+
+    assert results['output_parameters'].get_dict() == {
+        'frequencies_units': 'cm-1',
+        'number_of_atoms': 1,
+        'number_of_irr_representations_for_each_q': [1, 1, 1, 1],
+        'number_of_qpoints': 4,
+        'q_point_units': '2pi/lattice_parameter',
+        'qpoint_indices': [1, 2, 4, 5],
+        'wall_time_seconds': 40.0,
+    }
+
+    arrays = results['output_dynamical_matrices']
+    assert sorted(arrays.get_arraynames()) == [
+        'frequencies', 'mode_symmetry', 'point_group', 'q_points', 'qpoint_indices'
+    ]
+    assert arrays.get_array('qpoint_indices').tolist() == [1, 2, 4, 5]
+    assert arrays.get_array('point_group').tolist() == ['C_2'] * 4
+    assert numpy.allclose(arrays.get_array('q_points')[:, 2], [0.1, 0.2, 0.4, 0.5])
+    assert numpy.isnan(arrays.get_array('frequencies')[:, 1]).all()
+    assert arrays.get_array('frequencies')[:, 2].tolist() == [3.0, 6.0, 12.0, 15.0]
+
+
+@pytest.mark.usefixtures('aiida_profile')
+def test_merge_ph_outputs_incremental():
+    """Test that the outputs of a previous merge can be extended with the outputs of additional calculations."""
+    previous = merge_ph_outputs(output_1=get_output_parameters([1, 2]), output_2=get_output_parameters([4]))
+
+    results = merge_ph_outputs(
+        merged_parameters=previous['output_parameters'],
+        merged_dynamical_matrices=previous['output_dynamical_matrices'],
+        output_3=get_output_parameters([3, 4]),
+    )
+    expected = merge_ph_outputs(
+        output_1=get_output_parameters([1, 2]),
+        output_2=get_output_parameters([4]),
+        output_3=get_output_parameters([3, 4]),
+    )
+
+    assert results['output_parameters'].get_dict() == expected['output_parameters'].get_dict()
+    assert results['output_parameters']['number_of_qpoints'] == 4
+
+    arrays = results['output_dynamical_matrices']
+    assert sorted(arrays.get_arraynames()) == sorted(expected['output_dynamical_matrices'].get_arraynames())
+    assert arrays.get_array('qpoint_indices').tolist() == [1, 2, 3, 4]
+
+    for name in arrays.get_arraynames():
+        numpy.testing.assert_array_equal(arrays.get_array(name), expected['output_dynamical_matrices'].get_array(name))
+
+
+@pytest.mark.usefixtures('aiida_profile')
+def test_merge_ph_outputs_repeated_qpoints():
+    """Test that q-points that occur in multiple outputs are counted once and taken from the last output."""
+    output_3 = get_output_parameters([3, 4])
+    output_3['number_of_irr_representations_for_each_q'] = [2, 3]
+
+    results = merge_ph_outputs(
+        output_1=get_output_parameters([1, 2]),
+        output_2=get_output_parameters([4]),
+        output_3=output_3,
+    )
+    output_parameters = results['output_parameters'].get_dict()
+    arrays = results['output_dynamical_matrices']
+
+    assert arrays.get_array('qpoint_indices').tolist() == [1, 2, 3, 4]
+    assert output_parameters['number_of_qpoints'] == 4
+    assert output_parameters['number_of_irr_representations_for_each_q'] == [1, 1, 2, 3]
+
+
+@pytest.mark.usefixtures('aiida_profile')
+def test_merge_ph_outputs_incomplete_qpoint():
+    """Test that the irreps of an incomplete q-point that precedes a complete one are not assigned to the latter."""
+    output_1 = get_output_parameters([2])
+    output_1['dynamical_matrix_1'] = {'q_point': [0., 0., 0.1], 'q_point_units': '2pi/lattice_parameter'}
+    output_1['number_of_irr_representations_for_each_q'] = [3]
+
+    results = merge_ph_outputs(output_1=output_1, output_2=get_output_parameters([3]))
+    output_parameters = results['output_parameters'].get_dict()
+
+    assert results['output_dynamical_matrices'].get_array('qpoint_indices').tolist() == [2, 3]
+    assert output_parameters['qpoint_indices'] == [2, 3]
+    assert output_parameters['number_of_irr_representations_for_each_q'] == [3, 1]
+    assert output_parameters['number_of_qpoints'] == 2
+
+
+@pytest.mark.usefixtures('aiida_profile')
+def test_merge_ph_outputs_without_qpoint_indices():
+    """Test that the irreps of outputs that do not list the indices of their q-points are appended as they are."""
+    output_1 = get_output_parameters([1, 2])
+    output_1.base.attributes.delete('qpoint_indices')
+
+    results = merge_ph_outputs(output_1=output_1, output_2=get_output_parameters([2]))
+    output_parameters = results['output_parameters'].get_dict()
+
+    assert 'qpoint_indices' not in output_parameters
+    assert output_parameters['number_of_irr_representations_for_each_q'] == [1, 1, 1]
+    assert output_parameters['number_of_qpoints'] == 3
+
+
+@pytest.mark.usefixtures('aiida_profile')
+def test_merge_ph_outputs_dynamical_matrices():
+    """Test that the `output_dynamical_matrices` of a calculation replace the dynamical matrices of its `Dict`."""
+    eigenvectors = numpy.arange(2 * 3 * 3).reshape(2, 3, 1, 3) * (1 + 1j)
+    dynamical_matrices = ArrayData()
+    dynamical_matrices.set_array('qpoint_indices', numpy.array([1, 2]))
+    dynamical_matrices.set_array('q_points', numpy.array([[0., 0., 0.1], [0., 0., 0.2]]))
+    dynamical_matrices.set_array('frequencies', numpy.array([[1., 2., 3.], [2., 4., 6.]]))
+    dynamical_matrices.set_array('eigenvectors', eigenvectors)
+
+    results = merge_ph_outputs(
+        output_1=get_output_parameters([1, 2]),
+        output_1_dynamical_matrices=dynamical_matrices,
+        output_2=get_output_parameters([3]),
+    )
+    arrays = results['output_dynamical_matrices']
+
+    assert sorted(arrays.get_arraynames()) == ['frequencies', 'q_points', 'qpoint_indices']
+
+    results = merge_ph_outputs(output_1=get_output_parameters([1, 2]), output_1_dynamical_matrices=dynamical_matrices)
+    arrays = results['output_dynamical_matrices']
+
+    assert sorted(arrays.get_arraynames()) == ['eigenvectors', 'frequencies', 'q_points', 'qpoint_indices']
+    assert arrays.get_array('frequencies').tolist() == [[1., 2., 3.], [2., 4., 6.]]
+    numpy.testing.assert_array_equal(arrays.get_array('eigenvectors'), eigenvectors)
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=redefined-outer-name
+"""Tests for the `ProjwfcCalculation` class."""
+from aiida import orm
+from aiida.common import AttributeDict
+import pytest
+
+from aiida_quantumespresso.calculations.projwfc import ProjwfcCalculation
+
+
+@pytest.fixture
+def generate_inputs(fixture_localhost, fixture_sandbox, fixture_code, generate_remote_data):
+    """Return a minimal set of inputs for a `ProjwfcCalculation`."""
+
+    def _generate_inputs():
+        from aiida_quantumespresso.utils.resources import get_default_options
+
+        return AttributeDict({
+            'code': fixture_code('quantumespresso.projwfc'),
+            'parent_folder': generate_remote_data(fixture_localhost, fixture_sandbox.abspath, 'quantumespresso.pw'),
+            'parameters': orm.Dict({'PROJWFC': {'DeltaE': 0.1}}),
+            'metadata': {
+                'options': get_default_options()
+            }
+        })
+
+    return _generate_inputs
+
+
+@pytest.mark.parametrize('keep_pdos_files', (True, False))
+def test_projwfc_keep_pdos_files(fixture_sandbox, generate_calc_job, generate_inputs, keep_pdos_files):
+    """Test the pdos files are only retrieved temporarily if the ``keep_pdos_files`` option is ``False``."""
+    inputs = generate_inputs()
+    inputs.metadata.options.keep_pdos_files = keep_pdos_files
+
+    calc_info = generate_calc_job(fixture_sandbox, 'quantumespresso.projwfc', inputs)
+    retrieve_list = ['aiida.out']
+    retrieve_temporary_list = list(ProjwfcCalculation._retrieve_temporary_list)  # pylint: disable=protected-access
+
+    if keep_pdos_files:
+        retrieve_list += ['aiida.pdos*']
+    else:
+        retrieve_temporary_list += ['aiida.pdos*']
+
+    assert sorted(calc_info.retrieve_list) == sorted(retrieve_list)
+    assert sorted(calc_info.retrieve_temporary_list) == sorted(retrieve_temporary_list)
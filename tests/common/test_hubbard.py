@@ -155,3 +155,17 @@ def test_from_to_list_hubbard(get_hubbard):
         'projectors': 'ortho-atomic',
         'formulation': 'dudarev',
     }
+
+
+def test_from_to_arrays_hubbard(get_hubbard):
+    """Test py:meth:`Hubbard.to_arrays` and py:meth:`Hubbard.from_arrays`."""
+    hubbard = get_hubbard()
+    arrays = hubbard.to_arrays()
+
+    assert arrays['translation'].shape == (2, 3)
+    assert arrays['value'].tolist() == [5.0, 5.0]
+    assert arrays['hubbard_type'].tolist() == ['U', 'U']
+
+    assert Hubbard.from_arrays(arrays) == hubbard
+    assert Hubbard.from_arrays(arrays).to_list() == hubbard.to_list()
+    assert Hubbard.from_arrays(Hubbard(parameters=[]).to_arrays()) == Hubbard(parameters=[])
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""Tests for the :mod:`data.force_constants` module."""
+# pylint: disable=redefined-outer-name,protected-access
+import io
+import os
+
+from aiida.orm import load_node
+import numpy
+import pytest
+
+from aiida_quantumespresso.data.force_constants import ForceConstantsData, parse_q2r_force_constants_file
+
+
+@pytest.fixture
+def filepath_force_constants(filepath_tests):
+    """Return the path to a force constants file written by QE-Q2R."""
+    return os.path.join(filepath_tests, 'calculations', 'fixtures', 'matdyn', 'default', 'force_constants.dat')
+
+
+def parse_force_constants_reference(lines, qpoints_mesh, number_of_atoms):
+    """Parse the real-space force constants line by line, to compare the vectorized parser with."""
+    force_constants = numpy.zeros(qpoints_mesh + (3, 3, number_of_atoms, number_of_atoms))
+    current_line = 0
+
+    for ji1 in range(3):
+        for ji2 in range(3):
+            for na1 in range(number_of_atoms):
+                for na2 in range(number_of_atoms):
+                    assert tuple(int(c) for c in lines[current_line].split()) == (ji1 + 1, ji2 + 1, na1 + 1, na2 + 1)
+                    current_line += 1
+                    for mi3 in range(qpoints_mesh[2]):
+                        for mi2 in range(qpoints_mesh[1]):
+                            for mi1 in range(qpoints_mesh[0]):
+                                line = lines[current_line].split()
+                                assert tuple(int(c) for c in line[:3]) == (mi1 + 1, mi2 + 1, mi3 + 1)
+                                force_constants[mi1, mi2, mi3, ji1, ji2, na1, na2] = float(line[3])
+                                current_line += 1
+
+    return force_constants
+
+
+def test_parse_q2r_force_constants_file(filepath_force_constants):
+    """Test that ``parse_q2r_force_constants_file`` returns the force constants with the correct indices."""
+    with open(filepath_force_constants, encoding='utf-8') as handle:
+        lines = handle.read().splitlines()
+
+    parsed_data, force_constants, warnings = parse_q2r_force_constants_file(lines, also_force_constants=True)
+    qpoints_mesh = tuple(parsed_data['qpoints_mesh'])
+    number_of_atoms = parsed_data['number_of_atoms']
+
+    assert warnings == []
+    assert force_constants.shape == qpoints_mesh + (3, 3, number_of_atoms, number_of_atoms)
+
+    # The force constants block starts right after the line with the q-points mesh
+    index = next(index for index, line in enumerate(lines) if line.split() == [str(q) for q in qpoints_mesh])
+    reference = parse_force_constants_reference(lines[index + 1:], qpoints_mesh, number_of_atoms)
+    assert numpy.array_equal(force_constants, reference)
+
+
+@pytest.mark.parametrize(('index', 'message'), (
+    (0, 'Wrong indices in force constants'),
+    (1, 'Wrong supercell indices in force constants'),
+))
+def test_parse_q2r_force_constants_file_wrong_indices(filepath_force_constants, index, message):
+    """Test that ``parse_q2r_force_constants_file`` raises when the force constants block contains wrong indices."""
+    with open(filepath_force_constants, encoding='utf-8') as handle:
+        lines = handle.read().splitlines()
+
+    parsed_data, _, _ = parse_q2r_force_constants_file(lines)
+    qpoints_mesh = [str(q) for q in parsed_data['qpoints_mesh']]
+    start = next(index for index, line in enumerate(lines) if line.split() == qpoints_mesh) + 1
+
+    # Swap the first two lines of the second header block of the force constants
+    offset = start + 1 + numpy.prod(parsed_data['qpoints_mesh']) + index
+    lines[offset], lines[offset + 1] = lines[offset + 1], lines[offset]
+
+    with pytest.raises(ValueError, match=message):
+        parse_q2r_force_constants_file(lines, also_force_constants=True)
+
+    with pytest.raises(ValueError, match='Wrong number of values in force constants'):
+        parse_q2r_force_constants_file(lines[:-1], also_force_constants=True)
+
+
+@pytest.mark.usefixtures('aiida_profile')
+def test_store_force_constants(filepath_force_constants):
+    """Test the ``store_force_constants`` option of ``ForceConstantsData.set_file``."""
+    node = ForceConstantsData(filepath_force_constants)
+    assert node.base.repository.list_object_names() == ['force_constants.dat']
+
+    node.set_file(filepath_force_constants, store_force_constants=True)
+    node.store()
+
+    filename_array = ForceConstantsData._FILENAME_FORCE_CONSTANTS
+    assert node.base.repository.list_object_names() == ['force_constants.dat', filename_array]
+
+    _, force_constants, _ = parse_q2r_force_constants_file(node.get_content().splitlines(), also_force_constants=True)
+    content = node.base.repository.get_object_content(filename_array, mode='rb')
+    assert numpy.array_equal(numpy.load(io.BytesIO(content)), force_constants)
+
+
+@pytest.mark.usefixtures('aiida_profile')
+@pytest.mark.parametrize('store_force_constants', (False, True))
+def test_force_constants_property(filepath_force_constants, monkeypatch, store_force_constants):
+    """Test that the ``ForceConstantsData.force_constants`` property reads the array once and caches it."""
+    from aiida_quantumespresso.data import force_constants as module
+
+    with open(filepath_force_constants, encoding='utf-8') as handle:
+        _, reference, _ = parse_q2r_force_constants_file(handle.read().splitlines(), also_force_constants=True)
+
+    node = ForceConstantsData(filepath_force_constants)
+    node.set_file(filepath_force_constants, store_force_constants=store_force_constants)
+    filenames = node.base.repository.list_object_names()
+
+    # If the binary array was stored, the force constants file should not be parsed at all
+    if store_force_constants:
+        monkeypatch.setattr(module, 'parse_q2r_force_constants_file', None)
+
+    force_constants = node.force_constants
+
+    assert not force_constants.flags.writeable
+    assert numpy.array_equal(force_constants, reference)
+    assert node.base.repository.list_object_names() == filenames
+
+    monkeypatch.setattr(module, 'parse_q2r_force_constants_file', None)
+    assert node.force_constants is force_constants
+
+    monkeypatch.undo()
+    assert numpy.array_equal(load_node(node.store().pk).force_constants, reference)
+
+
+@pytest.mark.usefixtures('aiida_profile')
+def test_force_constants_memory_map(filepath_force_constants, monkeypatch):
+    """Test that the stored binary array is memory mapped if it is a regular file, and read in full otherwise."""
+    node = ForceConstantsData(filepath_force_constants, store_force_constants=True)
+    reference = node.force_constants
+
+    assert isinstance(reference, numpy.memmap)
+
+    node = load_node(node.store().pk)
+    assert isinstance(node.force_constants, numpy.memmap)
+    assert numpy.array_equal(node.force_constants, reference)
+
+    # Objects that are not regular files, e.g. those of a pack of the disk object store, are read in full
+    monkeypatch.setattr(os.path, 'isfile', lambda _: False)
+    node = load_node(node.pk)
+
+    assert not isinstance(node.force_constants, numpy.memmap)
+    assert numpy.array_equal(node.force_constants, reference)
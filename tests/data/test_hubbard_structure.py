@@ -176,3 +176,60 @@ def test_get_symbol_indices(generate_hubbard_structure):
     """Test the `_get_symbol_indices` method."""
     hubbard_structure = generate_hubbard_structure()
     assert hubbard_structure._get_symbol_indices('Si') == [0, 1]
+
+
+@pytest.mark.usefixtures('aiida_profile')
+def test_edit_hubbard_parameters(generate_hubbard_structure):
+    """Test the `edit_hubbard_parameters` method."""
+    hubbard_structure = generate_hubbard_structure()
+    content = hubbard_structure.base.repository.get_object_content(HubbardStructureData._hubbard_filename, mode='rb')
+
+    with hubbard_structure.edit_hubbard_parameters():
+        hubbard_structure.append_hubbard_parameter(0, '1s', 1, '2s', 1.0, (0, 0, 0), 'V')
+        hubbard_structure.append_hubbard_parameter(1, '1s', 0, '2s', 1.0, (0, 0, 0), 'V')
+        hubbard_structure.append_hubbard_parameter(0, '1s', 1, '2s', 1.0, (0, 0, 0), 'V')
+        hubbard_structure.initialize_onsites_hubbard('Si1', '1s', 2.0, 'U')
+
+        # The parameters are only written to the repository on exit
+        assert hubbard_structure.base.repository.get_object_content(
+            HubbardStructureData._hubbard_filename, mode='rb'
+        ) == content
+        assert len(hubbard_structure.hubbard.parameters) == 4
+
+    assert hubbard_structure.hubbard.to_list() == [
+        (0, '1s', 0, '1s', 5.0, (0, 0, 0), 'Ueff'),
+        (1, '1s', 0, '2s', 1.0, (0, 0, 0), 'V'),
+        (0, '1s', 1, '2s', 1.0, (0, 0, 0), 'V'),
+        (1, '1s', 1, '1s', 2.0, (0, 0, 0), 'U'),
+    ]
+
+    # The changes are discarded if an exception is raised
+    with pytest.raises(ValueError):
+        with hubbard_structure.edit_hubbard_parameters():
+            hubbard_structure.clear_hubbard_parameters()
+            hubbard_structure.append_hubbard_parameter(0, '1s', 5, '1s', 1.0, None, 'V')
+
+    assert len(hubbard_structure.hubbard.parameters) == 4
+
+
+@pytest.mark.usefixtures('aiida_profile')
+def test_hubbard_json(generate_hubbard_structure, generate_hubbard):
+    """Test that the Hubbard parameters are read from the JSON file written by earlier versions."""
+    import json
+
+    hubbard_structure = generate_hubbard_structure()
+    hubbard_structure.base.repository.delete_object(HubbardStructureData._hubbard_filename)
+
+    hubbard = generate_hubbard()
+    hubbard.parameters[0].value = 3.0
+    serialized = json.dumps(hubbard.model_dump_json()).encode('utf-8')
+    hubbard_structure.base.repository.put_object_from_bytes(serialized, HubbardStructureData._hubbard_filename_json)
+
+    assert hubbard_structure.hubbard == hubbard
+
+    hubbard_structure.append_hubbard_parameter(0, '1s', 1, '1s', 1.0, (0, 0, 0), 'V')
+    assert hubbard_structure.base.repository.list_object_names() == [HubbardStructureData._hubbard_filename]
+    assert hubbard_structure.hubbard.to_list() == [
+        (0, '1s', 0, '1s', 3.0, (0, 0, 0), 'Ueff'),
+        (0, '1s', 1, '1s', 1.0, (0, 0, 0), 'V'),
+    ]
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Tests for the :mod:`data.projection` module."""
+# pylint: disable=redefined-outer-name
+from aiida.common import ValidationError
+from aiida.orm import BandsData, load_node
+from aiida.plugins import OrbitalFactory
+import numpy
+import pytest
+
+from aiida_quantumespresso.data.projection import SparseProjectionData
+
+
+@pytest.fixture
+def generate_projection_data():
+    """Return a factory for a ``SparseProjectionData`` with random projections, most of which are zero."""
+
+    def _generate_projection_data(number_of_orbitals=4, shape=(3, 5)):
+        rng = numpy.random.default_rng(0)
+        projections = rng.random(shape + (number_of_orbitals,))
+        projections[projections < 0.7] = 0.
+        energy = numpy.linspace(-10, 10, 7)
+        pdos = rng.random((number_of_orbitals, energy.size))
+
+        orbital_cls = OrbitalFactory('core.realhydrogen')
+        orbitals = [
+            orbital_cls(position=(0., 0., 0.), angular_momentum=1, magnetic_number=i % 3, radial_nodes=i // 3)
+            for i in range(number_of_orbitals)
+        ]
+
+        bands = BandsData()
+        bands.set_kpoints(numpy.zeros((shape[0], 3)))
+        bands.set_bands(numpy.zeros(shape))
+
+        node = SparseProjectionData()
+        node.set_reference_bandsdata(bands)
+        node.set_sparse_projectiondata(orbitals, projections, energy=energy, pdos=pdos)
+
+        return node, projections, energy, pdos
+
+    return _generate_projection_data
+
+
+@pytest.mark.usefixtures('aiida_profile')
+def test_sparse_projection_data(generate_projection_data):
+    """Test that the dense projections and pdos are rebuilt from the stored arrays."""
+    node, projections, energy, pdos = generate_projection_data()
+
+    assert node.get_array('projections_data').size == numpy.count_nonzero(projections)
+    assert 'proj_array_0' not in node.get_arraynames()
+
+    for stored in (False, True):
+        if stored:
+            node = load_node(node.store().pk)
+
+        numpy.testing.assert_array_equal(node.get_projection_array(), projections)
+
+        for index, (_, projection) in enumerate(node.get_projections()):
+            numpy.testing.assert_array_equal(projection, projections[:, :, index])
+            numpy.testing.assert_array_equal(node.get_array(f'proj_array_{index}'), projections[:, :, index])
+
+        for index, (_, pdos_orbital, energy_orbital) in enumerate(node.get_pdos()):
+            numpy.testing.assert_array_equal(pdos_orbital, pdos[index])
+            numpy.testing.assert_array_equal(energy_orbital, energy)
+            numpy.testing.assert_array_equal(node.get_array(f'energy_array_{index}'), energy)
+
+    assert len(node.get_projections(magnetic_number=1)) == 1
+
+    with pytest.raises(KeyError):
+        node.get_array(f'proj_array_{len(node.get_orbitals())}')
+
+
+@pytest.mark.usefixtures('aiida_profile')
+def test_sparse_projection_data_invalid(generate_projection_data):
+    """Test that ``set_sparse_projectiondata`` validates the shapes of the arrays."""
+    node, projections, energy, pdos = generate_projection_data()
+    orbitals = node.get_orbitals()
+
+    with pytest.raises(ValidationError, match='the projections do not have the shape'):
+        node.set_sparse_projectiondata(orbitals[:-1], projections, energy=energy, pdos=pdos)
+
+    with pytest.raises(ValidationError, match='the pdos do not have the shape'):
+        node.set_sparse_projectiondata(orbitals, projections, energy=energy[1:], pdos=pdos)
+
+    with pytest.raises(ValidationError, match='must always be set together'):
+        node.set_sparse_projectiondata(orbitals, projections, energy=energy)
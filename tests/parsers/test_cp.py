@@ -48,3 +48,49 @@ def test_cp_default(
         data['trajectory'] = results['output_trajectory'].base.attributes.all
 
     data_regression.check(data)
+
+
+def test_parse_cp_trajectory():
+    """Test the parsing of a trajectory file, including the time printed as asterisks from 100 ps on."""
+    import io
+
+    from aiida_quantumespresso.parsers.parse_raw.cp import parse_cp_traj_stanzas, parse_cp_trajectory
+
+    content = '\n'.join([
+        '      1  99.99990000',
+        '     0.1E+01     0.2E+01     0.3E+01',
+        '     0.4E+01     0.5E+01     0.6E+01',
+        '      2  **********',
+        '     0.7E+01     0.8E+01     0.9E+01',
+        '     0.1E+02     0.11E+02     0.12E+02',
+    ]) + '\n'
+
+    for chunk_size in (1, 4, 100):
+        steps, times, values = parse_cp_trajectory(io.StringIO(content), 2, rescale=2., chunk_size=chunk_size)
+
+        assert steps.tolist() == [1, 2]
+        assert times.tolist() == [99.9999, -1.0]
+        assert values.shape == (2, 2, 3)
+        assert values[1, 1].tolist() == [20., 22., 24.]
+
+    with pytest.raises(ValueError, match=r'Wrong number of lines \(2\)'):
+        parse_cp_trajectory(io.StringIO(content.rsplit('\n', 2)[0]), 2)
+
+    with pytest.raises(ValueError, match='could not be converted'):
+        parse_cp_trajectory(io.StringIO(content), 5)
+
+    with pytest.raises(ValueError, match=r'Wrong number of values \(3\) in the header'):
+        parse_cp_trajectory(io.StringIO(content), 1)
+
+    with pytest.raises(ValueError, match='Wrong step number'):
+        parse_cp_trajectory(io.StringIO(content.replace('      1 ', '      1.5 ')), 2)
+
+    with pytest.raises(ValueError, match=r'Wrong number of values \(11\) for stanzas'):
+        parse_cp_trajectory(io.StringIO(content.replace('0.3E+01', '')), 2)
+
+    with pytest.warns(FutureWarning):
+        stanzas = parse_cp_traj_stanzas(2, [line.split() for line in content.splitlines()], 'positions', rescale=2.)
+
+    assert stanzas['positions_steps'] == [1, 2]
+    assert stanzas['positions_times'] == [99.9999, -1.0]
+    assert stanzas['positions_data'] == values.tolist()
@@ -32,3 +32,31 @@ def test_matdyn_default(fixture_localhost, generate_calc_job_node, generate_pars
         'output_parameters': results['output_parameters'].get_dict(),
         'output_phonon_bands': results['output_phonon_bands'].base.attributes.all
     })
+
+
+def test_parse_raw_matdyn_phonon_file():
+    """Test ``parse_raw_matdyn_phonon_file`` for frequencies that are printed attached to each other."""
+    import numpy
+    from qe_tools import CONSTANTS
+
+    from aiida_quantumespresso.parsers.matdyn import parse_raw_matdyn_phonon_file
+
+    content = '\n'.join([
+        ' &plot nbnd=   4, nks=   2 /',
+        '            0.000000  0.000000  0.000000',
+        '-1204.1234-1020.5360   12.5000   20.6630',
+        '            0.500000  0.000000 -0.500000',
+        '   20.6630-1162.5154   30.0000 1200.0000',
+    ])
+    parsed_data = parse_raw_matdyn_phonon_file(content)
+
+    assert parsed_data['warnings'] == []
+    assert parsed_data['num_kpoints'] == 2
+    assert numpy.allclose(
+        parsed_data['phonon_bands'] / CONSTANTS.invcm_to_THz,
+        [[-1204.1234, -1020.536, 12.5, 20.663], [20.663, -1162.5154, 30.0, 1200.0]],
+    )
+
+    parsed_data = parse_raw_matdyn_phonon_file(content.replace('1200.0000', '*********'))
+    assert parsed_data['warnings'] == ['Bad formatting of frequencies']
+    assert 'phonon_bands' not in parsed_data
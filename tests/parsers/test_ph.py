@@ -1,8 +1,14 @@
 # -*- coding: utf-8 -*-
 """Tests for the `PhParser`."""
+import os
+
 from aiida import orm
+import numpy
 import pytest
 
+from aiida_quantumespresso.parsers.parse_raw.ph import parse_ph_dynmat, parse_ph_dynmat_arrays
+from aiida_quantumespresso.utils.mapping import get_logging_container
+
 
 def generate_inputs():
     """Return only those inputs that the parser will expect to be there."""
@@ -27,6 +33,77 @@ def test_ph_default(test_name, fixture_localhost, generate_calc_job_node, genera
     data_regression.check(results['output_parameters'].get_dict())
 
 
+@pytest.mark.parametrize(('test_name', 'shape'), (('default', (1, 6, 2, 3)), ('single_qpoint', (1, 3, 1, 3))))
+def test_ph_dynamical_matrices(test_name, shape, fixture_localhost, generate_calc_job_node, generate_parser):
+    """Test that the dynamical matrices are also returned as arrays in the `output_dynamical_matrices`."""
+    node = generate_calc_job_node('quantumespresso.ph', fixture_localhost, test_name, generate_inputs())
+    parser = generate_parser('quantumespresso.ph')
+    results, calcfunction = parser.parse_from_node(node, store_provenance=False)
+
+    assert calcfunction.is_finished_ok, calcfunction.exit_message
+
+    output_parameters = results['output_parameters'].get_dict()
+    arrays = results['output_dynamical_matrices']
+    eigenvectors = arrays.get_array('eigenvectors')
+
+    assert arrays.get_array('qpoint_indices').tolist() == [1]
+    assert arrays.get_array('q_points').tolist() == [output_parameters['dynamical_matrix_1']['q_point']]
+    assert arrays.get_array('frequencies').tolist() == [output_parameters['dynamical_matrix_1']['frequencies']]
+    assert arrays.get_array('mode_symmetry').tolist() == [output_parameters['dynamical_matrix_1']['mode_symmetry']]
+    assert eigenvectors.shape == shape
+    assert eigenvectors.dtype == complex
+    # The eigenvectors are normalized over all atoms and directions
+    assert numpy.allclose(numpy.linalg.norm(eigenvectors.reshape(shape[0], shape[1], -1), axis=-1), 1, atol=1e-5)
+
+
+@pytest.fixture
+def dynamical_matrix(filepath_tests):
+    """Return the content of the dynamical matrix file of the first q-point of the default test."""
+    filepath = os.path.join(filepath_tests, 'parsers', 'fixtures', 'ph', 'default', 'DYN_MAT', 'dynamical-matrix-1')
+
+    with open(filepath, encoding='utf-8') as handle:
+        return handle.read()
+
+
+def test_parse_ph_dynmat_arrays_wrong_formatting(dynamical_matrix):
+    """Test that a frequency that Fortran wrote as asterisks is set to ``NaN`` and that a warning is logged."""
+    logs = get_logging_container()
+    arrays = parse_ph_dynmat_arrays(dynamical_matrix, logs)
+
+    assert not numpy.isnan(arrays['frequencies']).any()
+    assert not logs.warning
+
+    content = dynamical_matrix.replace('585.586945 [cm-1]', '********** [cm-1]', 1)
+    arrays = parse_ph_dynmat_arrays(content, logs)
+
+    assert numpy.isnan(arrays['frequencies']).tolist() == [False, False, False, True, False, False]
+    assert logs.warning == ['Wrong fortran formatting found while parsing frequencies']
+
+
+def test_parse_ph_dynmat(dynamical_matrix):
+    """Test that the deprecated `parse_ph_dynmat` returns the arrays of `parse_ph_dynmat_arrays` as lists."""
+    logs = get_logging_container()
+    arrays = parse_ph_dynmat_arrays(dynamical_matrix, logs)
+
+    with pytest.warns(FutureWarning):
+        parsed_data = parse_ph_dynmat(
+            dynamical_matrix.splitlines(keepends=True),
+            logs,
+            lattice_parameter=2 * numpy.pi,
+            also_eigenvectors=True,
+            parse_header=True
+        )
+
+    assert not logs.warning
+    assert parsed_data['q_point'] == arrays['q_point'].tolist()
+    assert parsed_data['q_point_units'] == 'angstrom-1'
+    assert parsed_data['frequencies'] == arrays['frequencies'].tolist()
+    assert numpy.array_equal(numpy.array(parsed_data['eigenvectors']).view(complex)[..., 0], arrays['eigenvectors'])
+    assert parsed_data['header']['atoms_labels'] == ['Si', 'Si']
+    assert parsed_data['header']['lattice_vectors_units'] == 'angstrom'
+    assert not parsed_data['header']['warnings']
+
+
 def test_ph_not_converged(fixture_localhost, generate_calc_job_node, generate_parser, data_regression):
     """Test a `ph.x` calculation where convergence is not reached."""
     name = 'failed_convergence_not_reached'
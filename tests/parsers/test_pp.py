@@ -459,3 +459,29 @@ def test_pp_default_3d_failed_format(fixture_localhost, generate_calc_job_node,
     assert calcfunction.is_finished, calcfunction.exception
     assert calcfunction.is_failed, calcfunction.exit_status
     assert calcfunction.exit_status == node.process_class.exit_codes.ERROR_OUTPUT_DATAFILE_PARSE.status
+
+
+@pytest.mark.parametrize('chunk_size', (4, 2**22))
+def test_read_numeric_array(chunk_size):
+    """Test ``read_numeric_array`` for chunks that split the lines of the content."""
+    import io
+
+    import numpy as np
+
+    from aiida_quantumespresso.parsers.parse_raw.base import read_numeric_array
+
+    content = ' 1.0  -2.5E-01\n\n  3  4.125\n5'
+    expected = [1.0, -0.25, 3.0, 4.125, 5.0]
+
+    assert np.array_equal(read_numeric_array(io.StringIO(content), chunk_size=chunk_size), expected)
+    assert np.array_equal(read_numeric_array(io.StringIO(content), size=5, chunk_size=chunk_size), expected)
+    assert read_numeric_array(io.StringIO(' \n\n '), chunk_size=chunk_size).size == 0
+
+    with pytest.raises(ValueError, match='instead of the expected 6 numbers'):
+        read_numeric_array(io.StringIO(content), size=6, chunk_size=chunk_size)
+
+    with pytest.raises(ValueError, match='more than the expected 4 numbers'):
+        read_numeric_array(io.StringIO(content), size=4, chunk_size=chunk_size)
+
+    with pytest.raises(ValueError, match='could not be converted to numbers'):
+        read_numeric_array(io.StringIO(content.replace('4.125', '*****')), chunk_size=chunk_size)
@@ -1,28 +1,38 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=redefined-outer-name
 """Tests for the `ProjwfcParser`."""
+import fnmatch
+import os
 
+import numpy
 import pytest
 
 
 @pytest.fixture
-def generate_projwfc_node(generate_calc_job_node, fixture_localhost, tmpdir):
+def generate_projwfc_node(generate_calc_job_node, fixture_localhost, filepath_tests, tmpdir):
     """Fixture to constructure a ``projwfc.x`` calcjob node for a specified test."""
 
-    def _generate_projwfc_node(test_name):
+    def _generate_projwfc_node(test_name, inputs=None, keep_pdos_files=True):
         """Generate a mock ``ProjwfcCalculation`` node for testing the parsing.
 
         :param test_name: The name of the test folder that contains the output files.
+        :param inputs: Optional input nodes of the calculation.
+        :param keep_pdos_files: If ``False``, the pdos files are in the retrieved temporary folder instead.
         """
         entry_point_calc_job = 'quantumespresso.projwfc'
 
         retrieve_temporary_list = ['data-file-schema.xml']
+
+        if not keep_pdos_files:
+            dirpath_fixtures = os.path.join(filepath_tests, 'parsers', 'fixtures', 'projwfc', test_name)
+            retrieve_temporary_list += fnmatch.filter(os.listdir(dirpath_fixtures), '*.pdos*')
         attributes = {'retrieve_temporary_list': retrieve_temporary_list}
 
         node = generate_calc_job_node(
             entry_point_name=entry_point_calc_job,
             computer=fixture_localhost,
             test_name=test_name,
+            inputs=inputs,
             attributes=attributes,
             retrieve_temporary=(tmpdir, retrieve_temporary_list)
         )
@@ -81,6 +91,61 @@ def test_projwfc_spinpolarised(generate_projwfc_node, generate_parser, data_regr
     })
 
 
+@pytest.mark.parametrize('test_name', ('nonpolarised', 'spinpolarised'))
+def test_projwfc_sparse_projections(generate_projwfc_node, generate_parser, tmpdir, test_name):
+    """Test ``ProjwfcParser`` stores the same projections sparsely if the ``sparse_projections`` option is set."""
+    from aiida.orm import Dict
+
+    from aiida_quantumespresso.data.projection import SparseProjectionData
+
+    parser = generate_parser('quantumespresso.projwfc')
+    results_dense, _ = parser.parse_from_node(
+        generate_projwfc_node(test_name), store_provenance=False, retrieved_temporary_folder=tmpdir
+    )
+    settings = Dict({'parser_options': {'sparse_projections': True}})
+    results, calcfunction = parser.parse_from_node(
+        generate_projwfc_node(test_name, inputs={'settings': settings}),
+        store_provenance=False,
+        retrieved_temporary_folder=tmpdir
+    )
+
+    assert calcfunction.is_finished_ok, calcfunction.exit_message
+
+    for link_name in [name for name in results_dense if name.startswith('projections')]:
+        dense = results_dense[link_name]
+        sparse = results[link_name]
+
+        assert isinstance(sparse, SparseProjectionData)
+        assert sparse.base.attributes.get('orbital_dicts') == dense.base.attributes.get('orbital_dicts')
+
+        for (_, projection), (_, projection_dense) in zip(sparse.get_projections(), dense.get_projections()):
+            assert numpy.array_equal(projection, projection_dense)
+
+        for (_, pdos, energy), (_, pdos_dense, energy_dense) in zip(sparse.get_pdos(), dense.get_pdos()):
+            assert numpy.array_equal(pdos, pdos_dense)
+            assert numpy.array_equal(energy, energy_dense)
+
+
+def test_projwfc_pdos_files_temporary(generate_projwfc_node, generate_parser, tmpdir):
+    """Test ``ProjwfcParser`` reads the pdos files from the retrieved temporary folder if they are not kept."""
+    parser = generate_parser('quantumespresso.projwfc')
+    results_retrieved, _ = parser.parse_from_node(
+        generate_projwfc_node('spinpolarised'), store_provenance=False, retrieved_temporary_folder=tmpdir
+    )
+    node = generate_projwfc_node('spinpolarised', keep_pdos_files=False)
+    results, calcfunction = parser.parse_from_node(node, store_provenance=False, retrieved_temporary_folder=tmpdir)
+
+    assert calcfunction.is_finished_ok, calcfunction.exit_message
+    assert not fnmatch.filter(node.outputs.retrieved.base.repository.list_object_names(), '*.pdos*')
+    assert numpy.array_equal(results['Dos'].get_y()[0][1], results_retrieved['Dos'].get_y()[0][1])
+
+    for link_name in ['projections_up', 'projections_down']:
+        for (_, pdos, _), (_, pdos_retrieved, _) in zip(
+            results[link_name].get_pdos(), results_retrieved[link_name].get_pdos()
+        ):
+            assert numpy.array_equal(pdos, pdos_retrieved)
+
+
 def test_projwfc_no_retrieved_temporary(generate_calc_job_node, fixture_localhost, generate_parser):
     """Test ``ProjwfcParser`` fails when the retrieved temporary folder is missing."""
     node = generate_calc_job_node(
@@ -108,3 +173,25 @@ def test_projwfc_xml_failures(generate_projwfc_node, generate_parser, tmpdir, te
 
     assert calcfunction.is_failed, calcfunction.process_state
     assert calcfunction.exit_status == exit_status
+
+
+def test_parse_projections():
+    """Test ``parse_projections`` assigns the printed coefficients to the right band and state."""
+    from aiida_quantumespresso.parsers import QEOutputParsingError
+    from aiida_quantumespresso.parsers.projwfc import parse_projections
+
+    out_file = [
+        '==== e(   1) =   -68.36512 eV ==== ',
+        '     psi = 0.226*[#   1]+0.226*[#   2]+0.225*[#   4]',
+        '          +0.025*[#   3]',
+        '    |psi|^2 = 0.702',
+        '==== e(   2) =   -68.21967 eV ==== ',
+        '     psi = 0.996*[#   3]',
+        '    |psi|^2 = 0.996',
+    ]
+    projections = parse_projections(out_file, [0, 4], [3, 6], 4)
+
+    assert projections.tolist() == [[0.226, 0.226, 0.025, 0.225], [0., 0., 0.996, 0.]]
+
+    with pytest.raises(QEOutputParsingError):
+        parse_projections(out_file, [0, 4], [3, 6], 3)
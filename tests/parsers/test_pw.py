@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=invalid-name,redefined-outer-name, too-many-lines
 """Tests for the `PwParser`."""
+import os
+
 from aiida import orm
 from aiida.common import AttributeDict
+import numpy
 import pytest
 
 from aiida_quantumespresso.calculations.pw import PwCalculation
@@ -140,6 +143,50 @@ def test_pw_default_xml(
     })
 
 
+@pytest.mark.parametrize('xml_format', ['190304', '200420', '211101', '230310', '241015'])
+def test_pw_default_xml_validate(fixture_localhost, generate_calc_job_node, generate_parser, generate_inputs, xml_format):
+    """Test that the `validate_xml` parser option gives the same results as the default schema-free XML decoding."""
+    name = f'default_xml_{xml_format}'
+    entry_point_calc_job = 'quantumespresso.pw'
+    entry_point_parser = 'quantumespresso.pw'
+
+    results = []
+
+    for validate_xml in [True, False]:
+        inputs = generate_inputs(settings={'parser_options': {'validate_xml': validate_xml}})
+        node = generate_calc_job_node(entry_point_calc_job, fixture_localhost, name, inputs)
+        parser = generate_parser(entry_point_parser)
+        result, calcfunction = parser.parse_from_node(node, store_provenance=False)
+        assert calcfunction.is_finished_ok, calcfunction.exit_message
+        results.append(result)
+
+    for key in ['output_band', 'output_parameters', 'output_trajectory']:
+        assert results[0][key].base.attributes.all == results[1][key].base.attributes.all
+
+
+@pytest.mark.parametrize('xml_format', ['190304', '200420', '211101', '230310', '241015'])
+def test_decode_xml(filepath_tests, xml_format):
+    """Test that `decode_xml` returns the same dictionary as decoding the XML through its schema."""
+    from xml.etree import ElementTree
+
+    from aiida_quantumespresso.parsers.parse_xml.decode import decode_xml
+    from aiida_quantumespresso.parsers.parse_xml.versions import get_schema_filename, get_xml_schema
+
+    filepath = os.path.join(filepath_tests, 'parsers', 'fixtures', 'pw', f'default_xml_{xml_format}')
+    xml = ElementTree.parse(os.path.join(filepath, 'data-file-schema.xml'))
+    schema_filename = get_schema_filename(xml)
+
+    expected, _ = get_xml_schema(schema_filename).to_dict(xml, validation='lax')
+    decoded = decode_xml(xml, schema_filename)
+
+    # The namespace declarations of the root element are not decoded
+    for key in list(expected.keys()):
+        if key.startswith(('@{', 'xmlns')):
+            expected.pop(key)
+
+    assert decoded == expected
+
+
 def test_pw_initialization_xml_new(
     fixture_localhost, generate_calc_job_node, generate_parser, generate_inputs, data_regression
 ):
@@ -1206,3 +1253,91 @@ def test_magnetic_moments_v68(
         'atomic_magnetic_moments':
         results['output_trajectory'].get_array('atomic_magnetic_moments').tolist(),
     })
+
+
+def test_get_xml_schema_cached():
+    """Test that `get_xml_schema` compiles each XML schema only once per process."""
+    from aiida_quantumespresso.parsers.parse_xml.versions import (
+        get_available_xml_schemas,
+        get_xml_schema,
+        load_available_xml_schemas,
+    )
+
+    schema_filenames = load_available_xml_schemas()
+
+    assert sorted(schema_filenames) == sorted(get_available_xml_schemas())
+
+    for schema_filename in schema_filenames:
+        assert get_xml_schema(schema_filename) is get_xml_schema(schema_filename)
+
+
+@pytest.mark.parametrize(('line', 'errors', 'warnings'), (
+    ('     iteration #  1     ecut=    30.00 Ry     beta= 0.70', [], []),
+    ('     convergence NOT achieved after 100 iterations: stopping', ['ERROR_ELECTRONIC_CONVERGENCE_NOT_REACHED'], []),
+    ('     some nodes have no k-points', ['ERROR_NPOOLS_TOO_HIGH'], []),
+    ('Message: some nodes have no k-points', [], []),
+    ('     Warning: 1 eigenvalues not converged', [], ['     Warning: 1 eigenvalues not converged']),
+))
+def test_detect_important_message(line, errors, warnings):
+    """Test that `detect_important_message` only adds the known error and warning messages to the logs."""
+    from aiida_quantumespresso.parsers.parse_raw.pw import detect_important_message
+    from aiida_quantumespresso.utils.mapping import get_logging_container
+
+    logs = get_logging_container()
+    detect_important_message(logs, line)
+
+    assert logs.error == errors
+    assert logs.warning == warnings
+
+
+@pytest.mark.parametrize('name', ('default', 'relax_success', 'vcrelax_success', 'failed_interrupted'))
+def test_parse_stdout_stream(filepath_tests, name):
+    """Test that `parse_stdout` returns the same result for the stdout as a string and as a file handle."""
+    from aiida_quantumespresso.parsers.parse_raw.pw import parse_stdout
+
+    filepath = os.path.join(filepath_tests, 'parsers', 'fixtures', 'pw', name, 'aiida.out')
+
+    with open(filepath, encoding='utf-8', newline='\n') as handle:
+        expected, expected_logs = parse_stdout(handle.read(), {})
+        handle.seek(0)
+        parsed, logs = parse_stdout(handle, {})
+
+    trajectory = parsed.pop('trajectory')
+    expected_trajectory = expected.pop('trajectory')
+
+    assert parsed == expected
+    assert trajectory.keys() == expected_trajectory.keys()
+    for key, value in trajectory.items():
+        assert numpy.array_equal(value, expected_trajectory[key])
+    assert sorted(logs.error) == sorted(expected_logs.error)
+    assert sorted(logs.warning) == sorted(expected_logs.warning)
+
+
+@pytest.mark.parametrize('content', ('', '\n', 'a', 'a\n', 'a\r\nb\n\nc', 'a\nb\n\n'))
+def test_iterate_lines(content):
+    """Test that `iterate_lines` yields the same lines as splitting the content on newlines."""
+    import io
+
+    from aiida_quantumespresso.parsers.parse_raw.pw import iterate_lines
+
+    assert list(iterate_lines(content)) == content.split('\n')
+    assert list(iterate_lines(io.StringIO(content, newline='\n'))) == content.split('\n')
+
+
+def test_growable_array():
+    """Test that `GrowableArray` grows beyond its initial capacity and only accepts frames of the correct shape."""
+    from aiida_quantumespresso.parsers.parse_raw import GrowableArray
+
+    frames = numpy.random.default_rng(0).random((5, 2, 3))
+    array = GrowableArray((2, 3), capacity=2)
+
+    for frame in frames:
+        array.append(frame.tolist())
+
+    assert len(array) == 5
+    assert numpy.array_equal(numpy.asarray(array), frames)
+    assert numpy.asarray(array).base is not None
+    assert numpy.array_equal(array[-1], frames[-1])
+
+    with pytest.raises(ValueError):
+        array.append([1., 2., 3.])
@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
 """Tests for the `Q2rParser`."""
 from aiida import orm
+import numpy
+import pytest
+
+from aiida_quantumespresso.data.force_constants import parse_q2r_force_constants_file
 
 
 def generate_inputs():
@@ -22,3 +26,27 @@ def test_q2r_default(fixture_localhost, generate_calc_job_node, generate_parser,
     assert not orm.Log.collection.get_logs_for(node)
     assert 'force_constants' in results
     data_regression.check(results['force_constants'].get_content())
+
+
+@pytest.mark.parametrize('store_force_constants', (None, False))
+def test_q2r_store_force_constants(
+    fixture_localhost, generate_calc_job_node, generate_parser, store_force_constants
+):
+    """Test that the force constants are stored as a binary array, unless turned off with the parser options."""
+    inputs = generate_inputs()
+
+    if store_force_constants is not None:
+        inputs['settings'] = orm.Dict({'parser_options': {'store_force_constants': store_force_constants}})
+
+    node = generate_calc_job_node('quantumespresso.q2r', fixture_localhost, 'default', inputs)
+    parser = generate_parser('quantumespresso.q2r')
+    results, calcfunction = parser.parse_from_node(node, store_provenance=False)
+
+    assert calcfunction.is_finished_ok, calcfunction.exit_message
+
+    force_constants = results['force_constants']
+    stored = 'force_constants.npy' in force_constants.base.repository.list_object_names()
+    _, reference, _ = parse_q2r_force_constants_file(force_constants.get_content().splitlines(), True)
+
+    assert stored is (store_force_constants is None)
+    assert numpy.array_equal(force_constants.force_constants, reference)
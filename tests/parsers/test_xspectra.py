@@ -128,3 +128,23 @@ def test_xspectra_failed_timeout(fixture_localhost, generate_calc_job_node, gene
 
     assert calcfunction.is_failed
     assert calcfunction.exit_status == node.process_class.exit_codes.ERROR_OUT_OF_WALLTIME.status
+
+
+def test_xspectra_lanczos(fixture_localhost, generate_calc_job_node, generate_parser):
+    """Test `XspectraParser` reads the Lanczos coefficients from a synthetic save file next to the `default` outputs."""
+    entry_point_calc_job = 'quantumespresso.xspectra'
+    entry_point_parser = 'quantumespresso.xspectra'
+
+    node = generate_calc_job_node(entry_point_calc_job, fixture_localhost, 'lanczos', generate_inputs())
+    parser = generate_parser(entry_point_parser)
+    results, calcfunction = parser.parse_from_node(node, store_provenance=False)
+
+    assert calcfunction.is_finished_ok, calcfunction.exit_message
+    assert 'lanczos_coefficients' in results
+
+    arrays = results['lanczos_coefficients']
+    assert arrays.get_array('ncalcv').tolist() == [3, 2]
+    assert arrays.get_array('a').tolist() == [[1.0, 2.0, 3.0], [1.5, 2.5, 0.0]]
+    assert arrays.get_array('b').tolist() == [[0.5, 0.4, 0.3], [0.2, 0.1, 0.0]]
+    assert arrays.get_array('xnorm').tolist() == [0.02281017900, 0.015]
+    assert arrays.get_array('weights').tolist() == [0.25, 0.75]
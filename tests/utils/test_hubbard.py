@@ -10,7 +10,7 @@ import pytest
 
 from aiida_quantumespresso.common.hubbard import Hubbard
 from aiida_quantumespresso.data.hubbard_structure import HubbardStructureData
-from aiida_quantumespresso.utils.hubbard import HubbardUtils, initialize_hubbard_parameters
+from aiida_quantumespresso.utils.hubbard import HubbardUtils, get_neighbour_table, initialize_hubbard_parameters
 
 
 @pytest.fixture
@@ -236,6 +236,43 @@ def test_hubbard_for_supercell(generate_hubbard_structure):
         assert hubbard_supercell.sites[parameters[0]].kind_name == 'Li'
 
 
+@pytest.mark.usefixtures('aiida_profile')
+def test_hubbard_for_supercell_intersites(generate_hubbard_structure):
+    """Test the `get_hubbard_for_supercell` method for intersite parameters.
+
+    Each parameter of the unitcell should be mapped onto one parameter for each of its images in the supercell, with
+    the neighbour at the same distance.
+    """
+    parameters = [
+        (0, '3d', 0, '3d', 5.0, (0, 0, 0), 'U'),
+        (0, '3d', 1, '2p', 1.0, (0, 0, 0), 'V'),
+        (0, '3d', 2, '2p', 0.5, (1, -1, 0), 'V'),
+    ]
+    hubbard_structure = generate_hubbard_structure(parameters=parameters)
+    hubbard_utils = HubbardUtils(hubbard_structure=hubbard_structure)
+
+    pymatgen = hubbard_structure.get_pymatgen_structure()
+    pymatgen.make_supercell([[2, 1, 0], [0, 2, 0], [0, 0, 1]])
+    supercell = StructureData(pymatgen=pymatgen)
+
+    hubbard_supercell = hubbard_utils.get_hubbard_for_supercell(supercell=supercell, thr=1e-5)
+    sc_parameters = hubbard_supercell.hubbard.to_list()
+
+    def get_distance(structure, parameter):
+        positions = np.array([site.position for site in structure.sites])
+        neighbour_position = positions[parameter[2]] + np.dot(parameter[5], structure.cell)
+        return np.linalg.norm(neighbour_position - positions[parameter[0]])
+
+    assert len(sc_parameters) == 4 * len(parameters)
+
+    for index, parameter in enumerate(parameters):
+        mapped = sc_parameters[4 * index:4 * (index + 1)]
+        assert len({sc_parameter[0] for sc_parameter in mapped}) == 4
+        for sc_parameter in mapped:
+            assert [sc_parameter[i] for i in (1, 3, 4, 6)] == [parameter[i] for i in (1, 3, 4, 6)]
+            assert np.isclose(get_distance(hubbard_supercell, sc_parameter), get_distance(hubbard_structure, parameter))
+
+
 @pytest.fixture
 def get_non_trivial_hubbard_structure(filepath_tests):
     """Return a multi-coordination number `HubbardStructureData`."""
@@ -349,6 +386,44 @@ def test_get_intersites_radius_five_nn(filepath_tests):
     assert len(pymat.get_neighbors(pymat[0], r=radius)) == 5
 
 
+@pytest.mark.usefixtures('aiida_profile')
+def test_neighbour_table(get_non_trivial_hubbard_structure, monkeypatch):
+    """Test that the neighbour analysis is shared between the queries of `HubbardUtils` on the same structure."""
+    from aiida_quantumespresso.utils import hubbard
+
+    hubbard_structure = get_non_trivial_hubbard_structure()
+    hubbard_utils = HubbardUtils(hubbard_structure=hubbard_structure)
+
+    table = get_neighbour_table(hubbard_structure)
+    assert get_neighbour_table(hubbard_structure.clone()) is table
+    assert get_neighbour_table(hubbard_structure, radius_max=5.0) is not table
+
+    cn_dicts = hubbard_utils.get_cn_dicts()
+    assert sorted(cn_dicts) == list(range(24))
+
+    # The coordination numbers should not be computed again by any of the queries
+    monkeypatch.setattr(hubbard, '_get_cn_dicts', lambda *_: pytest.fail('neighbour analysis was not cached'))
+
+    assert abs(hubbard_utils.get_intersites_radius() - 2.106) < 1.0e-5
+    assert hubbard_utils.get_max_number_of_neighbours() == 6
+    assert len(hubbard_utils.get_intersites_list()) == 8 * (4 + 1) + 16 * (6 + 1)
+    assert hubbard_utils.get_cn_dicts() == cn_dicts
+
+
+@pytest.mark.usefixtures('aiida_profile')
+def test_neighbour_table_max_workers(get_non_trivial_hubbard_structure):
+    """Test that distributing the neighbour analysis over processes gives the same result."""
+    hubbard_structure = get_non_trivial_hubbard_structure()
+    table = get_neighbour_table(hubbard_structure)
+    indices = [0, 1, 8, 9, 23]
+
+    cn_dicts = HubbardUtils(hubbard_structure).get_cn_dicts()
+    expected = [cn_dicts[index] for index in indices]
+    table._cn_dicts.clear()  # pylint: disable=protected-access
+
+    assert list(table.get_cn_dicts('crystal', None, indices, max_workers=2).values()) == expected
+
+
 def test_initialize_hubbard_parameters(get_non_trivial_hubbard_structure):
     """Test the `HubbardUtils.initialize_hubbard_parameters` method."""
     structure = get_non_trivial_hubbard_structure()
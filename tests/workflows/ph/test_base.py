@@ -48,6 +48,132 @@ def test_invalid_inputs(generate_workchain_ph, generate_inputs_ph):
         generate_workchain_ph(inputs=inputs)
 
 
+@pytest.fixture
+def generate_ph_qpoint_node(generate_calc_job_node):
+    """Generate a finished node with the outputs of a ``PhBaseWorkChain`` that ran for a single q-point."""
+
+    def _generate_ph_qpoint_node(index, output_parameters):
+        from plumpy import ProcessState
+
+        node = generate_calc_job_node()
+        node.set_process_state(ProcessState.FINISHED)
+        node.set_exit_status(0)
+
+        output_parameters = orm.Dict(output_parameters)
+        output_parameters.base.links.add_incoming(node, link_type=LinkType.CREATE, link_label='output_parameters')
+        output_parameters.store()
+
+        retrieved = orm.FolderData()
+        retrieved.base.repository.put_object_from_bytes(b'header', 'DYN_MAT/dynamical-matrix-0')
+        retrieved.base.repository.put_object_from_bytes(f'{index}'.encode(), f'DYN_MAT/dynamical-matrix-{index}')
+        retrieved.base.links.add_incoming(node, link_type=LinkType.CREATE, link_label='retrieved')
+        retrieved.store()
+
+        return node
+
+    return _generate_ph_qpoint_node
+
+
+@pytest.mark.usefixtures('aiida_profile')
+def test_invalid_inputs_parallelize_qpoints(generate_workchain_ph, generate_inputs_ph):
+    """Test the validation of the `parallelize_qpoints` input."""
+    inputs = generate_workchain_ph(return_inputs=True)
+    inputs['parallelize_qpoints'] = orm.Bool(True)
+    inputs['only_initialization'] = orm.Bool(True)
+
+    with pytest.raises(ValueError, match=r'cannot both be `True`'):
+        generate_workchain_ph(inputs=inputs)
+
+    inputs['only_initialization'] = orm.Bool(False)
+    inputs['ph']['parameters'] = orm.Dict({'INPUTPH': {'start_irr': 1}})
+
+    with pytest.raises(ValueError, match=r'cannot be combined with `start_irr` or `last_irr`'):
+        generate_workchain_ph(inputs=inputs)
+
+    inputs = {'ph': generate_inputs_ph(), 'parallelize_qpoints': orm.Bool(True)}
+    inputs['ph'].pop('qpoints')
+    inputs['qpoints'] = orm.KpointsData()
+    inputs['qpoints'].set_kpoints([[0., 0., 0.]])
+
+    with pytest.raises(ValueError, match=r'requires a mesh or a list of more than one q-point'):
+        generate_workchain_ph(inputs=inputs)
+
+
+def test_parallelize_qpoints(generate_workchain_ph, generate_ph_qpoint_node):
+    """Test that the q-points of the initialization run are distributed over separate calculations."""
+    inputs = generate_workchain_ph(return_inputs=True)
+    inputs['parallelize_qpoints'] = orm.Bool(True)
+    inputs['ph']['parameters']['INPUTPH']['tr2_ph'] = 1.0e-16
+
+    process = generate_workchain_ph(inputs=inputs)
+    process.setup()
+    process.validate_parameters()
+    process.set_qpoints()
+
+    assert process.should_parallelize_qpoints()
+
+    process.ctx.initialization = generate_ph_qpoint_node(0, {'number_of_qpoints': 3})
+    assert process.inspect_initialization() is None
+    assert process.ctx.qpoint_indices == [1, 2, 3]
+
+    parameters = process.inputs.ph.parameters.get_dict()
+    parameters['INPUTPH'].update({'start_q': 2, 'last_q': 2})
+    inputs = process.get_qpoint_inputs(parameters)
+
+    assert inputs.ph.parameters.get_dict()['INPUTPH'] == {'tr2_ph': 1.0e-16, 'start_q': 2, 'last_q': 2}
+    assert inputs.ph.parent_folder == process.inputs.ph.parent_folder
+    assert inputs.qpoints == process.ctx.inputs.qpoints
+
+
+@pytest.mark.parametrize('complete', (True, False))
+def test_merge_outputs_parallelize_qpoints(generate_workchain_ph, generate_ph_qpoint_node, complete):
+    """Test that the ``create_merged_outputs`` step checks that each distributed q-point is complete."""
+    inputs = generate_workchain_ph(return_inputs=True)
+    inputs['parallelize_qpoints'] = orm.Bool(True)
+
+    process = generate_workchain_ph(inputs=inputs)
+    process.ctx.initialization = generate_ph_qpoint_node(0, {'number_of_qpoints': 2})
+    process.ctx.qpoint_indices = [1, 2]
+
+    for index in process.ctx.qpoint_indices:
+        output_parameters = {
+            'number_of_irr_representations_for_each_q': [index],
+            'qpoint_indices': [index],
+            'wall_time_seconds': 1.0,
+        }
+
+        if complete or index == 1:
+            output_parameters[f'dynamical_matrix_{index}'] = {'mode_symmetry': ['A'], 'q_point': [0., 0., index]}
+
+        process.ctx[f'qpoint_{index}'] = generate_ph_qpoint_node(index, output_parameters)
+
+    result = process.create_merged_output()
+
+    if not complete:
+        assert result == PhBaseWorkChain.exit_codes.ERROR_MERGING_QPOINTS
+        return
+
+    assert result is None
+
+    output_parameters = process.ctx.merged_outputs['output_parameters'].get_dict()
+    assert output_parameters == {
+        'number_of_irr_representations_for_each_q': [1, 2],
+        'number_of_qpoints': 2,
+        'qpoint_indices': [1, 2],
+        'wall_time_seconds': 2.0,
+    }
+
+    dynamical_matrices = process.ctx.merged_outputs['output_dynamical_matrices']
+    assert dynamical_matrices.get_array('qpoint_indices').tolist() == [1, 2]
+    assert dynamical_matrices.get_array('q_points').tolist() == [[0., 0., 1.], [0., 0., 2.]]
+
+    retrieved = process.ctx.merged_retrieved
+    assert retrieved.base.repository.list_object_names('DYN_MAT') == [
+        'dynamical-matrix-0', 'dynamical-matrix-1', 'dynamical-matrix-2'
+    ]
+    assert retrieved.base.repository.get_object_content('DYN_MAT/dynamical-matrix-2') == '2'
+
+
 def test_setup(generate_workchain_ph):
     """Test `PhBaseWorkChain.setup`."""
     process = generate_workchain_ph()
@@ -262,7 +388,13 @@ def test_merge_outputs(
     ph_base.create_merged_output()
     outputs = ph_base.get_outputs(node_2)
 
-    data_regression.check(outputs['output_parameters'].get_dict())
+    data_regression.check({
+        'output_parameters': outputs['output_parameters'].get_dict(),
+        'output_dynamical_matrices': {
+            name: outputs['output_dynamical_matrices'].get_array(name).tolist()
+            for name in outputs['output_dynamical_matrices'].get_arraynames()
+        }
+    })
 
 
 def test_validate_inputs_excluded_qpoints_distance(generate_inputs_ph):
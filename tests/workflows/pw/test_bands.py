@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=no-member,redefined-outer-name
+"""Tests for the `PwBandsWorkChain` class."""
+from aiida import orm
+import numpy
+import pytest
+
+from aiida_quantumespresso.workflows.pw.bands import PwBandsWorkChain, get_number_of_pools
+
+
+@pytest.fixture
+def generate_workchain_bands(fixture_code, generate_structure, generate_workchain):
+    """Generate an instance of a `PwBandsWorkChain` with an explicit list or a mesh of k-points for the BANDS step."""
+
+    def _generate_workchain_bands(number_of_kpoints=100, max_bands_shards=None, cmdline=None, kpoints_mesh=None):
+        builder = PwBandsWorkChain.get_builder_from_protocol(fixture_code('quantumespresso.pw'), generate_structure())
+        builder.pop('relax')
+        builder.pop('bands_kpoints_distance')
+
+        kpoints = orm.KpointsData()
+        kpoints.set_cell_from_structure(builder.structure)
+
+        if kpoints_mesh is not None:
+            kpoints.set_kpoints_mesh(kpoints_mesh)
+        else:
+            kpoints.set_kpoints(numpy.zeros((number_of_kpoints, 3)))
+
+        builder.bands_kpoints = kpoints
+
+        if max_bands_shards is not None:
+            builder.max_bands_shards = orm.Int(max_bands_shards)
+
+        if cmdline is not None:
+            builder.bands.pw.settings = orm.Dict({'CMDLINE': cmdline})
+
+        inputs = builder._inputs(prune=True)  # pylint: disable=protected-access
+        process = generate_workchain('quantumespresso.pw.bands', inputs)
+        process.setup()
+
+        return process
+
+    return _generate_workchain_bands
+
+
+@pytest.mark.parametrize(('cmdline', 'expected'), (
+    ([], 1),
+    (['-nk', '4'], 4),
+    (['-ndiag', '1', '-npools', '2'], 2),
+    (['-nk'], 1),
+))
+def test_get_number_of_pools(cmdline, expected):
+    """Test the `get_number_of_pools` function."""
+    assert get_number_of_pools({'CMDLINE': cmdline}) == expected
+
+
+@pytest.mark.parametrize(('number_of_kpoints', 'max_bands_shards', 'cmdline', 'expected'), (
+    (100, None, None, 1),
+    (100, 8, None, 8),
+    (100, 8, ['-nk', '8'], 3),
+    (10, 8, None, 2),
+    (6, 8, None, 1),
+))
+@pytest.mark.usefixtures('aiida_profile')
+def test_number_of_bands_shards(generate_workchain_bands, number_of_kpoints, max_bands_shards, cmdline, expected):
+    """Test that the number of shards is limited by `max_bands_shards` and the number of k-points for each pool."""
+    process = generate_workchain_bands(number_of_kpoints, max_bands_shards, cmdline)
+
+    assert process.get_number_of_bands_shards() == expected
+    assert process.should_shard_bands() == (expected > 1)
+
+
+@pytest.mark.usefixtures('aiida_profile')
+def test_number_of_bands_shards_kpoints_mesh(generate_workchain_bands):
+    """Test that the k-points of the BANDS step are not split into shards if they are defined as a mesh."""
+    process = generate_workchain_bands(max_bands_shards=8, kpoints_mesh=[8, 8, 8])
+
+    assert process.get_number_of_bands_shards() == 1
+    assert not process.should_shard_bands()
+
+
+@pytest.mark.usefixtures('aiida_profile')
+def test_invalid_max_bands_shards(generate_workchain_bands):
+    """Test that a `max_bands_shards` smaller than one is rejected."""
+    with pytest.raises(ValueError, match='The `max_bands_shards` should be at least one.'):
+        generate_workchain_bands(max_bands_shards=0)
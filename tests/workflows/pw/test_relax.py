@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=no-member,redefined-outer-name
+"""Tests for the `PwRelaxWorkChain` class."""
+from aiida import orm
+from aiida.common import LinkType
+from plumpy import ProcessState
+import pytest
+
+from aiida_quantumespresso.workflows.pw.relax import PwRelaxWorkChain, get_relative_cell_change
+
+
+@pytest.fixture
+def generate_workchain_relax(fixture_code, generate_structure, generate_workchain):
+    """Generate an instance of a `PwRelaxWorkChain`."""
+
+    def _generate_workchain_relax(warm_start=None):
+        builder = PwRelaxWorkChain.get_builder_from_protocol(fixture_code('quantumespresso.pw'), generate_structure())
+
+        if warm_start is not None:
+            builder.warm_start = orm.Str(warm_start)
+
+        inputs = builder._inputs(prune=True)  # pylint: disable=protected-access
+        process = generate_workchain('quantumespresso.pw.relax', inputs)
+        process.setup()
+
+        return process
+
+    return _generate_workchain_relax
+
+
+@pytest.fixture
+def generate_relax_node(fixture_localhost):
+    """Generate a finished node with the outputs of a relax `PwBaseWorkChain`."""
+
+    def _generate_relax_node(exit_status=0, structure=None):
+        node = orm.WorkflowNode()
+        node.set_process_state(ProcessState.FINISHED)
+        node.set_exit_status(exit_status)
+        node.store()
+
+        remote_folder = orm.RemoteData(computer=fixture_localhost, remote_path='/tmp').store()
+        remote_folder.base.links.add_incoming(node, link_type=LinkType.RETURN, link_label='remote_folder')
+
+        if structure is not None:
+            output_parameters = orm.Dict({'number_of_bands': 8}).store()
+            output_parameters.base.links.add_incoming(node, link_type=LinkType.RETURN, link_label='output_parameters')
+            structure.store().base.links.add_incoming(node, link_type=LinkType.RETURN, link_label='output_structure')
+
+        return node
+
+    return _generate_relax_node
+
+
+def test_get_relative_cell_change():
+    """Test the `get_relative_cell_change` function."""
+    cell = [[2., 0., 0.], [1., 2., 0.], [0., 0., 3.]]
+
+    assert get_relative_cell_change(cell, cell) == pytest.approx(0.)
+    assert get_relative_cell_change(cell, [[2.2, 0., 0.], [1.1, 2.2, 0.], [0., 0., 3.3]]) == pytest.approx(0.1)
+    assert get_relative_cell_change(cell, [[2., 0., 0.], [1., 2., 0.], [0., 0.3, 3.]]) == pytest.approx(0.15)
+
+
+@pytest.mark.usefixtures('aiida_profile')
+def test_invalid_warm_start(generate_workchain_relax):
+    """Test that an invalid `warm_start` input is rejected."""
+    with pytest.raises(ValueError, match=r'`warm_start` should be one of'):
+        generate_workchain_relax(warm_start='full')
+
+
+@pytest.mark.usefixtures('aiida_profile')
+def test_warm_start_disabled(generate_workchain_relax, generate_relax_node):
+    """Test that the calculations are not restarted if the `warm_start` input is not specified."""
+    process = generate_workchain_relax()
+    process.ctx.workchains = [generate_relax_node()]
+    structure = process.ctx.current_structure
+
+    assert process.get_restart_folder(process.ctx.workchains[-1], structure, structure) is None
+
+    inputs = process.ctx.relax_inputs
+    process.set_warm_start(inputs)
+
+    assert 'parent_folder' not in inputs.pw
+    assert 'restart_mode' not in inputs.pw.parameters['CONTROL']
+
+
+@pytest.mark.parametrize('warm_start', ('from_charge_density', 'from_wave_functions'))
+@pytest.mark.usefixtures('aiida_profile')
+def test_warm_start(generate_workchain_relax, generate_relax_node, warm_start):
+    """Test that each iteration is restarted from the previous one, with the requested restart type."""
+    process = generate_workchain_relax(warm_start=warm_start)
+    process.ctx.workchains = [generate_relax_node(), generate_relax_node()]
+    structure = process.ctx.current_structure
+
+    process.ctx.restart_folder = process.get_restart_folder(process.ctx.workchains[-1], structure, structure)
+    assert process.ctx.restart_folder.uuid == process.ctx.workchains[-1].outputs.remote_folder.uuid
+
+    inputs = process.ctx.relax_inputs
+    process.set_warm_start(inputs)
+    starting = {'startingpot': 'file'} if warm_start == 'from_charge_density' else {'startingwfc': 'file'}
+
+    assert inputs.pw.parent_folder.uuid == process.ctx.restart_folder.uuid
+    assert inputs.pw.parameters['CONTROL']['restart_mode'] == 'from_scratch'
+    assert {key: inputs.pw.parameters['ELECTRONS'][key] for key in starting} == starting
+
+    # The next calculation falls back to starting from scratch if it cannot be warm-started
+    process.ctx.restart_folder = None
+    process.set_warm_start(inputs)
+
+    assert 'parent_folder' not in inputs.pw
+    assert not {'startingpot', 'startingwfc'} & set(inputs.pw.parameters['ELECTRONS'])
+
+
+@pytest.mark.parametrize(('scale', 'exit_status', 'restart'), (
+    (1.00, 0, True),
+    (1.001, 0, True),
+    (1.04, 0, True),
+    (1.10, 0, False),
+    (1.00, 300, False),
+))
+@pytest.mark.usefixtures('aiida_profile')
+def test_warm_start_fallback(generate_workchain_relax, generate_relax_node, scale, exit_status, restart):
+    """Test that the next calculation starts from scratch if the previous iteration failed or strained the cell."""
+    process = generate_workchain_relax(warm_start='from_charge_density')
+    process.ctx.workchains = [generate_relax_node(exit_status)]
+
+    structure = process.ctx.current_structure
+    structure_final = structure.clone()
+    structure_final.reset_cell([[scale * value for value in vector] for vector in structure.cell])
+
+    restart_folder = process.get_restart_folder(process.ctx.workchains[-1], structure, structure_final)
+
+    assert (restart_folder is not None) == restart
+
+
+@pytest.mark.usefixtures('aiida_profile')
+def test_warm_start_vc_relax(generate_workchain_relax, generate_relax_node):
+    """Test that the next iteration of a `vc-relax` is warm-started if the cell changed only slightly."""
+    process = generate_workchain_relax(warm_start='from_charge_density')
+    assert process.ctx.relax_inputs.pw.parameters['CONTROL']['calculation'] == 'vc-relax'
+
+    structure = process.ctx.current_structure.clone()
+    structure.reset_cell([[1.01 * value for value in vector] for vector in structure.cell])
+    process.ctx.workchains = [generate_relax_node(structure=structure)]
+
+    assert process.inspect_relax() is None
+    assert process.ctx.restart_folder.uuid == process.ctx.workchains[-1].outputs.remote_folder.uuid
+
+    inputs = process.ctx.relax_inputs
+    process.set_warm_start(inputs)
+
+    assert inputs.pw.parent_folder.uuid == process.ctx.restart_folder.uuid
+    assert inputs.pw.parameters['ELECTRONS']['startingpot'] == 'file'
@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
 """Tests for the `XpsWorkChain` class."""
 from aiida import orm
-from aiida.common import LinkType
+from aiida.common import LinkType, ValidationError
 from plumpy import ProcessState
+import pytest
+
+from aiida_quantumespresso.workflows.xps import get_scf_cost_estimate
 
 
 def test_default(generate_workchain_xps):
@@ -35,3 +38,108 @@ def test_default(generate_workchain_xps):
         'standardized_structure', 'supercell_structure', 'symmetry_analysis_data', 'output_parameters_ch_scf__site_0',
         'chemical_shifts__Si_cls', 'final_spectra_cls__Si_cls_spectra'
     }
+
+
+def finish_workchain_node(node, outputs=None):
+    """Attach the given outputs to the node of a launched ``PwBaseWorkChain`` and set it to finished."""
+    for link_label, output in (outputs or {}).items():
+        output.store()
+        output.base.links.add_incoming(node, link_type=LinkType.RETURN, link_label=link_label)
+    node.set_process_state(ProcessState.FINISHED)
+    node.set_exit_status(0)
+
+
+def test_max_concurrent_scf(generate_workchain_xps):
+    """Test that the scf calculations are launched in batches of at most ``max_concurrent_scf``."""
+    inputs = generate_workchain_xps(return_inputs=True)
+    inputs['calc_binding_energy'] = orm.Bool(True)
+    inputs['correction_energies'] = orm.Dict({'Si': 0.})
+    inputs['max_concurrent_scf'] = orm.Int(1)
+
+    wkchain = generate_workchain_xps(inputs=inputs)
+    wkchain.setup()
+    wkchain.prepare_structures()
+
+    assert wkchain.ctx.scf_queue == ['ground_state', 'site_0']
+
+    for label in ('ground_state', 'site_0'):
+        assert wkchain.should_run_all_scf()
+        futures = wkchain.run_all_scf()
+        assert list(futures) == [label]
+
+    assert not wkchain.should_run_all_scf()
+
+
+def test_restart_from_ground_state(generate_workchain_xps, fixture_localhost):
+    """Test that the ground state is launched first and that the sites restart from its charge density."""
+    inputs = generate_workchain_xps(return_inputs=True)
+    inputs['calc_binding_energy'] = orm.Bool(True)
+    inputs['correction_energies'] = orm.Dict({'Si': 0.})
+    inputs['restart_from_ground_state'] = orm.Bool(True)
+
+    wkchain = generate_workchain_xps(inputs=inputs)
+    wkchain.setup()
+    wkchain.prepare_structures()
+
+    futures = wkchain.run_all_scf()
+    assert list(futures) == ['ground_state']
+
+    remote_folder = orm.RemoteData(computer=fixture_localhost, remote_path='/tmp')
+    finish_workchain_node(futures['ground_state'], {'remote_folder': remote_folder})
+    wkchain.ctx['ground_state'] = futures['ground_state']
+
+    futures = wkchain.run_all_scf()
+    assert list(futures) == ['site_0']
+
+    inputs = futures['site_0'].inputs.pw
+    assert inputs.parent_folder.uuid == remote_folder.uuid
+    assert inputs.parameters['ELECTRONS']['startingpot'] == 'file'
+
+
+def test_restart_from_ground_state_invalid(generate_workchain_xps):
+    """Test that ``restart_from_ground_state`` requires the ground state scf."""
+    inputs = generate_workchain_xps(return_inputs=True)
+    inputs['restart_from_ground_state'] = orm.Bool(True)
+
+    with pytest.raises(ValidationError, match=r'requires the ground state scf'):
+        generate_workchain_xps(inputs=inputs)
+
+
+def test_grid_parameters(generate_workchain_xps):
+    """Test that the ``grid_parameters`` are passed to the calcfunction that computes the spectra."""
+    inputs = generate_workchain_xps(return_inputs=True)
+    inputs['grid_parameters'] = orm.Dict({'points_per_fwhm': 20, 'margin': 0.5})
+
+    wkchain = generate_workchain_xps(inputs=inputs)
+    wkchain.setup()
+    wkchain.prepare_structures()
+
+    for label, node in wkchain.run_all_scf().items():
+        finish_workchain_node(node, {'output_parameters': orm.Dict({'energy': 0})})
+        wkchain.ctx[label] = node
+
+    assert wkchain.inspect_all_scf() is None
+    wkchain.results()
+    wkchain.update_outputs()
+
+    energies = wkchain.node.outputs.final_spectra_cls.Si_cls_spectra.get_x()[1]
+    fwhm = 0.15 + (0.15**2 + 0.3**2)**0.5
+
+    assert energies[0] == pytest.approx(-fwhm - 0.5)
+    assert energies[1] - energies[0] <= fwhm / 20
+
+    inputs['grid_parameters'] = orm.Dict({'npoints': 100})
+
+    with pytest.raises(ValidationError, match=r'unsupported keys: \[.npoints.\]'):
+        generate_workchain_xps(inputs=inputs)
+
+
+def test_get_scf_cost_estimate(generate_structure, generate_upf_data):
+    """Test that the spin-polarized calculations are estimated to be the most expensive."""
+    structure = generate_structure()
+    pseudos = {'Si': generate_upf_data('Si')}
+    volume = structure.get_cell_volume()
+
+    assert get_scf_cost_estimate(structure, pseudos, {}) == pytest.approx(64 * volume)
+    assert get_scf_cost_estimate(structure, pseudos, {'SYSTEM': {'tot_charge': 1}}) == pytest.approx(49 * volume)
+    assert get_scf_cost_estimate(structure, pseudos, {'SYSTEM': {'nspin': 2}}) == pytest.approx(128 * volume)